@@ -2,44 +2,179 @@
 
 __version__ = '0.1'
 
+import os
+import warnings
+
 from apache_conf_parser.directives.complex_directive import ComplexDirective
-from apache_conf_parser.directives.redirect import Redirect
-from apache_conf_parser.directives.redirect_match import RedirectMatch
-from apache_conf_parser.directives.rewrite_rule import RewriteRule
 from apache_conf_parser.directives.simple_directive import SimpleDirective
 from apache_conf_parser.nodes import Node
 from apache_conf_parser.nodes.blank_node import BlankNode
 from apache_conf_parser.nodes.comment_node import CommentNode
 from apache_conf_parser.nodes.complex_node import ComplexNode
+from apache_conf_parser.nodes.registry import BUILTIN_DIRECTIVES, load_target, registry
+
+# Names imported on first access (PEP 562) so that importing the package stays cheap.
+LAZY_ATTRIBUTES = dict(BUILTIN_DIRECTIVES, MappedFile='apache_conf_parser.mapped_file:MappedFile')
+
+
+def __getattr__(name):
+    if name not in LAZY_ATTRIBUTES:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = globals()[name] = load_target(LAZY_ATTRIBUTES[name])
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(LAZY_ATTRIBUTES))
+
+
+class DeprecatedNodes(object):
+    """
+    ApacheConfParser.NODES, the node classes lines were matched against before directive classes were looked up
+    through the registry: comments, blank lines, the registered directive classes, then the generic directives.
+    Reading it imports every registered class. Deprecated; register classes with registry.register instead.
+
+    """
+    def __get__(self, instance, owner):
+        warnings.warn("ApacheConfParser.NODES is deprecated, use apache_conf_parser.registry instead.",
+                      DeprecationWarning, stacklevel=2)
+        return [CommentNode, BlankNode] + [registry.get(keyword) for keyword in registry] + [
+            SimpleDirective, ComplexDirective]
 
 
 class ApacheConfParser(ComplexNode):
     is_node_candidate = False
-    NODES = [
-        CommentNode,
-        BlankNode,
-        RewriteRule,
-        RedirectMatch,
-        Redirect,
-        SimpleDirective,
-        ComplexDirective,
-    ]
-
-    def __init__(self, source, infile=True, delay=False):
+    NODES = DeprecatedNodes()
+
+    # The NameIndex of the tree, when it has one (see build_index).
+    index = None
+
+    def __init__(self, source, infile=True, delay=False, mapped=False, lazy=False, includes=False, index=False):
+        """
+        With mapped=True, a source file is memory-mapped and its lines are decoded one at a time while parsing (see
+        MappedFile). The file is only mapped while parse() runs, and released even when parsing fails.
+
+        With lazy=True, nodes only store their lines while parsing; their name, arguments and matches are computed
+        the first time they are accessed (see Node.materialize). Invalid directive arguments are then reported on
+        that first access instead of while parsing.
+
+        With includes=True, Include and IncludeOptional directives are resolved once parsing completes: every
+        included file is parsed and attached to its directives (see IncludeResolver). Passing an IncludeResolver
+        instead shares its parsed files and settings (server root, workers) between configurations.
+
+        With index=True, directives and sections are indexed by name as they are parsed (see build_index).
+
+        """
         super(ApacheConfParser, self).__init__(self.get_node_candidates())
-        self.source = source.splitlines()
-        if infile:
+        if lazy:
+            self.lazy_nodes = True
+        if index:
+            self.build_index()
+        if includes:
+            if includes is True:
+                from apache_conf_parser.includes import IncludeResolver
+
+                includes = IncludeResolver()
+            self.resolver = includes
+            self.resolver_path = source if infile else None
+        if infile and mapped:
+            from apache_conf_parser.mapped_file import MappedFile
+
+            self.source = MappedFile(source)
+        elif infile:
             self.source = [line.strip("\n") for line in open(source).readlines()]
+        else:
+            self.source = source.splitlines()
         if not delay:
             self.parse()
 
     def parse(self):
         if self.complete:
             return
-        for line in self.source:
-            self.add_line(line)
-        self.complete = True
+        try:
+            for line in self.source:
+                self.add_line(line)
+            self.complete = True
+        finally:
+            close = getattr(self.source, 'close', None)
+            if close is not None:
+                close()
+        if 'resolver' in self.__dict__:
+            self.resolver.resolve(self, self.resolver_path)
+
+    def build_index(self):
+        """
+        Index the directives and sections of the tree by name, and keep the index up to date as nodes are parsed,
+        added and removed (see NameIndex). Returns the index, also available as the index attribute.
+
+        """
+        from apache_conf_parser.index import NameIndex
+
+        self.index = NameIndex(self)
+        return self.index
+
+    def select(self, selector):
+        """Return the directives and sections matching selector, e.g. 'VirtualHost > RewriteRule' (see Selector)."""
+        from apache_conf_parser.selector import select
+
+        return select(self, selector)
 
     @classmethod
     def get_node_candidates(cls):
-        return [c for c in Node.get_subclasses() if cls.__bases__ != (c,)]
+        return Node.get_candidates(exclude=cls.__bases__[0] if len(cls.__bases__) == 1 else None)
+
+    @classmethod
+    def iter_parse(cls, source, lazy=False):
+        """
+        Parse a configuration lazily, yielding each top-level node as soon as it is complete.
+
+        The source (a path or an iterable of lines such as an open file) is read one line at a time and yielded
+        nodes are dropped from the parser, so memory use is bounded by the largest single section rather than by
+        the whole configuration. The lazy flag works as for ApacheConfParser.
+
+        """
+        feeder = NodeFeeder(cls.get_node_candidates(), lazy)
+        for line in iter_lines(source):
+            for node in feeder.feed(line):
+                yield node
+        feeder.close()
+
+
+class NodeFeeder(object):
+    """
+    Parse lines fed one at a time into top-level nodes, handing each node back as soon as it is complete and
+    dropping it from the parser. This is the parsing loop of iter_parse and aio.aiter_parse.
+
+    """
+    def __init__(self, candidates, lazy=False):
+        self.root = ComplexNode(candidates)
+        if lazy:
+            self.root.lazy_nodes = True
+
+    def feed(self, line):
+        """Parse a line, and return the top-level nodes it completed."""
+        root = self.root
+        root.add_line(line)
+        if root.nodes and root.nodes.stable:
+            nodes = list(root.nodes)
+            del root.nodes[:]
+            return nodes
+        return ()
+
+    def close(self):
+        """Mark the end of the lines; raises NodeCompleteError if the last node is still waiting for lines."""
+        self.root.complete = True
+
+
+def iter_lines(source):
+    """Yield the lines of a path or of an iterable of lines, without their line endings ("\\n" or "\\r\\n")."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as lines:
+            for line in lines:
+                yield line.strip("\n")
+    else:
+        for line in source:
+            yield line.strip("\r\n")
+
+
+iter_parse = ApacheConfParser.iter_parse
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+import asyncio
+import functools
+import locale
+import os
+from collections import deque
+
+from apache_conf_parser import ApacheConfParser, NodeFeeder
+from apache_conf_parser.cache import parse_data
+from apache_conf_parser.parallel import ParseResult
+
+# Characters read from a file at a time by aiter_parse.
+READ_SIZE = 64 * 1024
+
+
+def read_file(path):
+    with open(path, 'rb') as conf:
+        return conf.read()
+
+
+async def aparse(path, executor=None, lazy=False):
+    """
+    Parse a configuration file without blocking the event loop, returning its ApacheConfParser tree.
+
+    The file is read in the loop's default executor and parsed in executor, by default the loop's default executor
+    too. Parsing is CPU-bound and holds the GIL, so in a thread it still slows other coroutines down a little; a
+    concurrent.futures.ProcessPoolExecutor keeps their latency flat, at the cost of pickling each tree back. The lazy
+    flag works as for ApacheConfParser.
+
+    """
+    loop = asyncio.get_running_loop()
+    data = await loop.run_in_executor(None, read_file, path)
+    return await loop.run_in_executor(executor, parse_data, data, lazy)
+
+
+async def aparse_result(path, executor, lazy):
+    try:
+        return ParseResult(path, await aparse(path, executor, lazy))
+    except Exception as e:
+        return ParseResult(path, error=e)
+
+
+async def aparse_many(paths, limit=64, executor=None, lazy=False, ordered=True):
+    """
+    Parse many configuration files with aparse, yielding a ParseResult per path (see parse_many).
+
+    At most limit files are read or parsed at once, and paths, which can be any iterable, is consumed as files
+    complete, so thousands of files don't create thousands of pending tasks. Results come in the order of paths, or
+    as soon as they are ready with ordered=False. A file that can't be read or parsed yields a result carrying the
+    error rather than stopping the other files.
+
+    """
+    if limit < 1:
+        raise ValueError("limit must be at least 1, received: %r" % limit)
+    paths = iter(paths)
+    pending = deque()
+
+    def start_next():
+        for path in paths:
+            pending.append(asyncio.ensure_future(aparse_result(path, executor, lazy)))
+            return True
+        return False
+
+    try:
+        while len(pending) < limit and start_next():
+            pass
+        while pending:
+            if ordered:
+                result = await pending.popleft()
+            else:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                task = done.pop()
+                pending.remove(task)
+                result = task.result()
+            start_next()
+            yield result
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def aiter_lines(source, encoding=None):
+    """
+    Yield the lines of a path, an async iterable of lines (such as an asyncio.StreamReader) or an iterable of lines,
+    without their line endings ("\\n" or "\\r\\n"). Bytes are decoded with encoding, by default the locale's as when opening a file.
+
+    """
+    if isinstance(source, (str, os.PathLike)):
+        loop = asyncio.get_running_loop()
+        # read in text mode, which decodes and translates line endings as ApacheConfParser(path) does
+        conf = await loop.run_in_executor(None, functools.partial(open, source, encoding=encoding))
+        try:
+            rest = ''
+            while True:
+                block = await loop.run_in_executor(None, conf.read, READ_SIZE)
+                if not block:
+                    break
+                lines = (rest + block).split("\n")
+                rest = lines.pop()
+                for line in lines:
+                    yield line
+            if rest:
+                yield rest
+        finally:
+            conf.close()
+        return
+    encoding = encoding or locale.getpreferredencoding(False)
+    if hasattr(source, '__aiter__'):
+        async for line in source:
+            yield (line.decode(encoding) if isinstance(line, bytes) else line).strip("\r\n")
+    else:
+        for line in source:
+            yield (line.decode(encoding) if isinstance(line, bytes) else line).strip("\r\n")
+
+
+async def aiter_parse(source, lazy=False, encoding=None, batch=1000):
+    """
+    Parse a configuration as it is read, yielding each top-level node as soon as it is complete, like iter_parse.
+
+    source is a path (read in the loop's default executor), an async iterable of lines such as an
+    asyncio.StreamReader, or an iterable of lines. Lines are parsed in the event loop, which is given back to the
+    other coroutines every batch lines even when the source has more lines ready. The lazy flag works as for
+    ApacheConfParser.
+
+    """
+    feeder = NodeFeeder(ApacheConfParser.get_node_candidates(), lazy)
+    count = 0
+    async for line in aiter_lines(source, encoding):
+        for node in feeder.feed(line):
+            yield node
+        count += 1
+        if count % batch == 0:
+            await asyncio.sleep(0)
+    feeder.close()
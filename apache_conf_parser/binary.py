@@ -0,0 +1,424 @@
+#!/usr/bin/env python
+import gc
+import struct
+import sys
+from array import array
+from itertools import islice
+
+from apache_conf_parser.directives import Directive
+from apache_conf_parser.directives.complex_directive import ComplexDirective
+from apache_conf_parser.lists.argument_list import ArgumentList
+from apache_conf_parser.lists.node_list import NodeList
+from apache_conf_parser.nodes import Node
+from apache_conf_parser.nodes.complex_node import ComplexNode
+from apache_conf_parser.nodes.dispatcher import NodeDispatcher
+from apache_conf_parser.nodes.registry import load_target, registry
+
+MAGIC = b'ACPT'
+VERSION = 2
+
+# magic, version, then the byte lengths of the string table, the records and the extras
+HEADER = struct.Struct('<4sHIII')
+
+# array typecode of the integers records and extras are made of, which are stored as little-endian 32-bit integers
+# whatever the platform; C ints are 32 bits wide on every common platform, C longs on some others
+INT32 = next((typecode for typecode in 'il' if array(typecode).itemsize == 4), None)
+if INT32 is None:
+    raise ImportError("No array typecode for 32-bit integers on this platform.")
+
+# types of the values of extra attributes
+NONE_VALUE, FALSE_VALUE, TRUE_VALUE, INT_VALUE, STR_VALUE, LIST_VALUE, TUPLE_VALUE, DICT_VALUE = range(8)
+NODE_VALUE, OBJECT_VALUE = range(8, 10)
+
+# classes other than nodes whose instances can be extra attributes; they're rebuilt from their attributes
+OBJECT_CLASSES = frozenset(['apache_conf_parser.includes:IncludeResolver'])
+
+# record kinds, by node class
+NODE, DIRECTIVE, COMPLEX_DIRECTIVE, COMPLEX_NODE = range(4)
+
+# record flags
+COMPLETE, CHANGED, STABLE, TAILMATCH, NO_MATCHES, HAS_SOURCE = (1 << bit for bit in range(6))
+
+NODE_KEYS = frozenset(['lines', '_content', '_complete', 'changed', '_matches'])
+# caches and indexes that are rebuilt on demand and not encoded
+TRANSIENT_KEYS = frozenset(['_line_counts', 'index'])
+
+KEYS = {
+    NODE: NODE_KEYS,
+    DIRECTIVE: NODE_KEYS | frozenset(['_arguments', '_stable', '_name']),
+    COMPLEX_DIRECTIVE: NODE_KEYS | frozenset(['_arguments', '_stable', '_name', 'header', 'body', 'tail', 'tailmatch']),
+    COMPLEX_NODE: NODE_KEYS | frozenset(['candidates', 'dispatcher', 'nodes', '_sections', 'source']),
+}
+
+
+def get_class_name(cls):
+    return "%s:%s" % (cls.__module__, cls.__qualname__)
+
+
+def get_node_classes():
+    """Map the names (as in the class table) of Node and every subclass of it defined so far to the classes."""
+    classes = {}
+    pending = [Node]
+    while pending:
+        cls = pending.pop()
+        classes[get_class_name(cls)] = cls
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+def load_class(name, node_classes):
+    """
+    Return the class named by an entry of the class table: a node class already defined or registered as a directive
+    class (see DirectiveRegistry), or one of OBJECT_CLASSES. Other names raise ValueError, so loading data never
+    imports arbitrary modules.
+
+    """
+    cls = node_classes.get(name)
+    if cls is None:
+        cls = registry.get_target(name)
+    if cls is not None and isinstance(cls, type) and issubclass(cls, Node):
+        return cls
+    if name in OBJECT_CLASSES:
+        return load_target(name)
+    raise ValueError("Unknown node class %s: only defined or registered node classes can be loaded." % name)
+
+
+def get_kind(node_cls):
+    if issubclass(node_cls, ComplexDirective):
+        return COMPLEX_DIRECTIVE
+    if issubclass(node_cls, Directive):
+        return DIRECTIVE
+    if issubclass(node_cls, ComplexNode):
+        return COMPLEX_NODE
+    return NODE
+
+
+class BinaryWriter(object):
+    """
+    Encode a complete tree as the records of the binary format; see dump_binary.
+
+    Every node is one record of 32-bit integers, in document order: its class, flags, content, lines and matches,
+    followed for directives by their name and arguments, for complex directives by their header and body records
+    and tail, and for complex nodes by their candidates, the source lines of a parser and their children's records.
+    Strings are ids into a table of unique strings, with -1 standing for None.
+
+    Instance attributes that aren't part of the records (e.g. Include.included) are encoded separately, by record
+    number, as typed values: None, booleans, integers, strings, lists, tuples and dicts of values, nodes and
+    instances of OBJECT_CLASSES. A node value refers to the record of the node, so nodes shared between attributes
+    stay shared; nodes that aren't part of the tree (e.g. included trees) are encoded after it, as further roots.
+
+    """
+    def __init__(self):
+        self.strings = []
+        self.string_ids = {}
+        self.classes = []
+        self.class_ids = {}
+        self.records = array(INT32)
+        # (record number, attributes) of the nodes with extra attributes, and the numbers of the nodes by id
+        self.extras = []
+        self.numbers = {}
+        self.roots = 0
+        self.count = 0
+
+    def get_string_id(self, value):
+        if value is None:
+            return -1
+        string_id = self.string_ids.get(value)
+        if string_id is None:
+            if "\n" in value:
+                raise ValueError("Strings containing newlines can't be encoded: %r" % value)
+            string_id = self.string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def get_class_id(self, node_cls):
+        class_id = self.class_ids.get(node_cls)
+        if class_id is None:
+            class_id = self.class_ids[node_cls] = len(self.classes)
+            self.classes.append(node_cls)
+        return class_id
+
+    def add_strings(self, values):
+        self.records.append(len(values))
+        self.records.extend(self.get_string_id(value) for value in values)
+
+    def add(self, node):
+        node.materialize()
+        node_cls = type(node)
+        kind = get_kind(node_cls)
+        attributes = node.__dict__
+        extras = {k: v for k, v in attributes.items() if k not in KEYS[kind] and k not in TRANSIENT_KEYS}
+        if extras:
+            self.extras.append((self.count, extras))
+        self.numbers[id(node)] = self.count
+        self.count += 1
+        matches = attributes['_matches']
+        flags = COMPLETE if attributes['_complete'] else 0
+        flags |= CHANGED if attributes['changed'] else 0
+        flags |= NO_MATCHES if matches is None else 0
+        if kind in (DIRECTIVE, COMPLEX_DIRECTIVE):
+            flags |= STABLE if attributes['_stable'] else 0
+        if kind == COMPLEX_DIRECTIVE:
+            flags |= TAILMATCH if attributes['tailmatch'] else 0
+        if kind == COMPLEX_NODE:
+            if attributes['_sections']:
+                raise ValueError("Only complete trees can be dumped: %r has open sections." % node)
+            flags |= HAS_SOURCE if 'source' in attributes else 0
+
+        records = self.records
+        records.append(self.get_class_id(node_cls))
+        records.append(flags)
+        records.append(self.get_string_id(attributes['_content']))
+        self.add_strings(attributes['lines'])
+        if matches is not None:
+            self.add_strings([s for item in matches.items() for s in item])
+        if kind == DIRECTIVE or kind == COMPLEX_DIRECTIVE:
+            records.append(self.get_string_id(attributes['_name']))
+            self.add_strings(attributes['_arguments'].items)
+        if kind == COMPLEX_DIRECTIVE:
+            self.add(attributes['header'])
+            self.add(attributes['body'])
+            records.append(self.get_string_id(attributes['tail']))
+        elif kind == COMPLEX_NODE:
+            candidates = attributes['candidates']
+            records.append(len(candidates))
+            records.extend(self.get_class_id(c) for c in candidates)
+            if 'source' in attributes:
+                self.add_strings(list(attributes['source']))
+            children = attributes['nodes'].items
+            records.append(len(children))
+            for child in children:
+                self.add(child)
+
+    def add_value(self, values, value):
+        """Append the encoding of the value of an extra attribute to values."""
+        if value is None:
+            values.append(NONE_VALUE)
+        elif value is True or value is False:
+            values.append(TRUE_VALUE if value else FALSE_VALUE)
+        elif isinstance(value, int):
+            values.extend([INT_VALUE, self.get_string_id(str(value))])
+        elif isinstance(value, str):
+            values.extend([STR_VALUE, self.get_string_id(value)])
+        elif isinstance(value, (list, tuple)):
+            values.extend([LIST_VALUE if isinstance(value, list) else TUPLE_VALUE, len(value)])
+            for item in value:
+                self.add_value(values, item)
+        elif isinstance(value, dict):
+            values.extend([DICT_VALUE, len(value)])
+            for item in value.items():
+                self.add_value(values, item[0])
+                self.add_value(values, item[1])
+        elif isinstance(value, Node):
+            number = self.numbers.get(id(value))
+            if number is None:
+                number = self.count
+                self.roots += 1
+                self.add(value)
+            values.extend([NODE_VALUE, number])
+        elif get_class_name(type(value)) in OBJECT_CLASSES:
+            values.extend([OBJECT_VALUE, self.get_class_id(type(value))])
+            self.add_value(values, value.__dict__)
+        else:
+            raise ValueError("Attributes of type %s can't be encoded: %r" % (type(value).__name__, value))
+
+    def getvalue(self):
+        values = array(INT32)
+        count = 0
+        # encoding a node adds it, and its extra attributes, to the ones still to encode
+        while count < len(self.extras):
+            number, extras = self.extras[count]
+            count += 1
+            values.extend([number, len(extras)])
+            for key, value in extras.items():
+                values.append(self.get_string_id(key))
+                self.add_value(values, value)
+        classes = [get_class_name(c) for c in self.classes]
+        strings = "\n".join([str(len(classes))] + classes + self.strings).encode('utf-8')
+        records = array(INT32, self.records)
+        extras = array(INT32, [self.roots, count]) + values if count else array(INT32)
+        if sys.byteorder != 'little':
+            records.byteswap()
+            extras.byteswap()
+        records = records.tobytes()
+        extras = extras.tobytes()
+        return b''.join([HEADER.pack(MAGIC, VERSION, len(strings), len(records), len(extras)), strings, records, extras])
+
+
+class BinaryReader(object):
+    """Decode the output of BinaryWriter back into nodes; see load_binary."""
+
+    def __init__(self, data):
+        data = memoryview(data)
+        if len(data) < HEADER.size:
+            raise ValueError("Not a binary apache_conf_parser tree: too short.")
+        magic, version, strings_size, records_size, extras_size = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a binary apache_conf_parser tree.")
+        if version != VERSION:
+            raise ValueError("Unsupported binary tree version %s, expected %s." % (version, VERSION))
+        if records_size % 4 or extras_size % 4 or HEADER.size + strings_size + records_size + extras_size > len(data):
+            raise ValueError("Truncated or corrupt binary apache_conf_parser tree.")
+        offset = HEADER.size
+        table = str(data[offset:offset + strings_size], 'utf-8').split("\n")
+        offset += strings_size
+        class_count = int(table[0])
+        node_classes = get_node_classes()
+        self.classes = [load_class(name, node_classes) for name in table[1:class_count + 1]]
+        self.kinds = [get_kind(c) for c in self.classes]
+        # string id -1 stands for None
+        self.strings = table[class_count + 1:] + [None]
+        records = array(INT32)
+        records.frombytes(data[offset:offset + records_size])
+        if sys.byteorder != 'little':
+            records.byteswap()
+        offset += records_size
+        self.records = iter(records.tolist())
+        # number of the next record, in document order
+        self.position = 0
+        extras = array(INT32)
+        extras.frombytes(data[offset:offset + extras_size])
+        if sys.byteorder != 'little':
+            extras.byteswap()
+        self.extras = iter(extras.tolist())
+        # the nodes by record number, only kept when some have extra attributes
+        self.nodes = {} if extras_size else None
+
+    def read_strings(self):
+        take = self.records.__next__
+        count = take()
+        # most lists hold zero or one string: avoid building an islice for them
+        if count == 0:
+            return []
+        if count == 1:
+            return [self.strings[take()]]
+        return list(map(self.strings.__getitem__, islice(self.records, count)))
+
+    def read(self):
+        records = self.records
+        take = records.__next__
+        strings = self.strings
+        read_strings = self.read_strings
+        number = self.position
+        self.position = number + 1
+        class_id, flags, content_id = take(), take(), take()
+        node_cls = self.classes[class_id]
+        kind = self.kinds[class_id]
+        attributes = {
+            'lines': read_strings(),
+            '_content': strings[content_id],
+            '_complete': bool(flags & COMPLETE),
+            'changed': bool(flags & CHANGED),
+        }
+        if flags & NO_MATCHES:
+            attributes['_matches'] = None
+        else:
+            items = read_strings()
+            attributes['_matches'] = dict(zip(items[::2], items[1::2]))
+        if kind == DIRECTIVE or kind == COMPLEX_DIRECTIVE:
+            attributes['_name'] = strings[take()]
+            arguments = ArgumentList.__new__(ArgumentList)
+            arguments.items = read_strings()
+            attributes['_arguments'] = arguments
+            attributes['_stable'] = bool(flags & STABLE)
+        if kind == COMPLEX_DIRECTIVE:
+            attributes['header'] = self.read()
+            attributes['body'] = self.read()
+            attributes['tail'] = strings[take()]
+            attributes['tailmatch'] = bool(flags & TAILMATCH)
+        elif kind == COMPLEX_NODE:
+            candidates = tuple(map(self.classes.__getitem__, islice(records, take())))
+            attributes['candidates'] = candidates
+            attributes['dispatcher'] = NodeDispatcher.for_candidates(candidates, node_cls.registry)
+            attributes['_sections'] = []
+            if flags & HAS_SOURCE:
+                attributes['source'] = read_strings()
+            nodes = NodeList.__new__(NodeList)
+            nodes.__dict__ = {'_open': [], 'items': [self.read() for _ in range(take())]}
+            attributes['nodes'] = nodes
+        node = node_cls.__new__(node_cls)
+        node.__dict__ = attributes
+        if self.nodes is not None:
+            self.nodes[number] = node
+        return node
+
+    def read_value(self):
+        take = self.extras.__next__
+        kind = take()
+        if kind == NONE_VALUE:
+            return None
+        if kind == FALSE_VALUE or kind == TRUE_VALUE:
+            return kind == TRUE_VALUE
+        if kind == INT_VALUE:
+            return int(self.strings[take()])
+        if kind == STR_VALUE:
+            return self.strings[take()]
+        if kind == LIST_VALUE or kind == TUPLE_VALUE:
+            items = [self.read_value() for _ in range(take())]
+            return items if kind == LIST_VALUE else tuple(items)
+        if kind == DICT_VALUE:
+            value = {}
+            for _ in range(take()):
+                key = self.read_value()
+                value[key] = self.read_value()
+            return value
+        if kind == NODE_VALUE:
+            return self.nodes[take()]
+        if kind == OBJECT_VALUE:
+            cls = self.classes[take()]
+            if get_class_name(cls) not in OBJECT_CLASSES:
+                raise ValueError("Not an attribute class: %s" % get_class_name(cls))
+            value = cls.__new__(cls)
+            value.__dict__ = self.read_value()
+            return value
+        raise ValueError("Unknown attribute type %s." % kind)
+
+    def read_tree(self):
+        """Read the tree, then the nodes only referred to by attributes, and set the extra attributes of the nodes."""
+        tree = self.read()
+        if self.nodes is None:
+            return tree
+        take = self.extras.__next__
+        for _ in range(take()):
+            self.read()
+        for _ in range(take()):
+            node = self.nodes[take()]
+            for _ in range(take()):
+                key = self.strings[take()]
+                node.__dict__[key] = self.read_value()
+        return tree
+
+
+def dump_binary(tree):
+    """
+    Encode a complete tree (an ApacheConfParser or any other node) as bytes.
+
+    The format is versioned and holds a table of unique strings and one record per node with its lines, matches,
+    name and arguments, so load_binary rebuilds an equal tree, with the same original lines, without parsing it
+    again. Lazy nodes are materialized first. Other instance attributes are encoded as described in BinaryWriter;
+    ValueError is raised for values of other types.
+
+    """
+    writer = BinaryWriter()
+    writer.add(tree)
+    return writer.getvalue()
+
+
+def load_binary(data):
+    """
+    Rebuild the tree encoded by dump_binary from bytes (or any buffer). Raises ValueError for other data.
+
+    Nothing is unpickled, and classes are only looked up among the node classes already defined or registered as
+    directive classes (plus OBJECT_CLASSES), so loading data never imports other modules or runs other code. Data
+    from an untrusted source can still hold any tree, e.g. one that doesn't match its own lines.
+
+    """
+    reader = BinaryReader(data)
+    # the nodes are all new and alive: spare the cyclic garbage collector from scanning them repeatedly meanwhile
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return reader.read_tree()
+    finally:
+        if enabled:
+            gc.enable()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+import hashlib
+import io
+import os
+import tempfile
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.binary import VERSION as BINARY_VERSION, dump_binary, load_binary
+
+# Version of the cache entries, part of their key: entries written with another version are ignored. Bump it whenever
+# the layout of entries or the trees they rebuild change, e.g. when nodes gain or lose attributes, as the package
+# version isn't bumped for such changes. Changes to the binary format bump binary.VERSION, also part of the key.
+FORMAT = 3
+
+
+def parse_data(data, lazy=False):
+    """
+    Parse the bytes of a configuration file, decoded as ApacheConfParser(path) would decode the file. The lazy flag
+    works as for ApacheConfParser.
+
+    """
+    tree = ApacheConfParser("", infile=False, delay=True, lazy=lazy)
+    tree.source = [line.strip("\n") for line in io.TextIOWrapper(io.BytesIO(data)).readlines()]
+    tree.parse()
+    return tree
+
+
+def get_default_directory():
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'apache_conf_parser')
+
+
+class ParseCache(object):
+    """
+    On-disk cache of parsed configuration files.
+
+    Each file has one entry, named after its absolute path, holding a line with the cache FORMAT, the file's size,
+    mtime and content hash followed by the tree in the binary format of dump_binary. An entry is only used when its
+    first line still matches the file, and loading it rebuilds the tree without any tokenizing or regex matching.
+    Entries are written to a temporary file and moved into place with os.replace, so several processes can share a
+    cache directory: readers see either the old or the new entry, never a partial one, and unreadable entries count
+    as misses.
+
+    Entries are evicted least recently used first once the directory holds more than max_size bytes; using an
+    entry refreshes its mtime. Loading an entry runs no code (see load_binary), but the cache directory should still
+    only be writable by trusted users, who could otherwise make the cache return any tree for a file.
+
+    """
+    def __init__(self, directory=None, max_size=64 * 1024 * 1024):
+        self.directory = directory or get_default_directory()
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+    def get_entry_path(self, path):
+        return os.path.join(self.directory, hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest())
+
+    @staticmethod
+    def get_key(stat, data):
+        """Return the first line of the entry of a file, which must be unchanged for the entry to be used."""
+        return ("%s %s %s %s %s\n" % (
+            FORMAT, BINARY_VERSION, stat.st_size, stat.st_mtime_ns, hashlib.blake2b(data).hexdigest())).encode('ascii')
+
+    def parse(self, path):
+        """Return the parsed tree of path, from the cache if the file is unchanged."""
+        with open(path, 'rb') as conf:
+            stat = os.fstat(conf.fileno())
+            data = conf.read()
+        key = self.get_key(stat, data)
+        entry_path = self.get_entry_path(path)
+        tree = self.load(entry_path, key)
+        if tree is not None:
+            self.hits += 1
+            return tree
+        self.misses += 1
+        # parse the bytes that were hashed, in case the file changes meanwhile
+        tree = parse_data(data)
+        self.store(entry_path, key, tree)
+        return tree
+
+    def load(self, entry_path, key):
+        try:
+            with open(entry_path, 'rb') as entry:
+                if entry.readline() != key:
+                    return None
+                tree = load_binary(entry.read())
+        except Exception:
+            # a missing or corrupt entry, or one written by an incompatible version
+            return None
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return tree
+
+    def store(self, entry_path, key, tree):
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(handle, 'wb') as entry:
+                entry.write(key)
+                entry.write(dump_binary(tree))
+            os.replace(temp_path, entry_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.evict()
+
+    def iter_entries(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith('.tmp-'):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            yield entry.path, stat
+
+    def evict(self):
+        """Remove the least recently used entries until the cache holds at most max_size bytes."""
+        entries = list(self.iter_entries())
+        size = sum(stat.st_size for _, stat in entries)
+        if size <= self.max_size:
+            return
+        for entry_path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime_ns):
+            try:
+                os.unlink(entry_path)
+            except FileNotFoundError:
+                continue
+            size -= stat.st_size
+            if size <= self.max_size:
+                break
+
+    def clear(self):
+        for entry_path, _ in self.iter_entries():
+            try:
+                os.unlink(entry_path)
+            except FileNotFoundError:
+                pass
+
+
+_default_cache = None
+
+
+def parse_cached(path, cache=None):
+    """Parse path through cache, by default a ParseCache in the user's cache directory shared by every call."""
+    global _default_cache
+    if cache is None:
+        if _default_cache is None:
+            _default_cache = ParseCache()
+        cache = _default_cache
+    return cache.parse(path)
@@ -0,0 +1,350 @@
+#!/usr/bin/env python
+from array import array
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.directives import Directive
+from apache_conf_parser.nodes import Node
+from apache_conf_parser.nodes.blank_node import BlankNode
+
+COMMENT, BLANK, DIRECTIVE, SECTION = range(4)
+
+
+class ColumnarTree(object):
+    """
+    Read-only configuration tree stored as parallel arrays, for analysing many configurations at once.
+
+    Nodes are numbered in document (pre-order) order and described by the arrays kinds, class_ids (into
+    node_classes), name_ids (into strings, -1 for nodes without a name), parents, first_children, last_children and
+    subtree_ends (one past the last node of a node's subtree), line_starts, header_ends and line_ends (line numbers;
+    the header ends where the body of a section starts) and arg_offsets (arguments of node i are
+    arg_ids[arg_offsets[i]:arg_offsets[i + 1]], ids into strings). The source is kept as a single string indexed by
+    line_offsets. ColumnarNode gives a Node-like view of a single node.
+
+    """
+    # built from complete nodes only
+    complete = True
+    stable = True
+
+    def __init__(self):
+        self.kinds = array('b')
+        self.class_ids = array('h')
+        self.name_ids = array('l')
+        self.parents = array('l')
+        self.first_children = array('l')
+        self.last_children = array('l')
+        self.subtree_ends = array('l')
+        self.line_starts = array('l')
+        self.header_ends = array('l')
+        self.line_ends = array('l')
+        self.arg_offsets = array('l', [0])
+        self.arg_ids = array('l')
+        self.line_offsets = array('l', [0])
+        self.node_classes = []
+        self.strings = []
+        self.text = ""
+        self._string_ids = {}
+        self._class_ids = {}
+        self._lines = []
+
+    @classmethod
+    def from_nodes(cls, nodes):
+        """Build a tree from complete top-level nodes, e.g. ApacheConfParser.nodes or ApacheConfParser.iter_parse()."""
+        tree = cls()
+        for node in nodes:
+            tree._append(node, -1)
+        tree._finish()
+        return tree
+
+    @classmethod
+    def from_tree(cls, tree):
+        return cls.from_nodes(tree.nodes)
+
+    def to_tree(self):
+        """Return the equivalent regular ApacheConfParser tree."""
+        parser = ApacheConfParser("", infile=False, delay=True)
+        parser.source = self.get_lines(0, len(self.line_offsets) - 1)
+        parser.parse()
+        return parser
+
+    def _get_string_id(self, value):
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def _append(self, node, parent):
+        index = len(self.kinds)
+        node_cls = type(node)
+        class_id = self._class_ids.get(node_cls)
+        if class_id is None:
+            class_id = self._class_ids[node_cls] = len(self.node_classes)
+            self.node_classes.append(node_cls)
+        section = getattr(node_cls, 'complex', False)
+        if section:
+            kind = SECTION
+        elif isinstance(node, Directive):
+            kind = DIRECTIVE
+        elif isinstance(node, BlankNode):
+            kind = BLANK
+        else:
+            kind = COMMENT
+        self.kinds.append(kind)
+        self.class_ids.append(class_id)
+        self.name_ids.append(-1 if node.name is None else self._get_string_id(node.name))
+        self.parents.append(parent)
+        self.first_children.append(-1)
+        self.last_children.append(-1)
+        self.subtree_ends.append(-1)
+        self.line_starts.append(len(self._lines))
+        self.line_ends.append(-1)
+        if kind >= DIRECTIVE:
+            self.arg_ids.extend(self._get_string_id(arg) for arg in node.arguments)
+        self.arg_offsets.append(len(self.arg_ids))
+
+        if section:
+            self._lines.extend(node.lines)
+            self.header_ends.append(len(self._lines))
+            for child in node.body.nodes:
+                child_index = self._append(child, index)
+                if self.first_children[index] == -1:
+                    self.first_children[index] = child_index
+                self.last_children[index] = child_index
+            self._lines.append(node.tail)
+        else:
+            self._lines.extend(str(node).split("\n"))
+            self.header_ends.append(len(self._lines))
+        self.line_ends[index] = len(self._lines)
+        self.subtree_ends[index] = len(self.kinds)
+        return index
+
+    def _finish(self):
+        self.text = "\n".join(self._lines)
+        offset = 0
+        for line in self._lines:
+            offset += len(line) + 1
+            self.line_offsets.append(offset)
+        self._lines = []
+        self._string_ids = {}
+        self._class_ids = {}
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return ColumnarNode(self, index % len(self))
+
+    def __iter__(self):
+        """Iterate over every node, in document order."""
+        for index in range(len(self)):
+            yield ColumnarNode(self, index)
+
+    @property
+    def nodes(self):
+        """The top-level nodes."""
+        return [ColumnarNode(self, index) for index in self.iter_children(-1)]
+
+    def iter_children(self, index):
+        """Yield the indices of the children of node index (-1 for the root)."""
+        if index == -1:
+            child, last = (0, len(self) - 1) if len(self) else (-1, -1)
+        else:
+            child, last = self.first_children[index], self.last_children[index]
+        if child == -1:
+            return
+        subtree_ends = self.subtree_ends
+        while child <= last:
+            yield child
+            child = subtree_ends[child]
+
+    def get_lines(self, start, end):
+        offsets = self.line_offsets
+        return self.text[offsets[start]:offsets[end] - 1].split("\n") if end > start else []
+
+    def find(self, name, kind=None):
+        """Return the nodes named name (case-insensitively, as Apache does), in document order."""
+        folded = name.lower()
+        string_ids = set(i for i, value in enumerate(self.strings) if value.lower() == folded)
+        if not string_ids:
+            return []
+        kinds = self.kinds
+        return [
+            ColumnarNode(self, index) for index, name_id in enumerate(self.name_ids)
+            if name_id in string_ids and (kind is None or kinds[index] == kind)
+        ]
+
+
+class ColumnarNode(object):
+    """A Node-like view of one node of a ColumnarTree; sections have a header, body and tail, as ComplexDirective."""
+    __slots__ = ('tree', 'index')
+
+    indent_str = Node.indent_str
+
+    complete = True
+    stable = True
+
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+
+    @property
+    def kind(self):
+        return self.tree.kinds[self.index]
+
+    @property
+    def node_class(self):
+        return self.tree.node_classes[self.tree.class_ids[self.index]]
+
+    @property
+    def name(self):
+        name_id = self.tree.name_ids[self.index]
+        return None if name_id == -1 else self.tree.strings[name_id]
+
+    @property
+    def arguments(self):
+        tree = self.tree
+        strings = tree.strings
+        return tuple(strings[i] for i in tree.arg_ids[tree.arg_offsets[self.index]:tree.arg_offsets[self.index + 1]])
+
+    @property
+    def parent(self):
+        parent = self.tree.parents[self.index]
+        return None if parent == -1 else ColumnarNode(self.tree, parent)
+
+    @property
+    def nodes(self):
+        return [ColumnarNode(self.tree, index) for index in self.tree.iter_children(self.index)]
+
+    @property
+    def lines(self):
+        """The node's own lines (the header lines for a section), as in Node.lines."""
+        return self.tree.get_lines(self.tree.line_starts[self.index], self.tree.header_ends[self.index])
+
+    @property
+    def header(self):
+        if self.kind != SECTION:
+            raise AttributeError('No attribute named: header')
+        return ColumnarHeader(self)
+
+    @property
+    def body(self):
+        if self.kind != SECTION:
+            raise AttributeError('No attribute named: body')
+        return ColumnarBody(self)
+
+    @property
+    def tail(self):
+        if self.kind != SECTION:
+            raise AttributeError('No attribute named: tail')
+        return self.tree.get_lines(self.tree.line_ends[self.index] - 1, self.tree.line_ends[self.index])[0]
+
+    @property
+    def matches(self):
+        """The node class's matches for the node's lines, computed on every access."""
+        matches = None
+        for line in self.lines:
+            for pattern in self.node_class.get_match_patterns():
+                match = pattern.match(line)
+                if match:
+                    matches = match.groupdict()
+                    break
+        return matches
+
+    def __getattr__(self, attribute_name):
+        matches = self.matches
+        if matches is not None and attribute_name in matches:
+            return matches[attribute_name]
+        raise AttributeError('No attribute named: %s' % attribute_name)
+
+    def __str__(self):
+        return "\n".join(self.tree.get_lines(self.tree.line_starts[self.index], self.tree.line_ends[self.index]))
+
+    def __repr__(self):
+        return "<%s Columnar node %s>" % (self.name, self.index)
+
+    def __eq__(self, other):
+        return isinstance(other, ColumnarNode) and self.tree is other.tree and self.index == other.index
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((id(self.tree), self.index))
+
+    def dumps(self, depth=0):
+        leading_indent_str = self.indent_str * depth
+        kind = self.kind
+        if kind == BLANK:
+            return ""
+        if kind == COMMENT:
+            return "%s%s" % (leading_indent_str, str(self).lstrip())
+        if kind == DIRECTIVE:
+            return "%s%s %s" % (leading_indent_str, self.name, " ".join(self.arguments))
+        nodes = self.nodes
+        return "{indent_str}<{name} {arguments}>\n{body}{subnodes}{indent_str}</{name}>".format(
+            indent_str=leading_indent_str,
+            name=self.name,
+            arguments=" ".join(self.arguments),
+            body="\n".join(node.dumps(depth + 1) for node in nodes),
+            subnodes="\n" if nodes else "",
+        )
+
+    def to_node(self):
+        """Return the regular node equivalent to this one."""
+        tree = self.tree
+        return next(ApacheConfParser.iter_parse(tree.get_lines(tree.line_starts[self.index], tree.line_ends[self.index])))
+
+
+class ColumnarHeader(object):
+    """The header of a section of a ColumnarTree, as ComplexDirective.header: the section's name and arguments."""
+    __slots__ = ('section',)
+
+    complete = True
+    stable = True
+
+    def __init__(self, section):
+        self.section = section
+
+    @property
+    def name(self):
+        return self.section.name
+
+    @property
+    def arguments(self):
+        return self.section.arguments
+
+    def __str__(self):
+        return "\n".join(self.section.lines)
+
+    def dumps(self, depth=0):
+        return "%s%s %s" % (self.section.indent_str * depth, self.name, " ".join(self.arguments))
+
+
+class ColumnarBody(object):
+    """The body of a section of a ColumnarTree, as ComplexDirective.body: the section's nodes."""
+    __slots__ = ('section',)
+
+    complete = True
+    stable = True
+
+    def __init__(self, section):
+        self.section = section
+
+    @property
+    def nodes(self):
+        return self.section.nodes
+
+    def __str__(self):
+        tree = self.section.tree
+        index = self.section.index
+        return "\n".join(tree.get_lines(tree.header_ends[index], tree.line_ends[index] - 1))
+
+    def dumps(self, depth=0):
+        return "\n".join(node.dumps(depth) for node in self.nodes)
+
+
+def parse_columnar(source):
+    """Parse a path or an iterable of lines straight into a ColumnarTree, one top-level node at a time."""
+    return ColumnarTree.from_nodes(ApacheConfParser.iter_parse(source))
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+import sys
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.directives import Directive
+from apache_conf_parser.nodes import Node
+from apache_conf_parser.directives.simple_directive import SimpleDirective
+from apache_conf_parser.nodes.blank_node import BlankNode
+
+EMPTY = ()
+
+
+class CompactNode(object):
+    """
+    Read-only, compact counterpart of a parsed node, for holding large configurations in memory.
+
+    Compact nodes use __slots__ instead of a per-instance __dict__, keep their source lines as one string, store
+    arguments and children as tuples (sharing a single empty tuple) and intern directive names. They keep the read
+    API of the regular nodes (name, arguments, matches and matched attributes, complete, stable, str() and dumps(),
+    plus nodes, header, body and tail for sections) and compare like Node.__eq__ does: every parsed attribute but the
+    raw lines must be equal.
+
+    This class itself represents comments and any other node that isn't a directive.
+
+    """
+    __slots__ = ('node_class', 'source', 'matches')
+
+    indent_str = Node.indent_str
+
+    # compact nodes are built from complete nodes only
+    complete = True
+    stable = True
+
+    def __init__(self, node_class, source, matches=None):
+        self.node_class = node_class
+        self.source = source
+        self.matches = matches
+
+    @property
+    def name(self):
+        return None
+
+    @property
+    def lines(self):
+        return self.source.split("\n")
+
+    def __getattr__(self, attribute_name):
+        if attribute_name != 'matches' and self.matches is not None and attribute_name in self.matches:
+            return self.matches[attribute_name]
+        raise AttributeError('No attribute named: %s' % attribute_name)
+
+    def __str__(self):
+        return self.source
+
+    def dumps(self, depth=0):
+        return "%s%s" % (self.indent_str * depth, self.source.lstrip())
+
+    def key(self):
+        """The attributes compared by __eq__."""
+        return self.node_class, self.matches
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.key() == other.key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+
+class CompactBlank(CompactNode):
+    __slots__ = ()
+
+    def dumps(self, depth=0):
+        return ""
+
+
+class CompactDirective(CompactNode):
+    __slots__ = ('name', 'arguments')
+
+    def __init__(self, node_class, source, matches, name, arguments):
+        super(CompactDirective, self).__init__(node_class, source, matches)
+        self.name = sys.intern(name)
+        self.arguments = tuple(arguments) or EMPTY
+
+    def __repr__(self):
+        return "<%s Directive at %s>" % (self.name, id(self))
+
+    def dumps(self, depth=0):
+        return "%s%s %s" % (self.indent_str * depth, self.name, " ".join(self.arguments))
+
+    def key(self):
+        return self.node_class, self.matches, self.name, self.arguments
+
+
+class CompactSection(CompactDirective):
+    """A complex directive; source holds the header lines only, and nodes the nodes of its body."""
+    __slots__ = ('nodes', 'tail')
+
+    def __init__(self, node_class, source, matches, name, arguments, nodes, tail):
+        super(CompactSection, self).__init__(node_class, source, matches, name, arguments)
+        self.nodes = tuple(nodes) or EMPTY
+        self.tail = tail
+
+    @property
+    def header(self):
+        """The header, as a directive with the section's name and arguments."""
+        return CompactDirective(SimpleDirective, self.source, None, self.name, self.arguments)
+
+    @property
+    def body(self):
+        """The body, as a CompactTree of the section's nodes."""
+        return CompactTree(self.nodes)
+
+    def __str__(self):
+        return "%s\n%s%s%s" % (
+            self.source,
+            "\n".join(str(node) for node in self.nodes),
+            "\n" if self.nodes else "",
+            self.tail,
+        )
+
+    def dumps(self, depth=0):
+        leading_indent_str = self.indent_str * depth
+        return "{indent_str}<{name}{arguments}>\n{body}{subnodes}{indent_str}</{name}>".format(
+            indent_str=leading_indent_str,
+            name=self.name,
+            arguments=" " + " ".join(self.arguments),
+            body="\n".join(node.dumps(depth + 1) for node in self.nodes),
+            subnodes="\n" if self.nodes else "",
+        )
+
+    def key(self):
+        return self.node_class, self.matches, self.name, self.arguments, self.nodes, self.tail
+
+
+class CompactTree(object):
+    """The root of a compact configuration, or the body of a CompactSection, as ComplexNode is for regular trees."""
+    __slots__ = ('nodes',)
+
+    complete = True
+    stable = True
+
+    def __init__(self, nodes):
+        self.nodes = tuple(nodes) or EMPTY
+
+    def __str__(self):
+        return "\n".join(str(node) for node in self.nodes)
+
+    def dumps(self, depth=0):
+        return "\n".join(node.dumps(depth) for node in self.nodes)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.nodes == other.nodes
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def expand(self):
+        """Return the equivalent regular ApacheConfParser tree."""
+        parser = ApacheConfParser("", infile=False, delay=True)
+        parser.source = str(self).split("\n") if self.nodes else []
+        parser.parse()
+        return parser
+
+
+def compact_node(node):
+    """Return the compact equivalent of a parsed node."""
+    matches = node.matches or None
+    if getattr(type(node), 'complex', False):
+        source = "\n".join(node.lines)
+        return CompactSection(
+            type(node), source, matches, node.name, node.arguments, [compact_node(child) for child in node.body.nodes],
+            node.tail)
+    source = str(node)
+    if isinstance(node, Directive):
+        return CompactDirective(type(node), source, matches, node.name, node.arguments)
+    if isinstance(node, BlankNode):
+        return CompactBlank(type(node), source, matches)
+    return CompactNode(type(node), source, matches)
+
+
+def compact(tree):
+    """Return the CompactTree equivalent of a complete ComplexNode (e.g. an ApacheConfParser)."""
+    return CompactTree(compact_node(node) for node in tree.nodes)
+
+
+def parse_compact(source):
+    """
+    Parse a path or an iterable of lines straight into a CompactTree. Top-level nodes are compacted as soon as they
+    are complete, so the regular nodes of only one top-level section are alive at a time.
+
+    """
+    return CompactTree(compact_node(node) for node in ApacheConfParser.iter_parse(source))
@@ -25,14 +25,20 @@ class Directive(Node):
 
     @property
     def arguments(self):
+        if self.lazy:
+            self.materialize()
         return self._arguments
 
     @property
     def name(self):
+        if self.lazy:
+            self.materialize()
         return self._name
 
     @name.setter
     def name(self, value):
+        if self.lazy:
+            self.materialize()
         if self._name is not None:
             raise DirectiveError("Name is already set.  Cannot set to %s" % value)
         if not re.match(self.name_regexp, value):
@@ -60,7 +66,7 @@ class Directive(Node):
 
     @property
     def content(self):
-        if self._name is None:
+        if self.name is None:
             raise NodeCompleteError("Name has not been set yet.")
         name = self.name if not self.arguments else self.name + " "
         return "%s%s" % (name, " ".join(arg for arg in self.arguments))
@@ -71,6 +77,9 @@ class Directive(Node):
     def parse_directive_header(self, line):
         if self.complete:
             raise NodeCompleteError("Cannot add to the header of a complete directive.")
+        self.parse_header_line(line)
+
+    def parse_header_line(self, line):
         if not line:
             raise DirectiveError("An empty line is not a valid header line.")
         stable = True
@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 import re
+from functools import lru_cache
 
 from apache_conf_parser.directives import Directive
 from apache_conf_parser.directives.simple_directive import SimpleDirective
@@ -8,11 +9,18 @@ from apache_conf_parser.nodes import Node
 from apache_conf_parser.nodes.complex_node import ComplexNode
 
 
+@lru_cache(maxsize=None)
+def get_tail_pattern(name):
+    """Return the compiled closing tag pattern for directives with the given name."""
+    return re.compile(r"\s*<\/%s>\s*$" % re.escape(name))
+
+
 class ComplexDirective(Directive):
     is_node_candidate = True
     complex = True
 
     match_regexp = r"\s*<\s*%s(\s+[^>]*)*\s*(>\s*|[\\])$" % Directive.name_regexp
+    first_chars = frozenset("<")
 
     def __init__(self, body_class=None):
         super(ComplexDirective, self).__init__()
@@ -25,7 +33,7 @@ class ComplexDirective(Directive):
 
     @staticmethod
     def get_node_candidates():
-        return [cls for cls in Node.get_subclasses() if cls != ComplexNode]
+        return Node.get_candidates(exclude=ComplexNode)
 
     @property
     def name(self):
@@ -57,7 +65,7 @@ class ComplexDirective(Directive):
 
     def parse_header(self, line):
         try:
-            super(ComplexDirective, self).add_line(line)
+            self.store_line(line)
         except NodeCompleteError:
             pass
         if ">" in line:
@@ -79,6 +87,15 @@ class ComplexDirective(Directive):
         if ">" in line:
             self.header.complete = True
 
+    def is_tail(self, line):
+        """Check whether line closes this directive. Only meaningful once the header is complete."""
+        return bool(get_tail_pattern(self.name).match(line))
+
+    def close(self, line):
+        self.body.complete = True
+        self.tail = line
+        self.tailmatch = True
+
     def add_line(self, line, depth=0):
         # base case
         if self.complete:
@@ -87,22 +104,14 @@ class ComplexDirective(Directive):
         # first we need a header
         if not self.header.complete:
             self.parse_header(line)
-        # then the body
-        elif not self.body.stable and not re.match("\s*<\/%s>\s*$" % self.name, line):
-            self.body.add_line(line, depth + 1)
-        # check for the closing tag / tail
-        elif re.match("\s*<\/%s>\s*$" % self.name, line):
-            try:
-                self.body.complete = True
-                self.tail = line
-                self.tailmatch = True
-            except NodeCompleteError as err:
-                self.body.add_line(line, depth + 1)
-        # if we haven't found the closing tag / tail, keep adding to the body
-        elif not self.body.complete:
-            self.body.add_line(line, depth + 1)
-        else:
+        # then the closing tag / tail, once nothing in the body is waiting for more lines
+        elif self.body.stable and self.is_tail(line):
+            self.close(line)
+        elif self.body.complete:
             raise InvalidLineError("Expecting closing tag. Got: %s" % line)
+        # otherwise the line belongs to the body, which handles any sections nested in it
+        else:
+            self.body.add_line(line, depth + 1)
 
     def __str__(self):
         if not self.lines:
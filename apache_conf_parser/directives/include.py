@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+
+from apache_conf_parser.directives.simple_directive import SimpleDirective
+
+
+class Include(SimpleDirective):
+    contexts = [
+        'server_config',
+        'virtual_host',
+        'directory',
+    ]
+    apache_module = 'core'
+    keyword = 'Include'
+    description = 'Includes other configuration files from within the server configuration files'
+    match_regexp = r'(?i)^\s*Include\s+(?P<file_path>.*?)\s*$'
+
+    # Whether a path or wildcard matching no file is an error (see IncludeOptional).
+    optional = False
+
+    def __init__(self):
+        super(Include, self).__init__()
+        # the trees of the included files, in inclusion order, once resolved by an IncludeResolver
+        self.included = None
+
+    @property
+    def file_path(self):
+        path = " ".join(self.arguments)
+        if len(path) > 1 and path[0] == path[-1] and path[0] in "\"'":
+            path = path[1:-1]
+        return path
+
+
+class IncludeOptional(Include):
+    keyword = 'IncludeOptional'
+    description = 'Includes other configuration files from within the server configuration files, ignoring ' \
+                  'paths and wildcards that match no file'
+    match_regexp = r'(?i)^\s*IncludeOptional\s+(?P<file_path>.*?)\s*$'
+    optional = True
@@ -11,6 +11,7 @@ class Redirect(SimpleDirective):
         '.htaccess'
     ]
     apache_module = 'mod_alias'
+    keyword = 'Redirect'
     description = 'Sends an external redirect asking the client to fetch a different URL'
     match_regexp = [
         r'^\s*Redirect\s+(?P<status>.*)\s+(?P<url_path>[^ ]*)\s+(?P<url>.*?)\s*$',
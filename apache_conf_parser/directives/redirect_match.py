@@ -11,5 +11,6 @@ class RedirectMatch(SimpleDirective):
         '.htaccess'
     ]
     apache_module = 'mod_alias'
+    keyword = 'RedirectMatch'
     description = 'Sends an external redirect based on a regular expression match of the current URL'
     match_regexp = r'\s*RedirectMatch\s*(?P<status>[^ ]*)?\s+(?P<regex>[^ ]*)\s+(?P<url>.*)$'
@@ -11,5 +11,6 @@ class RedirectPermanent(SimpleDirective):
         '.htaccess'
     ]
     apache_module = 'mod_alias'
+    keyword = 'RedirectPermanent'
     description = 'Sends an external permanent redirect asking the client to fetch a different URL'
     match_regexp = r'^\s*RedirectPermanent\s+(?P<url_path>[^ ]*)\s+(?P<url>.*?)\s*$'
@@ -9,5 +9,6 @@ class RewriteBase(SimpleDirective):
         '.htaccess'
     ]
     apache_module = 'mod_rewrite'
+    keyword = 'RewriteBase'
     description = 'Sets the base URL for per-directory rewrites'
     match_regexp = r'\s*RewriteBase\s+(?P<url_path>[^ ]+)\s*$'
@@ -11,6 +11,7 @@ class RewriteCond(SimpleDirective):
         '.htaccess'
     ]
     apache_module = 'mod_rewrite'
+    keyword = 'RewriteCond'
     description = 'Defines a condition under which rewriting will take place'
 
     match_regexp = r'\s*RewriteCond\s+(?P<teststring>[^ ]*)\s+(?P<condpattern>[^ ]*)\s*\[?(?P<flags>[^] ]*)?\]?$'
@@ -11,6 +11,7 @@ class RewriteEngine(SimpleDirective):
         '.htaccess'
     ]
     apache_module = 'mod_rewrite'
+    keyword = 'RewriteEngine'
     description = 'Enables or disables runtime rewriting engine'
 
     match_regexp = r'\s*RewriteEngine\s+(?P<status>(on|off))\s*$'
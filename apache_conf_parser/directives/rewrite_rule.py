@@ -11,6 +11,7 @@ class RewriteRule(SimpleDirective):
         '.htaccess'
     ]
     apache_module = 'mod_rewrite'
+    keyword = 'RewriteRule'
     description = 'Defines rules for the rewriting engine'
     match_regexp = r'\s*RewriteRule\s+(?P<pattern>[^ ]*)\s+(?P<substitution>[^ ]*)\s*\[?(?P<flags>[^] ]*)?\]?$'
 
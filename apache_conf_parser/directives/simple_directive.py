@@ -1,20 +1,39 @@
 #!/usr/bin/env python
+from string import ascii_letters
 
 from apache_conf_parser.directives import Directive
 from apache_conf_parser.exceptions import DirectiveError, NodeCompleteError, InvalidLineError
+from apache_conf_parser.lists.argument_list import ArgumentList
 
 
 class SimpleDirective(Directive):
     is_node_candidate = True
     match_regexp = r"\s*%s(\s+.*)*\s*[\\]?$" % Directive.name_regexp
+    first_chars = frozenset(ascii_letters)
 
     def add_line(self, line):
-        try:
-            self.parse_directive_header(line)
-        except DirectiveError as e:
-            raise InvalidLineError(str(e))
+        if self.lazy:
+            # only track whether more lines are expected; the header is parsed by materialize
+            if self.complete:
+                raise NodeCompleteError("Cannot add to the header of a complete directive.")
+            self._stable = not line.endswith("\\")
+        else:
+            try:
+                self.parse_directive_header(line)
+            except DirectiveError as e:
+                raise InvalidLineError(str(e))
         super(SimpleDirective, self).add_line(line)
 
+    def parse_lines(self):
+        super(SimpleDirective, self).parse_lines()
+        # parse into a new list, so the list of a node left lazy by a failure stays empty
+        self._arguments = ArgumentList()
+        for line in self.lines:
+            try:
+                self.parse_header_line(line)
+            except DirectiveError as e:
+                raise InvalidLineError(str(e))
+
     def __str__(self):
         if not self.lines:
             raise NodeCompleteError("Can't turn an uninitialized simple directive into a string.")
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+
+from apache_conf_parser import iter_lines
+from apache_conf_parser.directives.complex_directive import ComplexDirective, get_tail_pattern
+from apache_conf_parser.directives.simple_directive import SimpleDirective
+from apache_conf_parser.exceptions import (
+    InvalidLineError, NestingLimitError, NodeCompleteError, NodeMatchError, DirectiveError)
+from apache_conf_parser.lists.argument_list import ArgumentList
+from apache_conf_parser.nodes.blank_node import BlankNode
+from apache_conf_parser.nodes.comment_node import CommentNode
+from apache_conf_parser.nodes.complex_node import ComplexNode
+
+
+class EventHandler(object):
+    """
+    Receives parsing events from an EventParser. Every callback is a no-op; subclass and override the ones needed.
+
+    """
+    def start_section(self, name, args, lineno):
+        pass
+
+    def end_section(self, name):
+        pass
+
+    def directive(self, name, args, lineno):
+        pass
+
+    def comment(self, text):
+        pass
+
+
+class EventParser(object):
+    """
+    Event-driven parser reporting directives, sections and comments to a handler without building the node tree.
+
+    Lines are recognised with the same patterns as the node classes and are accepted or rejected with the same
+    exceptions as ApacheConfParser, but only the names of the open sections are kept in memory.
+
+    """
+    NESTING_LIMIT = ComplexNode.NESTING_LIMIT
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.lineno = 0
+        self._sections = []
+        # directive or section header waiting for continuation lines: [is_section, name, args, lineno, stable]
+        self._pending = None
+
+    def feed(self, line):
+        self.lineno += 1
+        if "\n" in line:
+            raise InvalidLineError("Lines cannot contain newlines.")
+        pending = self._pending
+        if pending is not None:
+            if pending[0]:
+                self._parse_header(line)
+            else:
+                self._parse_directive(line)
+            return
+        if self._sections:
+            name = self._sections[-1]
+            if get_tail_pattern(name).match(line):
+                self._sections.pop()
+                self.handler.end_section(name)
+                return
+            # each section level adds one level for the directive and one for its body
+            if 2 * len(self._sections) > self.NESTING_LIMIT:
+                raise NestingLimitError("Cannot nest directives more than %s levels." % self.NESTING_LIMIT)
+
+        first = line.lstrip()[:1]
+        if first == "#":
+            matches = CommentNode.get_match_patterns()[0].match(line)
+            if matches:
+                self.handler.comment(matches.group('comment') or "")
+                return
+        elif first == "":
+            if BlankNode.match(line):
+                return
+        elif first == "<":
+            if ComplexDirective.match(line):
+                self._pending = [True, None, [], self.lineno, False]
+                self._parse_header(line)
+                return
+        elif SimpleDirective.match(line):
+            self._pending = [False, None, [], self.lineno, False]
+            self._parse_directive(line)
+            return
+        raise NodeMatchError("No matching node: %s" % line)
+
+    def close(self):
+        if self._pending is not None:
+            raise NodeCompleteError("Can't complete the configuration while a directive is waiting for more lines.")
+        if self._sections:
+            raise NodeCompleteError("Can't complete the configuration while <%s> is not closed." % self._sections[-1])
+
+    def _parse_directive(self, line):
+        pending = self._pending
+        try:
+            if not line:
+                raise DirectiveError("An empty line is not a valid header line.")
+            continued = line[-1] == "\\"
+            parts = (line[:-1] if continued else line).split()
+            if pending[1] is None:
+                pending[1] = parts.pop(0)
+            for part in parts:
+                if "<" in part or ">" in part:
+                    ArgumentList.validate_argument(part)
+            pending[2].extend(parts)
+        except DirectiveError as e:
+            raise InvalidLineError(str(e))
+        if not continued:
+            self._pending = None
+            self.handler.directive(pending[1], pending[2], pending[3])
+
+    def _parse_header(self, line):
+        pending = self._pending
+        complete = ">" in line
+        if complete:
+            header_str, remainder = line.split(">", 1)
+            if remainder.strip() != "":
+                raise InvalidLineError("Directive header has an extraneous tail: %s" % line)
+        else:
+            header_str = line
+        header_str = header_str.lstrip()
+        if header_str and header_str.startswith("<") and pending[1] is None:
+            header_str = header_str[1:]
+        if "<" in header_str:
+            raise InvalidLineError("Angle brackets not allowed in complex directive header.  Received: %s" % line)
+        if header_str:
+            pending[4] = not header_str.endswith("\\")
+            parts = (header_str if pending[4] else header_str[:-1]).split()
+            if pending[1] is None:
+                pending[1] = parts.pop(0)
+            pending[2].extend(parts)
+        if complete:
+            if not pending[4]:
+                raise NodeCompleteError("Can't set an unstable Directive to complete.")
+            self._pending = None
+            self._sections.append(pending[1])
+            self.handler.start_section(pending[1], pending[2], pending[3])
+
+
+def parse_events(source, handler):
+    """Parse a path or an iterable of lines, reporting its contents to handler. Returns the handler."""
+    parser = EventParser(handler)
+    for line in iter_lines(source):
+        parser.feed(line)
+    parser.close()
+    return handler
@@ -23,3 +23,11 @@ class NestingLimitError(ParserError):
 
 class NodeMatchError(ParserError):
     pass
+
+
+class IncludeError(ParserError):
+    pass
+
+
+class SelectorError(ParserError):
+    pass
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+import glob
+import os
+from multiprocessing import current_process
+
+from apache_conf_parser.directives.complex_directive import ComplexDirective
+from apache_conf_parser.directives.include import Include
+from apache_conf_parser.exceptions import IncludeError
+from apache_conf_parser.parallel import parse_many
+
+WILDCARD_CHARS = frozenset("*?[")
+
+# Fewest files at one level of the include graph worth starting a pool of processes for, when workers allows one.
+PARALLEL_MIN_FILES = 32
+
+# Sections whose directives apply to the enclosing context when their condition holds.
+CONDITIONAL_SECTIONS = frozenset(['ifmodule', 'ifdefine', 'ifversion'])
+
+
+def iter_includes(nodes):
+    """Yield the Include and IncludeOptional directives among nodes and inside their sections, in document order."""
+    stack = [iter(nodes)]
+    while stack:
+        for node in stack[-1]:
+            if isinstance(node, Include):
+                yield node
+            elif getattr(type(node), 'complex', False):
+                stack.append(iter(node.body.nodes))
+                break
+        else:
+            stack.pop()
+
+
+def flatten(nodes):
+    """
+    Yield nodes with every resolved include replaced by the nodes of the files it includes, recursively. Sections
+    are yielded as they are; pass their body.nodes to flatten them too.
+
+    """
+    for node in nodes:
+        if isinstance(node, Include) and node.included is not None:
+            for tree in node.included:
+                for included_node in flatten(tree.nodes):
+                    yield included_node
+        else:
+            yield node
+
+
+def get_tree_nodes(tree):
+    """Return the nodes of a tree, or of the body of a section."""
+    return tree.body.nodes if isinstance(tree, ComplexDirective) else tree.nodes
+
+
+def iter_context(nodes):
+    """
+    Yield the directives of a context (a tree or a section's body): nodes through resolved includes, as flatten, and
+    through <IfModule>, <IfDefine> and <IfVersion> sections as if their condition held. Other sections are contexts
+    of their own and are skipped, and so are comments and blank lines.
+
+    """
+    for node in flatten(nodes):
+        name = node.name
+        if name is None:
+            continue
+        if getattr(type(node), 'complex', False):
+            if name.lower() in CONDITIONAL_SECTIONS:
+                for child in iter_context(node.body.nodes):
+                    yield child
+        else:
+            yield node
+
+
+class IncludeResolver(object):
+    """
+    Resolve Include and IncludeOptional directives into a graph of parsed configuration files.
+
+    Paths and wildcards are relative to server_root. Every distinct file is parsed once and its tree is shared by
+    all the directives including it, for the lifetime of the resolver: reuse a resolver to share parsed files
+    between configurations. The files found at each level of the include graph are parsed together, in this process
+    by default. With workers other than 1 (None for the number of CPUs), a level of at least parallel_min_files files
+    is parsed across a pool of that many processes (see parse_many), which only pays off for many or large files:
+    whole trees are sent back from the workers. Daemonic processes, such as pool workers, always parse in-process,
+    as they can't start processes of their own. Each resolved directive's `included` attribute holds
+    the trees it includes, in the order Apache reads them; `trees` maps paths to trees and `graph` maps each parsed
+    path to the paths it includes.
+
+    """
+    def __init__(self, server_root=None, workers=1, parallel_min_files=PARALLEL_MIN_FILES):
+        self.server_root = server_root
+        self.workers = workers
+        self.parallel_min_files = parallel_min_files
+        self.trees = {}
+        self.graph = {}
+        self._expansions = {}
+
+    def get_server_root(self, tree, path=None):
+        if self.server_root is not None:
+            return self.server_root
+        for node in tree.nodes:
+            if node.name is not None and node.name.lower() == 'serverroot' and node.arguments:
+                return node.arguments[0].strip("\"'")
+        return os.path.dirname(os.path.abspath(path)) if path is not None else os.getcwd()
+
+    def expand(self, directive, server_root):
+        """Return the files a directive includes, in the order Apache reads them."""
+        pattern = os.path.abspath(os.path.join(server_root, directive.file_path))
+        key = (pattern, directive.optional)
+        paths = self._expansions.get(key)
+        if paths is None:
+            paths = self._expansions[key] = self.find_files(pattern, directive.optional)
+        return paths
+
+    @staticmethod
+    def find_files(pattern, optional):
+        if WILDCARD_CHARS.isdisjoint(pattern):
+            if os.path.isdir(pattern):
+                paths = sorted(
+                    os.path.join(directory, name) for directory, _, names in os.walk(pattern) for name in names)
+            else:
+                paths = [pattern] if os.path.isfile(pattern) else []
+            if not paths and not optional and not os.path.isdir(pattern):
+                raise IncludeError("Could not open configuration file %s" % pattern)
+            return paths
+        paths = sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+        if not paths and not optional:
+            raise IncludeError("No matches for the wildcard %s" % pattern)
+        return paths
+
+    def resolve(self, tree, path=None):
+        """
+        Resolve the includes of tree, parsed from path if given, and of every file it includes. Raises IncludeError
+        for missing files, files that fail to parse and include cycles. Returns tree.
+
+        """
+        server_root = self.get_server_root(tree, path)
+        if path is not None:
+            path = os.path.abspath(path)
+            self.trees.setdefault(path, tree)
+        self.parse_included(tree, server_root)
+        self.link(tree, path, server_root, [], set())
+        return tree
+
+    def parse_included(self, tree, server_root):
+        """Parse every file reachable from tree that isn't parsed yet, one level of the include graph at a time."""
+        level = [tree]
+        while level:
+            paths = []
+            for included_tree in level:
+                for directive in iter_includes(included_tree.nodes):
+                    paths += [p for p in self.expand(directive, server_root) if p not in self.trees and p not in paths]
+            level = []
+            for result in parse_many(paths, workers=self.get_workers(len(paths)), form='tree'):
+                if not result.ok:
+                    raise IncludeError("Could not parse included file %s: %s" % (result.path, result.error))
+                self.trees[result.path] = result.tree
+                level.append(result.tree)
+
+    def get_workers(self, count):
+        """Return the number of processes to parse count files of one level with, 1 meaning in this process."""
+        if self.workers == 1 or count < max(self.parallel_min_files, 2) or current_process().daemon:
+            return 1
+        return self.workers
+
+    def link(self, tree, path, server_root, stack, linked):
+        if path is not None:
+            stack.append(path)
+            self.graph[path] = []
+        for directive in iter_includes(tree.nodes):
+            directive.included = []
+            for included_path in self.expand(directive, server_root):
+                if included_path in stack:
+                    cycle = stack[stack.index(included_path):] + [included_path]
+                    raise IncludeError("Include cycle: %s" % " -> ".join(cycle))
+                directive.included.append(self.trees[included_path])
+                if path is not None:
+                    self.graph[path].append(included_path)
+                if included_path not in linked:
+                    linked.add(included_path)
+                    self.link(self.trees[included_path], included_path, server_root, stack, linked)
+        if path is not None:
+            stack.pop()
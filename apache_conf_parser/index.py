@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+import re
+
+from apache_conf_parser.directives import Directive
+
+# Space left between the order keys of consecutive nodes, so nodes inserted between them can get keys of their own.
+ORDER_GAP = 1 << 64
+
+# The directive or section name at the start of a node's first line, read without parsing (or materializing) it.
+NAME_PATTERN = re.compile(r"\s*(?:<\s*)?(%s)" % Directive.name_regexp)
+
+
+def get_index_name(node):
+    """Return the case-folded name a node is indexed under, or None for nodes without a name (comments, blanks)."""
+    if not isinstance(node, Directive):
+        return None
+    if node.lines:
+        matches = NAME_PATTERN.match(node.lines[0])
+        return matches.group(1).lower() if matches else None
+    name = node.name
+    return name.lower() if name is not None else None
+
+
+class NameIndex(object):
+    """
+    Index of the directives and sections of a tree by case-folded name, e.g. every RewriteRule at any depth.
+
+    The index hooks into the tree's node lists: nodes are indexed as they are parsed, and nodes (with everything in
+    their sections) appended, inserted, replaced or deleted through a NodeList are added or removed as it happens,
+    apply_edit included. Looking a name up costs the same whatever the size of the tree, plus the number of nodes
+    found. Nodes are indexed under the name their first line starts with, so lazy nodes stay lazy.
+
+    Nodes are found in document order, as walking the tree finds them. Every node has an order key, growing along
+    the body holding it: nodes added to a body get keys between those of the nodes before and after them, ORDER_GAP
+    apart when appended. Adding nodes costs the same whatever the size of the body, except when repeated inserts at
+    one place use up the room between two keys (after about 64 of them): the body is then numbered again, which
+    costs the size of the body. The first lookup of a name after nodes with that name were added or removed sorts
+    them by their keys and those of their enclosing sections.
+
+    A pickled or copied index is rebuilt from its tree the first time it's used; trees loaded from the binary format
+    come without one (see ApacheConfParser.build_index).
+
+    """
+    def __init__(self, root):
+        self.root = root
+        self.build()
+
+    def build(self):
+        # name -> {id(node): node}, in the order nodes were added
+        self._nodes = {}
+        # id(node) -> the section whose body holds the node, None at the top level
+        self._parents = {}
+        # name -> its nodes in document order, once looked up and until nodes with that name are added or removed
+        self._ordered = {}
+        # id(node) -> order key of the node in the body holding it
+        self._keys = {}
+        self.attach(self.root.nodes, None)
+        self.add(self.root.nodes, None, self.root.nodes, 0)
+
+    def __getstate__(self):
+        # the tables are keyed on object ids, which don't survive pickling
+        return {'root': self.root}
+
+    def __setstate__(self, state):
+        self.root = state['root']
+        self._nodes = None
+        self._parents = None
+        self._ordered = None
+        self._keys = None
+
+    def ensure_built(self):
+        if self._nodes is None:
+            self.build()
+
+    def attach(self, nodes, parent):
+        nodes._index = self
+        nodes._parent = parent
+
+    def add(self, nodes, parent, body, start=None):
+        """
+        Index nodes added to body, the node list of parent (None for the root), and the nodes inside their sections.
+        The nodes are at body.items[start:start + len(nodes)], or anywhere in body when start is None.
+
+        """
+        if self._nodes is None:
+            return
+        index_nodes = self._nodes
+        parents = self._parents
+        ordered = self._ordered
+        self.number(nodes, body, start)
+        for node in nodes:
+            name = get_index_name(node)
+            if name is not None:
+                ordered.pop(name, None)
+                named = index_nodes.get(name)
+                if named is None:
+                    named = index_nodes[name] = {}
+                named[id(node)] = node
+            parents[id(node)] = parent
+            if getattr(type(node), 'complex', False):
+                self.attach(node.body.nodes, node)
+                self.add(node.body.nodes, node, node.body.nodes, 0)
+
+    def number(self, nodes, body, start):
+        """Give order keys to nodes added to body at start (see add), between the keys of their neighbours."""
+        keys = self._keys
+        items = body.items
+        count = len(nodes)
+        if start is None:
+            self.renumber(body)
+            return
+        end = start + count
+        before = keys[id(items[start - 1])] if start > 0 else None
+        after = keys[id(items[end])] if end < len(items) else None
+        if after is None:
+            first = ORDER_GAP if before is None else before + ORDER_GAP
+            step = ORDER_GAP
+        elif before is None:
+            first = after - ORDER_GAP * count
+            step = ORDER_GAP
+        else:
+            step = (after - before) // (count + 1)
+            if not step:
+                self.renumber(body)
+                return
+            first = before + step
+        for number, node in enumerate(nodes):
+            keys[id(node)] = first + step * number
+
+    def renumber(self, body):
+        keys = self._keys
+        for number, node in enumerate(body.items):
+            keys[id(node)] = ORDER_GAP * number
+
+    def remove(self, nodes):
+        """Drop nodes removed from the tree, and the nodes inside their sections, from the index."""
+        if self._nodes is None:
+            return
+        stack = [list(nodes)]
+        while stack:
+            for node in stack.pop():
+                if self._parents.pop(id(node), False) is False:
+                    continue
+                self._keys.pop(id(node), None)
+                name = get_index_name(node)
+                self._ordered.pop(name, None)
+                named = self._nodes.get(name)
+                if named is not None:
+                    named.pop(id(node), None)
+                    if not named:
+                        del self._nodes[name]
+                if getattr(type(node), 'complex', False):
+                    node.body.nodes._index = None
+                    stack.append(node.body.nodes)
+
+    def find(self, name):
+        """Return the directives and sections named name (case-insensitively), in document order."""
+        self.ensure_built()
+        folded = name.lower()
+        ordered = self._ordered.get(folded)
+        if ordered is None:
+            named = self._nodes.get(folded)
+            if not named:
+                return []
+            ordered = self._ordered[folded] = sorted(named.values(), key=self.get_position)
+        return list(ordered)
+
+    def get_position(self, node):
+        """Return the position of an indexed node: its order key and those of its enclosing sections, outermost first."""
+        keys = self._keys
+        parents = self._parents
+        position = [keys[id(node)]]
+        parent = parents[id(node)]
+        while parent is not None:
+            position.append(keys[id(parent)])
+            parent = parents[id(parent)]
+        position.reverse()
+        return position
+
+    def get_parents(self, node):
+        """Return the sections enclosing an indexed node, outermost first."""
+        self.ensure_built()
+        parents = []
+        parent = self._parents[id(node)]
+        while parent is not None:
+            parents.append(parent)
+            parent = self._parents[id(parent)]
+        parents.reverse()
+        return parents
+
+    def find_with_parents(self, name):
+        """Return (node, enclosing sections) pairs for the nodes named name; see find and get_parents."""
+        return [(node, self.get_parents(node)) for node in self.find(name)]
+
+    def names(self):
+        self.ensure_built()
+        return sorted(self._nodes)
+
+    def __contains__(self, name):
+        self.ensure_built()
+        return name.lower() in self._nodes
+
+    def count(self, name):
+        self.ensure_built()
+        return len(self._nodes.get(name.lower(), ()))
@@ -5,10 +5,77 @@ from apache_conf_parser.lists.list_adapter import ListAdapter
 
 
 class NodeList(ListAdapter):
-    """Collection for nodes in an Apache configuration."""
+    """
+    Collection for nodes in an Apache configuration.
+
+    Nodes that are unstable (still waiting for lines) when they are added are tracked as they are appended, replaced
+    or deleted, so checking the stability of the list only looks at the last node and those nodes rather than at
+    every item. While parsing this is at most the single trailing node, which keeps the check constant time. A node
+    that was stable when added and later becomes unstable is only noticed while it is the last node.
+
+    The node lists of a tree with a NameIndex report the nodes they gain and lose to it, along with the section
+    (_parent) their nodes belong to and where the nodes gained are in the list.
+
+    """
+    _index = None
+    _parent = None
+
     def __init__(self, *args):
+        self._open = []
         super(NodeList, self).__init__(*args)
 
+    def _track(self, nodes, start=None):
+        """Track nodes added to the list, found at items[start:start + len(nodes)] unless start is None."""
+        self._open.extend(node for node in nodes if not node.stable)
+        if self._index is not None:
+            self._index.add(nodes, self._parent, self, start)
+
+    def _forget(self, nodes):
+        for node in nodes:
+            for index, open_node in enumerate(self._open):
+                if open_node is node:
+                    del self._open[index]
+                    break
+        if self._index is not None:
+            self._index.remove(nodes)
+
+    def __setitem__(self, index, val):
+        if isinstance(index, slice):
+            start, _, step = index.indices(len(self.items))
+            self._forget(self.items[index])
+            val = list(val)
+            super(NodeList, self).__setitem__(index, val)
+            self._track(val, start if step == 1 else None)
+        else:
+            self._forget([self.items[index]])
+            super(NodeList, self).__setitem__(index, val)
+            self._track([val], index if index >= 0 else index + len(self.items))
+
+    def __delitem__(self, index):
+        removed = self.items[index]
+        super(NodeList, self).__delitem__(index)
+        self._forget(removed if isinstance(index, slice) else [removed])
+
+    def insert(self, index, val):
+        # where list.insert puts val
+        start = min(index if index >= 0 else max(index + len(self.items), 0), len(self.items))
+        super(NodeList, self).insert(index, val)
+        self._track([val], start)
+
+    @property
+    def open_node(self):
+        """
+        The node still waiting for additional lines, or None if the list is stable: the last node if it is unstable,
+        else the most recently added of the tracked nodes that still are.
+
+        """
+        items = self.items
+        if items and not items[-1].stable:
+            return items[-1]
+        if self._open:
+            self._open = [node for node in self._open if not node.stable]
+        return self._open[-1] if self._open else None
+
     @property
     def stable(self):
-        return all(item.stable for item in self.items)
+        return self.open_node is None
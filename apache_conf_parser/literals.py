@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+import re
+from collections import deque
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:
+    import sre_constants
+    import sre_parse
+
+# zero-width items, which don't break a run of literal characters
+ZERO_WIDTH = frozenset([sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT])
+REPEATS = frozenset([sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT] + (
+    [sre_constants.POSSESSIVE_REPEAT] if hasattr(sre_constants, 'POSSESSIVE_REPEAT') else []))
+
+
+def parse_pattern(pattern):
+    """Return the parse tree of a regular expression from the re module's parser, and whether it ignores case."""
+    parsed = sre_parse.parse(pattern)
+    return parsed, bool(parsed.state.flags & re.IGNORECASE)
+
+
+def get_required_literals(pattern, nocase=False):
+    """
+    Return the strings that appear in every string a regular expression (a str or a compiled pattern) matches.
+
+    Characters are collected from runs of literals in the pattern, its groups and the repeats of at least one
+    iteration; alternations, character classes, optional parts and anything else end a run. For patterns ignoring
+    case (with the IGNORECASE flag, nocase or (?i)), the literals are lowercased and only kept when they're ASCII:
+    look them up in the string returned by fold_subject, and treat the pattern as a possible match when it's None.
+
+    """
+    if isinstance(pattern, re.Pattern):
+        nocase = nocase or bool(pattern.flags & re.IGNORECASE)
+        pattern = pattern.pattern
+    parsed, ignore_case = parse_pattern(pattern)
+    nocase = nocase or ignore_case
+    literals = []
+    run = []
+
+    def flush():
+        if run:
+            literals.append(''.join(run))
+            del run[:]
+
+    def walk(items):
+        for op, av in items:
+            if op is sre_constants.LITERAL:
+                run.append(chr(av))
+            elif op in ZERO_WIDTH:
+                continue
+            elif op is sre_constants.SUBPATTERN:
+                _, add_flags, del_flags, group = av
+                if (add_flags | del_flags) & re.IGNORECASE:
+                    flush()
+                else:
+                    walk(group)
+            elif op in REPEATS:
+                low, _, repeated = av
+                flush()
+                if low >= 1:
+                    walk(repeated)
+                    flush()
+            else:
+                flush()
+
+    walk(parsed)
+    flush()
+    if nocase:
+        return [literal.lower() for literal in literals if literal.isascii()]
+    return literals
+
+
+def fold_subject(text):
+    """
+    Return text lowercased, for looking up the literals of patterns ignoring case, or None if text isn't ASCII. The
+    re module matches some non-ASCII characters with ASCII letters when ignoring case (ı and İ with i, ſ with s, the
+    Kelvin sign with k) that str.lower doesn't turn into them, and İ lowercases to two characters.
+
+    """
+    return text.lower() if text.isascii() else None
+
+
+def get_literal_prefix(pattern, nocase=False):
+    """
+    Return the literal string every match of a regular expression anchored with ^ (or \\A) starts with, or None.
+    Case is handled as by get_required_literals.
+
+    """
+    if isinstance(pattern, re.Pattern):
+        nocase = nocase or bool(pattern.flags & re.IGNORECASE)
+        multiline = bool(pattern.flags & re.MULTILINE)
+        pattern = pattern.pattern
+    else:
+        multiline = False
+    parsed, ignore_case = parse_pattern(pattern)
+    nocase = nocase or ignore_case
+    items = list(parsed)
+    anchors = (sre_constants.AT_BEGINNING_STRING,) if multiline or parsed.state.flags & re.MULTILINE else (
+        sre_constants.AT_BEGINNING, sre_constants.AT_BEGINNING_STRING)
+    if not items or items[0][0] is not sre_constants.AT or items[0][1] not in anchors:
+        return None
+    prefix = []
+
+    def walk(items):
+        """Add the literals items start with to prefix, and return whether they're all literals."""
+        for op, av in items:
+            if op is sre_constants.LITERAL:
+                prefix.append(chr(av))
+            elif op is sre_constants.SUBPATTERN and not (av[1] | av[2]) & re.IGNORECASE:
+                if not walk(av[3]):
+                    return False
+            else:
+                return False
+        return True
+
+    walk(items[1:])
+    prefix = ''.join(prefix)
+    if nocase:
+        prefix = prefix.lower() if prefix.isascii() else ''
+    return prefix or None
+
+
+def get_key_literal(pattern, nocase=False):
+    """Return the longest required literal of a regular expression (see get_required_literals), or None."""
+    literals = get_required_literals(pattern, nocase)
+    return max(literals, key=len) if literals else None
+
+
+class LiteralAutomaton(object):
+    """
+    Aho-Corasick automaton finding which of a set of strings occur in a text, in a single pass over the text
+    whatever the number of strings.
+
+    """
+    __slots__ = ('literals', 'goto', 'fail', 'outputs')
+
+    def __init__(self, literals):
+        self.literals = list(literals)
+        goto = [{}]
+        outputs = [()]
+        for number, literal in enumerate(self.literals):
+            state = 0
+            for character in literal:
+                following = goto[state].get(character)
+                if following is None:
+                    following = goto[state][character] = len(goto)
+                    goto.append({})
+                    outputs.append(())
+                state = following
+            outputs[state] += (number,)
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, following in goto[state].items():
+                queue.append(following)
+                target = fail[state]
+                while target and character not in goto[target]:
+                    target = fail[target]
+                fail[following] = goto[target].get(character, 0)
+                # the strings ending at the longest suffix also end here
+                outputs[following] += outputs[fail[following]]
+        self.goto = goto
+        self.fail = fail
+        self.outputs = outputs
+
+    def search(self, text):
+        """Return the set of the numbers (positions in literals) of the strings occurring in text."""
+        goto = self.goto
+        fail = self.fail
+        outputs = self.outputs
+        found = set()
+        state = 0
+        for character in text:
+            while state and character not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(character, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+import locale
+import mmap
+import os
+
+
+class MappedFile(object):
+    """
+    The lines of a memory-mapped configuration file.
+
+    Each line is read from the mapped buffer and decoded only when iteration reaches it, so the file is never read
+    into memory as a whole, nor kept as a list of lines: memory use stays that of a line whatever the size of the
+    file. This isn't zero-copy, as each line is copied out of the mapping before being decoded, and iterating takes
+    somewhat longer than readlines() does. Line endings ("\\n" or "\\r\\n") are not part of the yielded lines.
+
+    The file is mapped when it is first iterated over or used as a context manager, and unmapped by close() (or on
+    leaving the with block), after which it has no lines. A MappedFile that is never read holds no file or mapping.
+
+    """
+    def __init__(self, path, encoding=None):
+        self.path = path
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self.closed = False
+        self._buffer = None
+
+    def open(self):
+        """Map the file, unless it is already mapped or was closed. Returns the MappedFile."""
+        if self._buffer is None and not self.closed:
+            with open(self.path, 'rb') as mapped_file:
+                if os.fstat(mapped_file.fileno()).st_size:
+                    self._buffer = mmap.mmap(mapped_file.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    # empty files can't be mapped
+                    self._buffer = b""
+        return self
+
+    def __iter__(self):
+        buffer = self.open()._buffer
+        if not buffer:
+            return
+        encoding = self.encoding
+        # the buffer position is shared, so only one iteration can be in progress at a time
+        buffer.seek(0)
+        for line in iter(buffer.readline, b""):
+            if line.endswith(b"\n"):
+                line = line[:-1]
+            if line.endswith(b"\r"):
+                line = line[:-1]
+            yield line.decode(encoding)
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._buffer = None
+        self.closed = True
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,6 +1,5 @@
 #!/usr/bin/env python
 
-import inspect
 import re
 from abc import ABCMeta, abstractmethod
 
@@ -18,6 +17,23 @@ class Node(object):
     is_node_candidate = True
     indent_str = ' ' * 4  # 4 spaces
 
+    # Routing hints used by the NodeDispatcher. `keyword` is the (case-insensitive) directive name a class is
+    # specific to; `first_chars` is the set of first significant characters of lines the class can match, where an
+    # empty string stands for blank lines. None means the class places no restriction on matching lines.
+    keyword = None
+    first_chars = None
+
+    # Set on instances whose lines have been stored but not matched/parsed yet (see materialize).
+    lazy = False
+
+    # Node candidates computed by get_candidates, keyed on the excluded class. Shared by every parser and section,
+    # and cleared whenever a Node subclass is defined.
+    _candidates = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super(Node, cls).__init_subclass__(**kwargs)
+        Node.invalidate_candidates()
+
     def __init__(self):
         self.lines = []
         self._content = None
@@ -29,6 +45,40 @@ class Node(object):
     def name(self):
         return None
 
+    @property
+    def matches(self):
+        if self.lazy:
+            self.materialize()
+        return self._matches
+
+    @matches.setter
+    def matches(self, value):
+        self._matches = value
+
+    def materialize(self):
+        """
+        Run the matching and parsing deferred for a lazy node. This happens automatically the first time a parsed
+        attribute (matches, name, arguments...) is accessed. If parsing fails, the node is left lazy and as it was,
+        so every access raises the same error.
+
+        """
+        if not self.lazy:
+            return
+        state = self.__dict__.copy()
+        # parsed attributes read while parsing must not materialize the node again
+        del self.lazy
+        try:
+            self.parse_lines()
+        except Exception:
+            self.__dict__.clear()
+            self.__dict__.update(state)
+            raise
+
+    def parse_lines(self):
+        """Match the stored lines of a lazy node (see materialize); subclasses parse them further."""
+        for line in self.lines:
+            self.match_line(line)
+
     @property
     def complete(self):
         return self._complete
@@ -37,13 +87,21 @@ class Node(object):
     def complete(self, val):
         self._complete = val
 
+    @classmethod
+    def get_match_patterns(cls):
+        """Return the compiled form of match_regexp, compiled once per class."""
+        cached = cls.__dict__.get('_match_patterns')
+        if cached is None or cached[0] is not cls.match_regexp:
+            regexps = cls.match_regexp if isinstance(cls.match_regexp, list) else [cls.match_regexp]
+            cached = (cls.match_regexp, tuple(re.compile(r) for r in regexps))
+            cls._match_patterns = cached
+        return cached[1]
+
     @classmethod
     def match(cls, line):
         if line is None:
             return False
-        if isinstance(cls.match_regexp, list):
-            return bool(any([re.match(r, line) for r in cls.match_regexp]))
-        return bool(re.match(cls.match_regexp, line))
+        return any(pattern.match(line) for pattern in cls.get_match_patterns())
 
     @property
     def content(self):
@@ -55,26 +113,26 @@ class Node(object):
 
     @abstractmethod
     def add_line(self, line):
+        self.store_line(line)
+        if not line.endswith("\\"):
+            self.complete = True
 
+    def store_line(self, line):
+        """Validate, match and record a line without changing the completion state of the node."""
         if "\n" in line:
             raise InvalidLineError("Lines cannot contain newlines.")
         if self.complete:
             raise NodeCompleteError(line)
-
-        matches = None
-        if isinstance(self.match_regexp, list):
-            for regexp in self.match_regexp:
-                matches = re.match(regexp, line)
-                if matches:
-                    break
-        else:
-            matches = re.match(self.match_regexp, line)
-        if matches:
-            self.matches = matches.groupdict()
-
+        if not self.lazy:
+            self.match_line(line)
         self.lines.append(line)
-        if not line.endswith("\\"):
-            self.complete = True
+
+    def match_line(self, line):
+        for pattern in self.get_match_patterns():
+            matches = pattern.match(line)
+            if matches:
+                self._matches = matches.groupdict()
+                break
 
     def __str__(self):
         if self.changed:
@@ -82,7 +140,8 @@ class Node(object):
         return "\n".join(self.lines)
 
     def __getattr__(self, attribute_name):
-        if self.matches is not None and attribute_name in self.matches:
+        # _matches is missing while the node is being unpickled or copied
+        if '_matches' in self.__dict__ and self.matches is not None and attribute_name in self.matches:
             return self.matches.get(attribute_name)
         else:
             raise AttributeError('No attribute named: %s' % attribute_name)
@@ -94,10 +153,27 @@ class Node(object):
             for subsubclass in subclass.get_subclasses():
                 yield subsubclass
             # yield from subclass.get_subclasses()
-            if inspect.isabstract(subclass) or not subclass.is_node_candidate:
+            if getattr(subclass, '__abstractmethods__', None) or not subclass.is_node_candidate:
                 continue
             yield subclass
 
+    @staticmethod
+    def get_candidates(exclude=None):
+        """
+        Return the node candidate classes (as found by get_subclasses) other than exclude, as a tuple. The result is
+        computed once and shared until a new Node subclass is defined.
+
+        """
+        candidates = Node._candidates.get(exclude)
+        if candidates is None:
+            candidates = Node._candidates[exclude] = tuple(c for c in Node.get_subclasses() if c is not exclude)
+        return candidates
+
+    @staticmethod
+    def invalidate_candidates():
+        """Drop the cached candidates, e.g. after changing is_node_candidate on an existing class."""
+        Node._candidates.clear()
+
     def dumps(self, depth=0):
         leading_indent_str = self.indent_str * depth
         return "%s%s" % (leading_indent_str, str(self).lstrip())
@@ -105,6 +181,8 @@ class Node(object):
     def __eq__(self, other):
         """Overrides the default implementation"""
         if isinstance(self, other.__class__) and hasattr(other, '__dict__'):
+            self.materialize()
+            other.materialize()
             diff = {k: (v, other.__dict__.get(k)) for k, v in self.__dict__.items() if other.__dict__.get(k) != v}
-            return all([v[0] == v[1] for k, v in diff.items() if k not in ['lines']])
+            return all([v[0] == v[1] for k, v in diff.items() if k not in ['lines', 'candidates', 'dispatcher', '_line_counts', 'index', 'resolver', 'resolver_path']])
         return False
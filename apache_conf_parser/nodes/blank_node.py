@@ -6,6 +6,7 @@ from apache_conf_parser.nodes import Node
 class BlankNode(Node):
     """A blank line."""
     match_regexp = "\s*$"
+    first_chars = frozenset([""])
 
     def add_line(self, line):
         if line.endswith("\\"):
@@ -6,11 +6,17 @@ from apache_conf_parser.nodes import Node
 class CommentNode(Node):
     """A comment."""
     match_regexp = r"\s*#(?P<comment>.*[^\\])?$"
+    first_chars = frozenset("#")
 
     def add_line(self, line):
         if line.endswith("\\"):
             raise InvalidLineError("Comments cannot have line continuations.")
         super(CommentNode, self).add_line(line)
+        if not self.lazy:
+            self._content = self.comment
+
+    def parse_lines(self):
+        super(CommentNode, self).parse_lines()
         self._content = self.comment
 
     def __str__(self):
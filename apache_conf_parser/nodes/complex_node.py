@@ -1,23 +1,41 @@
 #!/usr/bin/env python
+from bisect import bisect_right
+from itertools import accumulate
+from operator import is_
 
 from apache_conf_parser.lists.node_list import NodeList
-from apache_conf_parser.exceptions import NodeCompleteError, NodeMatchError, NestingLimitError
+from apache_conf_parser.exceptions import (
+    InvalidLineError, NodeCompleteError, NodeMatchError, NestingLimitError, ParserError)
 from apache_conf_parser.nodes import Node
+from apache_conf_parser.nodes.dispatcher import NodeDispatcher
+from apache_conf_parser.nodes.registry import registry
 
 
 class ComplexNode(Node):
     """
     A node that is composed of a list of other nodes.
 
+    Lines are routed without recursing through nested sections: the node keeps a stack of the complex directives
+    that are open below it (innermost last), so each line only looks at the top of the stack to decide whether it
+    continues a header, closes the innermost section or belongs to its body.
+
     """
     NESTING_LIMIT = 10
 
     complex = True
 
+    # When set, nodes created while adding lines are lazy: they only store their lines until first accessed.
+    lazy_nodes = False
+
+    # Directive classes loaded on demand while routing lines (see DirectiveRegistry).
+    registry = registry
+
     def __init__(self, candidates):
         super(ComplexNode, self).__init__()
         self.candidates = candidates
+        self.dispatcher = NodeDispatcher.for_candidates(candidates, self.registry)
         self.nodes = NodeList()
+        self._sections = []
 
     @property
     def complete(self):
@@ -35,9 +53,9 @@ class ComplexNode(Node):
         return self.nodes.stable
 
     def get_node(self, line):
-        for node_cls in self.candidates:
-            if node_cls.match(line):
-                return node_cls()
+        node_cls = self.dispatcher.get_node_class(line)
+        if node_cls is not None:
+            return node_cls()
         raise NodeMatchError("No matching node: %s" % line)
 
     def add_line(self, line, depth=0):
@@ -45,18 +63,151 @@ class ComplexNode(Node):
             raise NodeCompleteError("Can't add lines to a complete Node.")
         if depth > self.NESTING_LIMIT:
             raise NestingLimitError("Cannot nest directives more than %s levels." % self.NESTING_LIMIT)
-        if not self.nodes.stable:
-            node = self.nodes[-1]
-            if hasattr(node, 'complex'):
-                node.add_line(line, depth=depth + 1)
+        sections = self._sections
+        while sections and sections[-1].complete:
+            # closed outside of this node
+            sections.pop()
+        while True:
+            if sections:
+                section = sections[-1]
+                if not section.header.complete:
+                    section.parse_header(line)
+                    return
+                if section.body.stable and section.is_tail(line):
+                    section.close(line)
+                    sections.pop()
+                    return
+                if section.body.complete:
+                    raise InvalidLineError("Expecting closing tag. Got: %s" % line)
+                # each section level adds one level for the directive and one for its body
+                if depth + 2 * len(sections) > self.NESTING_LIMIT:
+                    raise NestingLimitError("Cannot nest directives more than %s levels." % self.NESTING_LIMIT)
+                body = section.body
             else:
+                body = self
+            node = body.nodes.open_node
+            if node is None:
+                new_node = body.get_node(line)
+                if self.lazy_nodes:
+                    new_node.lazy = True
+                new_node.add_line(line)
+                body.nodes.append(new_node)
+                if getattr(type(new_node), 'complex', False):
+                    sections.append(new_node)
+                return
+            if not getattr(type(node), 'complex', False):
                 node.add_line(line)
-        else:
-            new_node = self.get_node(line)
-            new_node.add_line(line)
-            self.nodes.append(new_node)
-        if not self.nodes.stable:
-            self.complete = False
+                return
+            # a section opened without going through this node; track it from now on
+            sections.append(node)
+
+    @staticmethod
+    def count_lines(node):
+        if getattr(type(node), 'complex', False):
+            return len(node.lines) + sum(node.body.get_line_counts()) + 1
+        return len(node.lines)
+
+    def get_line_counts(self):
+        """
+        Return the number of lines of each node. The counts are cached (in _line_counts, with the nodes they were
+        counted for) and kept up to date by apply_edit; changes made to a section's body by other means aren't noticed.
+
+        """
+        items = self.nodes.items
+        cached = self.__dict__.get('_line_counts')
+        if cached is not None:
+            counted, counts = cached
+            if len(counted) == len(items) and all(map(is_, counted, items)):
+                return counts
+        counts = [self.count_lines(node) for node in items]
+        self._line_counts = (list(items), counts)
+        return counts
+
+    def apply_edit(self, start_line, end_line, new_text):
+        """
+        Replace lines start_line to end_line (0-based, end excluded, as in a slice; start_line == end_line inserts)
+        of a complete node with new_text, a string or a list of lines, and re-parse only what the edit touches.
+
+        The edit is applied to the innermost section body holding it, replacing only the nodes it overlaps (plus
+        any following siblings needed to close a section it opens). When the new lines don't parse there, e.g.
+        because they close an enclosing section, the enclosing section is re-parsed as a whole, and so on up to the
+        top level, where the parser's error is raised and the tree is left unchanged. Other nodes are kept as they
+        are, so the work depends on the size of the edit rather than of the configuration. Returns the re-parsed
+        nodes.
+
+        """
+        if not self.complete:
+            raise NodeCompleteError("Can't edit an incomplete complex node.")
+        new_lines = new_text.splitlines() if isinstance(new_text, str) else list(new_text)
+        for line in new_lines:
+            if "\n" in line:
+                raise InvalidLineError("Lines cannot contain newlines.")
+        total = sum(self.get_line_counts())
+        if not 0 <= start_line <= end_line <= total:
+            raise IndexError("Edit range %s-%s is outside of lines 0-%s." % (start_line, end_line, total))
+        nodes, _ = self.edit_body(start_line, end_line, new_lines, 0, self.lazy_nodes)
+        source = self.__dict__.get('source')
+        if isinstance(source, list):
+            source[start_line:end_line] = new_lines
+        return nodes
+
+    def edit_body(self, start_line, end_line, new_lines, level, lazy=False):
+        """
+        Apply an edit to the nodes of this node, whose first line is line 0. level is the number of enclosing
+        sections and lazy whether new nodes are lazy. Returns the re-parsed nodes and the change in the number of
+        lines.
+
+        """
+        counts = self.get_line_counts()
+        nodes = self.nodes
+        # the first node ending after start_line, and the line it starts at
+        ends = list(accumulate(counts))
+        index = bisect_right(ends, start_line)
+        position = ends[index - 1] if index else 0
+        if index < len(counts) and getattr(type(nodes[index]), 'complex', False):
+            section = nodes[index]
+            body_start = position + len(section.lines)
+            body_end = position + counts[index] - 1
+            if body_start <= start_line and end_line <= body_end:
+                try:
+                    edited, delta = section.body.edit_body(
+                        start_line - body_start, end_line - body_start, new_lines, level + 1, lazy)
+                except ParserError:
+                    pass
+                else:
+                    counts[index] += delta
+                    return edited, delta
+
+        # the nodes the edit overlaps; an insertion inside a node replaces it too
+        end = index
+        end_position = position
+        while end < len(counts) and (end_position < end_line or (end == index and position < start_line)):
+            end_position += counts[end]
+            end += 1
+        old_lines = []
+        for node in nodes[index:end]:
+            old_lines += str(node).split("\n")
+        lines = old_lines[:start_line - position] + new_lines + old_lines[end_line - position:]
+
+        region = ComplexNode(self.candidates)
+        region.lazy_nodes = lazy
+        depth = 2 * level
+        for line in lines:
+            region.add_line(line, depth)
+        # take in the following siblings until any section opened by the edit is closed
+        while not region.nodes.stable and end < len(nodes):
+            for line in str(nodes[end]).split("\n"):
+                region.add_line(line, depth)
+            end_position += counts[end]
+            end += 1
+        region.complete = True
+
+        edited = list(region.nodes)
+        nodes[index:end] = edited
+        counted, counts = self._line_counts
+        counted[index:end] = edited
+        counts[index:end] = [self.count_lines(node) for node in edited]
+        return edited, len(new_lines) - (end_line - start_line)
 
     def __str__(self):
         if not self.complete:
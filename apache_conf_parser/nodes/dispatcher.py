@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+from functools import lru_cache
+from string import ascii_letters
+
+BLANK_KEY = ''
+
+# Upper bound on the number of (candidate set, registry) pairs whose dispatcher is kept for sharing.
+DISPATCHER_CACHE_SIZE = 256
+
+
+class NodeDispatcher(object):
+    """
+    Route configuration lines straight to the node classes that could match them.
+
+    Lines are keyed on their directive keyword (case-folded, as Apache does) or, for lines that don't start with a
+    letter, on their first significant character. Each key maps to the ordered subset of candidates whose routing
+    hints (Node.keyword / Node.first_chars) allow it, so only those classes have their patterns tried. Routes are
+    computed on first use of a key and the first matching class is the same one a linear scan would find.
+
+    With a DirectiveRegistry, the classes registered for a key's keyword are loaded when the key is first routed and
+    join its route ahead of their base classes, as Node.get_subclasses would order them once imported.
+
+    """
+    # Upper bound on the number of cached routes; the cache is dropped when it fills up.
+    ROUTE_CACHE_LIMIT = 4096
+
+    def __init__(self, candidates, registry=None):
+        self.candidates = tuple(candidates)
+        self.registry = registry
+        self._routes = {}
+        self._registry_version = None if registry is None else registry.version
+
+    @classmethod
+    def for_candidates(cls, candidates, registry=None):
+        """
+        Return the dispatcher shared by every node built with the given candidate set and registry. The dispatchers of
+        the DISPATCHER_CACHE_SIZE most recently used pairs are kept.
+
+        """
+        return get_dispatcher(cls, tuple(candidates), registry)
+
+    def __reduce__(self):
+        # keep sharing one dispatcher per candidate set across pickling and copying
+        return NodeDispatcher.for_candidates, (self.candidates, self.registry)
+
+    @staticmethod
+    def get_key(line):
+        stripped = line.lstrip()
+        if not stripped:
+            return BLANK_KEY
+        if stripped[0] in ascii_letters:
+            return stripped.split(None, 1)[0].lower()
+        return stripped[0]
+
+    @staticmethod
+    def accepts(node_cls, key):
+        """Check whether node_cls's routing hints allow it to match lines with the given key."""
+        if node_cls.keyword is not None:
+            return key.startswith(node_cls.keyword.lower())
+        if node_cls.first_chars is not None:
+            return key[:1] in node_cls.first_chars
+        return True
+
+    def get_route(self, key):
+        route = self._routes.get(key)
+        if route is None:
+            if len(self._routes) >= self.ROUTE_CACHE_LIMIT:
+                self._routes.clear()
+            route = self._routes[key] = self.build_route(key)
+        return route
+
+    def build_route(self, key):
+        route = [c for c in self.candidates if self.accepts(c, key)]
+        if self.registry is not None:
+            for node_cls in self.registry.get_prefixed(key):
+                if node_cls in route or not node_cls.is_node_candidate or not self.accepts(node_cls, key):
+                    continue
+                position = next((i for i, c in enumerate(route) if issubclass(node_cls, c)), len(route))
+                route.insert(position, node_cls)
+        return tuple(route)
+
+    def get_node_class(self, line):
+        """Return the first candidate class matching line, or None."""
+        if line is None:
+            return None
+        if self.registry is not None and self._registry_version != self.registry.version:
+            self._routes.clear()
+            self._registry_version = self.registry.version
+        for node_cls in self.get_route(self.get_key(line)):
+            if node_cls.match(line):
+                return node_cls
+        return None
+
+
+@lru_cache(maxsize=DISPATCHER_CACHE_SIZE)
+def get_dispatcher(cls, candidates, registry):
+    return cls(candidates, registry)
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+# Entry point group third-party packages can use to provide directive classes: the entry point name is the directive
+# keyword and its value the class, e.g. `Header = my_package.directives:Header`.
+ENTRY_POINT_GROUP = 'apache_conf_parser.directives'
+
+BUILTIN_DIRECTIVES = {
+    'Include': 'apache_conf_parser.directives.include:Include',
+    'IncludeOptional': 'apache_conf_parser.directives.include:IncludeOptional',
+    'Redirect': 'apache_conf_parser.directives.redirect:Redirect',
+    'RedirectMatch': 'apache_conf_parser.directives.redirect_match:RedirectMatch',
+    'RedirectPermanent': 'apache_conf_parser.directives.redirect_permanent:RedirectPermanent',
+    'RewriteBase': 'apache_conf_parser.directives.rewrite_base:RewriteBase',
+    'RewriteCond': 'apache_conf_parser.directives.rewrite_cond:RewriteCond',
+    'RewriteEngine': 'apache_conf_parser.directives.rewrite_engine:RewriteEngine',
+    'RewriteRule': 'apache_conf_parser.directives.rewrite_rule:RewriteRule',
+}
+
+
+def load_target(target):
+    """Import and return the object named by a 'package.module:attribute' string."""
+    from importlib import import_module
+
+    module_name, _, attribute = target.partition(":")
+    return getattr(import_module(module_name), attribute)
+
+
+class DirectiveRegistry(object):
+    """
+    Map directive keywords (case-insensitively, as Apache does) to the node classes parsing them.
+
+    Classes can be registered directly or as 'package.module:Class' strings; the module of a string target is only
+    imported the first time its keyword is looked up, which the NodeDispatcher does the first time it routes a line
+    starting with that keyword. Registering a keyword replaces any previous registration.
+
+    """
+    def __init__(self, directives=None):
+        self._targets = {}
+        self._classes = {}
+        # incremented on every registration so dispatchers know to drop their cached routes
+        self.version = 0
+        for keyword, target in (directives or {}).items():
+            self.register(keyword, target)
+
+    def __reduce__(self):
+        if self is registry:
+            return 'registry'
+        return DirectiveRegistry, (dict(self._targets),)
+
+    def register(self, keyword, target):
+        folded = keyword.lower()
+        self._targets[folded] = target
+        self._classes.pop(folded, None)
+        self.version += 1
+
+    def load_entry_points(self, group=ENTRY_POINT_GROUP):
+        """Register the directive classes provided through the entry point group, without importing them yet."""
+        from importlib.metadata import entry_points
+
+        found = entry_points()
+        if hasattr(found, 'select'):
+            found = found.select(group=group)
+        else:
+            # before Python 3.10, entry_points() returns a dict of entry points by group
+            found = found.get(group, [])
+        for entry_point in found:
+            self.register(entry_point.name, entry_point.value)
+
+    def __contains__(self, keyword):
+        return keyword.lower() in self._targets
+
+    def __iter__(self):
+        return iter(sorted(self._targets))
+
+    def __len__(self):
+        return len(self._targets)
+
+    def get(self, keyword):
+        """Return the class registered for keyword, importing it if needed, or None."""
+        folded = keyword.lower()
+        node_cls = self._classes.get(folded)
+        if node_cls is None:
+            target = self._targets.get(folded)
+            if target is None:
+                return None
+            node_cls = self._classes[folded] = load_target(target) if isinstance(target, str) else target
+        return node_cls
+
+    def get_target(self, target):
+        """Return the class registered as the 'package.module:Class' string target, importing it if needed, or None."""
+        for folded, registered in self._targets.items():
+            if registered == target:
+                return self.get(folded)
+        return None
+
+    def get_prefixed(self, key):
+        """
+        Return the classes registered for keywords key starts with, shortest keyword first. This is the set of
+        registered classes whose keyword routing hint accepts key (see NodeDispatcher.accepts).
+
+        """
+        return [self.get(key[:end]) for end in range(1, len(key) + 1) if key[:end] in self._targets]
+
+
+registry = DirectiveRegistry(BUILTIN_DIRECTIVES)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+import os
+from multiprocessing import Pool
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.columnar import ColumnarTree
+from apache_conf_parser.compact import compact
+
+# How each parsed file is sent back from the worker processes. Columnar trees are the cheapest to pickle and unpickle,
+# which keeps the parent process from becoming the bottleneck; trees are regular ApacheConfParser objects.
+FORMS = {
+    'columnar': ColumnarTree.from_tree,
+    'compact': compact,
+    'tree': lambda tree: tree,
+}
+
+
+class ParseResult(object):
+    """The outcome of parsing one file: tree is None when parsing failed, with error set to the exception raised."""
+    __slots__ = ('path', 'tree', 'error')
+
+    def __init__(self, path, tree=None, error=None):
+        self.path = path
+        self.tree = tree
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return "<ParseResult %s: %s>" % (self.path, "ok" if self.ok else repr(self.error))
+
+
+def parse_file(task):
+    """Parse a single file for parse_many; errors are returned in the result instead of raised."""
+    path, form = task
+    try:
+        return ParseResult(path, FORMS[form](ApacheConfParser(path)))
+    except Exception as e:
+        return ParseResult(path, error=e)
+
+
+def parse_many(paths, workers=None, chunksize=16, ordered=True, form='columnar'):
+    """
+    Parse many configuration files across a pool of worker processes, yielding a ParseResult per path.
+
+    Results come in the order of paths, or as soon as they are ready with ordered=False. A file that can't be read
+    or parsed yields a result carrying the error rather than stopping the other files. Paths are handed to the
+    workers chunksize at a time; larger chunks cost less in communication, smaller ones balance uneven files better.
+    form selects what is sent back for each file: 'columnar' (a ColumnarTree, the default), 'compact' (a
+    CompactTree) or 'tree' (an ApacheConfParser, the most expensive to transfer). workers defaults to the number of
+    CPUs; with workers=1 the files are parsed in the calling process.
+
+    """
+    if form not in FORMS:
+        raise ValueError("Unknown form %r, expected one of: %s" % (form, ", ".join(sorted(FORMS))))
+    return iter_results(((path, form) for path in paths), workers or os.cpu_count() or 1, chunksize, ordered)
+
+
+def iter_results(tasks, workers, chunksize, ordered):
+    if workers == 1:
+        for task in tasks:
+            yield parse_file(task)
+        return
+    with Pool(workers) as pool:
+        imap = pool.imap if ordered else pool.imap_unordered
+        for result in imap(parse_file, tasks, chunksize):
+            yield result
@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+import heapq
+import re
+from urllib.parse import quote, unquote
+
+from apache_conf_parser.exceptions import DirectiveError
+from apache_conf_parser.includes import get_tree_nodes, iter_context
+from apache_conf_parser.literals import LiteralAutomaton, fold_subject, get_key_literal
+
+# Redirect status keywords, and the status of the directives implying one
+STATUS_KEYWORDS = {'permanent': 301, 'temp': 302, 'seeother': 303, 'gone': 410}
+DIRECTIVE_STATUS = {'redirect': 302, 'redirectpermanent': 301, 'redirecttemp': 302}
+
+# escaped characters and $N backreferences in the URL of a RedirectMatch
+BACKREFERENCE_PATTERN = re.compile(r"\\(.)|\$(\d)")
+
+# the path segments of a URL path; runs of slashes separate segments, as in mod_alias
+SEGMENT_PATTERN = re.compile(r"[^/]+")
+
+# characters left unescaped in the part of the path appended to a redirect's URL
+SAFE_CHARACTERS = "/:@&=+$,;!*'()~"
+
+
+def read_arguments(node, status, count):
+    """
+    Return the status of a redirect directive (status unless a Redirect or RedirectMatch gives one) and its count
+    arguments, the last being its URL, None for a status other than a redirect.
+
+    """
+    arguments = list(node.arguments)
+    if node.name.lower() in ('redirect', 'redirectmatch') and arguments and (
+            arguments[0].lower() in STATUS_KEYWORDS or arguments[0].isdigit()):
+        status = arguments.pop(0)
+        status = STATUS_KEYWORDS.get(status.lower()) or int(status)
+    redirect = 300 <= status < 400
+    if len(arguments) != (count if redirect else count - 1):
+        raise DirectiveError("Wrong number of arguments (a URL is given for redirect statuses only): %s" % node)
+    if not redirect:
+        arguments.append(None)
+    return [status] + arguments
+
+
+class RedirectEntry(object):
+    """A Redirect, RedirectPermanent or RedirectTemp directive: where it is in the configuration, and what it does."""
+    __slots__ = ('node', 'order', 'url_path', 'url', 'status', 'segments', 'slash')
+
+    def __init__(self, node, order):
+        status, url_path, url = read_arguments(node, DIRECTIVE_STATUS[node.name.lower()], 2)
+        if not url_path.startswith('/'):
+            raise DirectiveError("The URL path must start with a slash: %s" % node)
+        self.node = node
+        self.order = order
+        self.url_path = url_path
+        self.url = url
+        self.status = status
+        self.segments = SEGMENT_PATTERN.findall(url_path)
+        # a URL path ending with a slash only matches paths going on after that slash
+        self.slash = url_path.endswith('/')
+
+    def get_location(self, path, matched, query=''):
+        """Return the URL a request for path (decoded) is sent to, the first matched characters of path replaced."""
+        if self.url is None:
+            return None
+        location = self.url + quote(path[matched:], safe=SAFE_CHARACTERS)
+        if query and '?' not in location:
+            location += '?' + query
+        return location
+
+    def __repr__(self):
+        return "<RedirectEntry %s %s %s>" % (self.status, self.url_path, self.url)
+
+
+class RedirectMatchEntry(object):
+    """A RedirectMatch directive: where it is in the configuration, its compiled regex, URL and status."""
+    __slots__ = ('node', 'order', 'regex', 'url', 'status')
+
+    def __init__(self, node, order):
+        status, pattern, url = read_arguments(node, 302, 2)
+        try:
+            self.regex = re.compile(pattern)
+        except re.error as e:
+            raise DirectiveError("Invalid regular expression %r: %s" % (pattern, e))
+        self.node = node
+        self.order = order
+        self.url = url
+        self.status = status
+
+    def get_location(self, matches, query=''):
+        """Return the URL a request is sent to, with $N replaced by the (escaped) groups of the regex match."""
+        if self.url is None:
+            return None
+
+        def substitute(reference):
+            escaped, number = reference.groups()
+            if escaped is not None:
+                return escaped
+            number = int(number)
+            if number > self.regex.groups:
+                return ''
+            return quote(matches.group(number) or '', safe=SAFE_CHARACTERS)
+
+        location = BACKREFERENCE_PATTERN.sub(substitute, self.url)
+        if query and '?' not in location:
+            location += '?' + query
+        return location
+
+    def __repr__(self):
+        return "<RedirectMatchEntry %s %s %s>" % (self.status, self.regex.pattern, self.url)
+
+
+class RedirectResult(object):
+    """The redirect applying to a request: its entry, the status and the URL sent in the Location header, if any."""
+    __slots__ = ('url', 'entry', 'status', 'location')
+
+    def __init__(self, url, entry, location):
+        self.url = url
+        # the RedirectEntry or RedirectMatchEntry applying
+        self.entry = entry
+        self.status = entry.status
+        self.location = location
+
+    def __repr__(self):
+        return "<RedirectResult %s -> %s (%s)>" % (self.url, self.location, self.status)
+
+
+class SegmentTrie(object):
+    """Trie of URL paths by segment, holding the first redirect for each path with and without a trailing slash."""
+    __slots__ = ('children', 'entry', 'slash_entry')
+
+    def __init__(self):
+        self.children = {}
+        self.entry = None
+        self.slash_entry = None
+
+    def add(self, entry):
+        node = self
+        for segment in entry.segments:
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = SegmentTrie()
+            node = child
+        if entry.slash:
+            if node.slash_entry is None:
+                node.slash_entry = entry
+        elif node.entry is None:
+            node.entry = entry
+
+
+class RedirectIndex(object):
+    """
+    Find the Redirect, RedirectPermanent or RedirectTemp directive of a tree (or section) applying to a URL path.
+
+    A directive applies to a request whose path is its URL path, or starts with it followed by a slash: /docs
+    matches /docs and /docs/a but not /documents, and /docs/ matches /docs/ and /docs/a but not /docs. As in
+    mod_alias, the first directive that applies, in configuration order, wins, and the rest of the path (and the
+    query string) is appended to its URL.
+
+    The directives directly in the tree, in resolved includes and in <IfModule>, <IfDefine> and <IfVersion>
+    sections are put in a trie keyed by path segment, so finding the redirect for a path looks one node up per
+    segment, whatever the number of directives.
+
+    """
+    def __init__(self, tree):
+        self.tree = tree
+        self.rebuild()
+
+    def rebuild(self):
+        self.entries = []
+        self.trie = SegmentTrie()
+        for node in iter_context(get_tree_nodes(self.tree)):
+            if node.name.lower() in DIRECTIVE_STATUS:
+                entry = RedirectEntry(node, len(self.entries))
+                self.entries.append(entry)
+                self.trie.add(entry)
+
+    def find_match(self, path):
+        """Return (the first entry applying to a decoded path, the number of characters of path it matched)."""
+        best = None
+        matched = 0
+        node = self.trie
+        if node.slash_entry is not None and path.startswith('/'):
+            best = node.slash_entry
+            matched = len(path) - len(path.lstrip('/'))
+        for segment in SEGMENT_PATTERN.finditer(path):
+            node = node.children.get(segment.group())
+            if node is None:
+                break
+            end = segment.end()
+            entry = node.entry
+            if entry is not None and (best is None or entry.order < best.order):
+                best = entry
+                matched = end
+            entry = node.slash_entry
+            if entry is not None and (best is None or entry.order < best.order) and path.startswith('/', end):
+                best = entry
+                rest = path[end:]
+                matched = end + len(rest) - len(rest.lstrip('/'))
+        return best, matched
+
+    def find(self, path):
+        """Return the RedirectEntry applying to a URL path, or None."""
+        return self.find_match(unquote(path.partition('?')[0]))[0]
+
+    def resolve(self, url):
+        """Return the RedirectResult of a request for url (a path with an optional query string), or None."""
+        path, _, query = url.partition('?')
+        path = unquote(path)
+        entry, matched = self.find_match(path)
+        if entry is None:
+            return None
+        return RedirectResult(url, entry, entry.get_location(path, matched, query))
+
+    def resolve_many(self, urls):
+        """Yield the RedirectResult (or None) of each url in turn."""
+        resolve = self.resolve
+        for url in urls:
+            yield resolve(url)
+
+
+class RedirectMatcher(object):
+    """
+    Find the RedirectMatch directive of a tree (or section) applying to a URL path: the first one, in configuration
+    order, whose regular expression matches somewhere in the path.
+
+    Most regexes can only match paths containing some literal string: ^/blog/(.*)$ needs "/blog/". The longest such
+    string of each regex is put in an Aho-Corasick automaton (see LiteralAutomaton), and looking a path up runs it
+    once to find which strings the path contains. Only the regexes whose string was found, and those without one,
+    are run, in configuration order, until one matches. evaluations counts the regexes run so far.
+
+    The directives are read as by RedirectIndex.
+
+    """
+    def __init__(self, tree):
+        self.tree = tree
+        self.rebuild()
+
+    def rebuild(self):
+        self.entries = []
+        self.evaluations = 0
+        # orders of the regexes without a literal, and of those with each (case-sensitive, case-folded) literal
+        self.unfiltered = []
+        literals = ({}, {})
+        for node in iter_context(get_tree_nodes(self.tree)):
+            if node.name.lower() != 'redirectmatch':
+                continue
+            entry = RedirectMatchEntry(node, len(self.entries))
+            self.entries.append(entry)
+            nocase = bool(entry.regex.flags & re.IGNORECASE)
+            literal = get_key_literal(entry.regex)
+            if literal is None:
+                self.unfiltered.append(entry.order)
+            else:
+                literals[nocase].setdefault(literal, []).append(entry.order)
+        self.filters = []
+        for nocase, orders in enumerate(literals):
+            if orders:
+                self.filters.append((bool(nocase), LiteralAutomaton(orders), list(orders.values())))
+
+    def get_candidates(self, path):
+        """Return an iterator over the orders of the regexes that can match path, in configuration order."""
+        groups = [self.unfiltered]
+        for nocase, automaton, orders in self.filters:
+            subject = fold_subject(path) if nocase else path
+            if subject is None:
+                # a path that isn't ASCII can match regexes ignoring case without containing their literal
+                groups.extend(orders)
+                continue
+            for number in automaton.search(subject):
+                groups.append(orders[number])
+        if len(groups) == 1:
+            return iter(self.unfiltered)
+        return heapq.merge(*groups)
+
+    def find_match(self, path):
+        """Return (the first entry whose regex matches a decoded path, the regex match), or (None, None)."""
+        entries = self.entries
+        for order in self.get_candidates(path):
+            entry = entries[order]
+            self.evaluations += 1
+            matches = entry.regex.search(path)
+            if matches is not None:
+                return entry, matches
+        return None, None
+
+    def find(self, path):
+        """Return the RedirectMatchEntry applying to a URL path, or None."""
+        return self.find_match(unquote(path.partition('?')[0]))[0]
+
+    def resolve(self, url):
+        """Return the RedirectResult of a request for url (a path with an optional query string), or None."""
+        path, _, query = url.partition('?')
+        entry, matches = self.find_match(unquote(path))
+        if entry is None:
+            return None
+        return RedirectResult(url, entry, entry.get_location(matches, query))
+
+    def resolve_many(self, urls):
+        """Yield the RedirectResult (or None) of each url in turn."""
+        resolve = self.resolve
+        for url in urls:
+            yield resolve(url)
@@ -0,0 +1,643 @@
+#!/usr/bin/env python
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from urllib.parse import unquote
+
+from apache_conf_parser.exceptions import DirectiveError
+from apache_conf_parser.includes import get_tree_nodes, iter_context
+from apache_conf_parser.literals import LiteralAutomaton, fold_subject, get_key_literal, get_literal_prefix
+
+# RewriteRule flags, by long name, and the short names they stand for
+LONG_FLAGS = {
+    'last': 'L', 'end': 'END', 'redirect': 'R', 'nocase': 'NC', 'qsappend': 'QSA', 'qsdiscard': 'QSD',
+    'qslast': 'QSL', 'chain': 'C', 'skip': 'S', 'forbidden': 'F', 'gone': 'G', 'next': 'N', 'passthrough': 'PT',
+    'noescape': 'NE', 'env': 'E', 'type': 'T', 'handler': 'H', 'cookie': 'CO', 'nosubreq': 'NS',
+    'discardpath': 'DPI', 'escape': 'B', 'backrefnoplus': 'BNP', 'unsafeallow3f': 'UNSAFEALLOW3F',
+    'unsafeprefixstat': 'UNSAFEPREFIXSTAT', 'ornext': 'OR', 'novary': 'NV',
+}
+# flags accepted but without effect on the simulation (escaping, handlers, cookies, subrequests...)
+IGNORED_FLAGS = frozenset(['PT', 'NE', 'T', 'H', 'CO', 'NS', 'DPI', 'B', 'BNP', 'QSL', 'UNSAFEALLOW3F',
+                           'UNSAFEPREFIXSTAT'])
+RULE_FLAGS = frozenset(['L', 'END', 'R', 'NC', 'QSA', 'QSD', 'C', 'S', 'F', 'G', 'N', 'E']) | IGNORED_FLAGS
+CONDITION_FLAGS = frozenset(['NC', 'OR', 'NV'])
+
+REDIRECT_CODES = {'permanent': 301, 'temp': 302, 'seeother': 303}
+
+# RewriteCond patterns that aren't regular expressions
+FILE_TESTS = frozenset(['-d', '-f', '-F', '-s', '-l', '-L', '-h', '-x', '-U'])
+INTEGER_TESTS = {
+    '-eq': lambda a, b: a == b, '-ne': lambda a, b: a != b, '-lt': lambda a, b: a < b,
+    '-le': lambda a, b: a <= b, '-gt': lambda a, b: a > b, '-ge': lambda a, b: a >= b,
+}
+STRING_TESTS = {
+    '<=': lambda a, b: a <= b, '>=': lambda a, b: a >= b, '=': lambda a, b: a == b,
+    '<': lambda a, b: a < b, '>': lambda a, b: a > b,
+}
+
+# escaped characters, $N rule and %N condition backreferences, and %{VARIABLE} server variables
+TEMPLATE_PATTERN = re.compile(r"\\(.)|\$(\d)|%(\d)|%\{([^}]*)\}")
+ABSOLUTE_URL_PATTERN = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*://([^/?#]*)(.*)$")
+
+# Passes over the rules allowed by the N flag, and per-directory passes after an internal rewrite, before the
+# request fails with a 500 as in Apache (LimitInternalRecursion).
+MAX_ROUNDS = 32000
+MAX_REDIRECTS = 10
+
+# outcomes of a pass over the rules
+LAST, NEXT, END = 'last', 'next', 'end'
+
+
+@lru_cache(maxsize=4096)
+def compile_pattern(pattern, nocase=False):
+    """Compile a RewriteRule or RewriteCond regular expression, cached across simulators."""
+    try:
+        return re.compile(pattern, re.IGNORECASE if nocase else 0)
+    except re.error as e:
+        raise DirectiveError("Invalid regular expression %r: %s" % (pattern, e))
+
+
+@lru_cache(maxsize=4096)
+def compile_template(text):
+    """Split a substitution or test string into literal strings and ('$' or '%', number) or ('{', name) parts."""
+    parts = []
+    position = 0
+    for matches in TEMPLATE_PATTERN.finditer(text):
+        literal = text[position:matches.start()]
+        escaped, rule_group, condition_group, variable = matches.groups()
+        if escaped is not None:
+            literal += escaped
+        if literal:
+            if parts and isinstance(parts[-1], str):
+                parts[-1] += literal
+            else:
+                parts.append(literal)
+        if rule_group is not None:
+            parts.append(('$', int(rule_group)))
+        elif condition_group is not None:
+            parts.append(('%', int(condition_group)))
+        elif variable is not None:
+            parts.append(('{', variable))
+        position = matches.end()
+    if position < len(text):
+        if parts and isinstance(parts[-1], str):
+            parts[-1] += text[position:]
+        else:
+            parts.append(text[position:])
+    return tuple(parts)
+
+
+def parse_flags(argument, allowed, node):
+    """Return the [flag,flag=value] argument of a rule or condition as (short name, value) pairs."""
+    flags = []
+    if argument is None:
+        return flags
+    if not (argument.startswith('[') and argument.endswith(']')):
+        raise DirectiveError("Invalid flags %r in: %s" % (argument, node))
+    for flag in argument[1:-1].split(','):
+        flag = flag.strip()
+        if not flag:
+            continue
+        name, _, value = flag.partition('=')
+        name = LONG_FLAGS.get(name.lower(), name.upper())
+        if name not in allowed:
+            raise DirectiveError("Unknown flag %r in: %s" % (flag, node))
+        flags.append((name, value))
+    return flags
+
+
+def remove_quotes(argument):
+    """Return an argument without the quotes around it, or unchanged if it isn't quoted."""
+    if len(argument) > 1 and argument[0] == argument[-1] and argument[0] in "\"'":
+        return argument[1:-1]
+    return argument
+
+
+class RewriteCondition(object):
+    """A compiled RewriteCond: its test string template and what the expanded string is checked against."""
+    __slots__ = ('node', 'test_string', 'pattern', 'negated', 'nocase', 'ornext', 'kind', 'check')
+
+    def __init__(self, node):
+        arguments = [remove_quotes(argument) for argument in node.arguments]
+        if len(arguments) not in (2, 3):
+            raise DirectiveError("RewriteCond expects a test string, a pattern and optional flags: %s" % node)
+        self.node = node
+        self.test_string = compile_template(arguments[0])
+        flags = dict(parse_flags(arguments[2] if len(arguments) > 2 else None, CONDITION_FLAGS, node))
+        self.nocase = 'NC' in flags
+        self.ornext = 'OR' in flags
+        pattern = arguments[1]
+        self.negated = pattern.startswith('!')
+        if self.negated:
+            pattern = pattern[1:]
+        self.pattern = pattern
+        if pattern in FILE_TESTS:
+            self.kind = 'file'
+            self.check = pattern
+        elif pattern[:3] in INTEGER_TESTS:
+            self.kind = 'integer'
+            self.check = (INTEGER_TESTS[pattern[:3]], pattern[3:].strip())
+        elif pattern[:2] in STRING_TESTS or pattern[:1] in STRING_TESTS:
+            operator = pattern[:2] if pattern[:2] in STRING_TESTS else pattern[:1]
+            operand = remove_quotes(pattern[len(operator):])
+            self.kind = 'string'
+            self.check = (STRING_TESTS[operator], operand.lower() if self.nocase else operand)
+        else:
+            self.kind = 'regex'
+            self.check = compile_pattern(pattern, self.nocase)
+
+    def test(self, value, simulator, state):
+        """Return (whether the condition holds, the regex match to take %N backreferences from or None)."""
+        kind = self.kind
+        if kind == 'regex':
+            matches = self.check.search(value)
+            if self.negated:
+                return matches is None, None
+            return matches is not None, matches
+        if kind == 'file':
+            result = simulator.file_test(self.check, value)
+        elif kind == 'integer':
+            compare, operand = self.check
+            try:
+                result = compare(int(value), int(operand))
+            except ValueError:
+                result = False
+        else:
+            compare, operand = self.check
+            result = compare(value.lower() if self.nocase else value, operand)
+        return result != self.negated, None
+
+
+class CompiledRule(object):
+    """A compiled RewriteRule with its flags and the RewriteCond directives preceding it."""
+    __slots__ = ('node', 'pattern', 'negated', 'regex', 'substitution', 'conditions', 'last', 'end', 'redirect',
+                 'qsa', 'qsd', 'chain', 'skip', 'status', 'next', 'env')
+
+    def __init__(self, node, conditions):
+        arguments = [remove_quotes(argument) for argument in node.arguments]
+        if len(arguments) not in (2, 3):
+            raise DirectiveError("RewriteRule expects a pattern, a substitution and optional flags: %s" % node)
+        self.node = node
+        self.conditions = conditions
+        flags = parse_flags(arguments[2] if len(arguments) > 2 else None, RULE_FLAGS, node)
+        names = {name: value for name, value in flags}
+        pattern = arguments[0]
+        self.negated = pattern.startswith('!')
+        self.pattern = pattern[1:] if self.negated else pattern
+        self.regex = compile_pattern(self.pattern, 'NC' in names)
+        self.substitution = None if arguments[1] == '-' else compile_template(arguments[1])
+        self.last = 'L' in names
+        self.end = 'END' in names
+        self.qsa = 'QSA' in names
+        self.qsd = 'QSD' in names
+        self.chain = 'C' in names
+        self.next = 'N' in names
+        self.redirect = None
+        if 'R' in names:
+            code = names['R'] or '302'
+            if code.isdigit():
+                self.redirect = int(code)
+            elif code.lower() in REDIRECT_CODES:
+                self.redirect = REDIRECT_CODES[code.lower()]
+            else:
+                raise DirectiveError("Invalid redirect status in: %s" % node)
+        self.status = 403 if 'F' in names else 410 if 'G' in names else None
+        try:
+            self.skip = int(names.get('S') or 0)
+        except ValueError:
+            raise DirectiveError("Invalid skip count in: %s" % node)
+        self.env = [compile_template(value) for name, value in flags if name == 'E']
+
+
+class RewriteStep(object):
+    """One rule tried while evaluating a URL: the string its pattern was matched against and, if it applied, the
+    resulting URL (None for a rule that didn't match, or whose conditions failed)."""
+    __slots__ = ('rule', 'input', 'matched', 'output')
+
+    def __init__(self, rule, input, matched, output=None):
+        self.rule = rule
+        self.input = input
+        self.matched = matched
+        self.output = output
+
+    def __repr__(self):
+        if not self.matched:
+            return "<RewriteStep %s: %r no match>" % (self.rule.content, self.input)
+        return "<RewriteStep %s: %r -> %r>" % (self.rule.content, self.input, self.output)
+
+
+class RewriteResult(object):
+    """
+    The outcome of evaluating a URL: target is the rewritten URL (path and query string, or the absolute URL of an
+    external redirect), status is the redirect or error status (None for an internal rewrite or no change), trace
+    holds a RewriteStep per rule tried and env the environment variables set by E flags.
+
+    Results can be shared between identical requests through the simulator's cache, so don't modify them.
+
+    """
+    __slots__ = ('url', 'target', 'status', 'trace', 'env')
+
+    def __init__(self, url, target, status, trace, env):
+        self.url = url
+        self.target = target
+        self.status = status
+        self.trace = trace
+        self.env = env
+
+    @property
+    def redirect(self):
+        return self.status is not None and 300 <= self.status < 400
+
+    @property
+    def rewritten(self):
+        return any(step.matched for step in self.trace)
+
+    def __repr__(self):
+        return "<RewriteResult %s -> %s%s>" % (self.url, self.target,
+                                               "" if self.status is None else " (%s)" % self.status)
+
+
+class RequestState(object):
+    """The request being rewritten, as a pass over the rules sees and changes it."""
+    __slots__ = ('path', 'query', 'host', 'status', 'location', 'variables', 'env', 'trace')
+
+    def __init__(self, path, query, variables):
+        self.path = path
+        self.query = query
+        self.variables = variables
+        self.host = variables.get('HTTP_HOST', '').lower()
+        self.status = None
+        # the absolute URL of a redirect to another host
+        self.location = None
+        self.env = {}
+        self.trace = []
+
+    def get_url(self):
+        url = self.location if self.location is not None else self.path
+        return url + '?' + self.query if self.query else url
+
+
+class RulePrefilter(object):
+    """
+    Index of the literal strings RewriteRule patterns need, telling which rules can match a string without running
+    their regexes.
+
+    Each pattern is keyed by the literal prefix it is anchored with (^blog/ needs "blog/" at the start), or else by
+    the longest literal it contains anywhere (\\.php$ needs ".php"); see get_literal_prefix and get_required_literals.
+    Prefixes are looked up in a dict per prefix length and contained literals with a LiteralAutomaton, once per
+    string. Rules without a key and negated rules (which match when their regex doesn't) are always candidates, as
+    are rules ignoring case when the string isn't ASCII (see fold_subject).
+    keys holds each rule's (kind, literal), kind being 'prefix', 'literal' or None, for audits.
+
+    Rules that can't match fail as usual, so the chain they're in is skipped: chains are contiguous, and blocks maps
+    each rule to the number of the chain (or lone rule) it belongs to, and ends to the index following its chain.
+
+    """
+    def __init__(self, rules):
+        self.keys = []
+        self.unfiltered = []
+        # (nocase, prefix length) -> {prefix: [rule indexes]}, and nocase -> {literal: [rule indexes]}
+        prefixes = {}
+        literals = ({}, {})
+        for index, rule in enumerate(rules):
+            nocase = bool(rule.regex.flags & re.IGNORECASE)
+            prefix = None if rule.negated else get_literal_prefix(rule.regex)
+            literal = None if rule.negated or prefix is not None else get_key_literal(rule.regex)
+            if prefix is not None:
+                self.keys.append(('prefix', prefix))
+                prefixes.setdefault((nocase, len(prefix)), {}).setdefault(prefix, []).append(index)
+            elif literal is not None:
+                self.keys.append(('literal', literal))
+                literals[nocase].setdefault(literal, []).append(index)
+            else:
+                self.keys.append((None, None))
+                self.unfiltered.append(index)
+        self.prefixes = sorted(prefixes.items())
+        self.automata = [(bool(nocase), LiteralAutomaton(table), list(table.values()))
+                         for nocase, table in enumerate(literals) if table]
+        # whether any key is looked up case-insensitively
+        self.nocase = bool(literals[True]) or any(nocase for nocase, _ in prefixes)
+        self.chained = [rule.chain for rule in rules]
+        self.blocks = []
+        self.ends = []
+        block = 0
+        start = 0
+        for index, rule in enumerate(rules):
+            self.blocks.append(block)
+            if not rule.chain or index == len(rules) - 1:
+                block += 1
+                self.ends += [index + 1] * (index + 1 - start)
+                start = index + 1
+
+    def get_candidates(self, subject):
+        """Return the sorted indexes of the rules whose pattern can match subject."""
+        groups = [self.unfiltered]
+        lowered = fold_subject(subject) if self.nocase else None
+        for (nocase, length), table in self.prefixes:
+            if nocase and lowered is None:
+                groups.extend(table.values())
+                continue
+            if length > len(subject):
+                continue
+            found = table.get(lowered[:length] if nocase else subject[:length])
+            if found is not None:
+                groups.append(found)
+        for nocase, automaton, indexes in self.automata:
+            if nocase and lowered is None:
+                groups.extend(indexes)
+                continue
+            for number in automaton.search(lowered if nocase else subject):
+                groups.append(indexes[number])
+        if len(groups) == 1:
+            return self.unfiltered
+        return sorted([index for group in groups for index in group])
+
+    def skip(self, stop):
+        """
+        Return where to go on from after the rules up to stop (excluded) failed: stop, or the end of its chain when
+        the failure of the rule before it skips it.
+
+        """
+        if stop < len(self.ends) and self.chained[stop - 1]:
+            return self.ends[stop]
+        return stop
+
+    def count_tried(self, start, stop):
+        """Return how many of the failing rules from start to stop (excluded) are tried: the first of each chain."""
+        return self.blocks[stop - 1] - self.blocks[start] + 1
+
+    def iter_tried(self, start, stop):
+        while start < stop:
+            yield start
+            start = self.ends[start]
+
+
+class RewriteSimulator(object):
+    """
+    Evaluate the RewriteEngine, RewriteBase, RewriteCond and RewriteRule directives of a tree or section against
+    request URLs offline, as mod_rewrite would.
+
+    The directives directly in the tree (or section), in resolved includes and in <IfModule>, <IfDefine> and
+    <IfVersion> sections are compiled once; patterns go through a cache shared by every simulator. Rules only run
+    when the last RewriteEngine says on. Each rule's pattern is matched against the URL path, then its conditions
+    (grouped with [OR]) are checked, and $N, %N and %{VARIABLE} are substituted. The L, END, R, NC, QSA, QSD, C, S,
+    F, G, N and E flags are simulated; flags concerning escaping, handlers and cookies are accepted and ignored.
+
+    With per_directory=True (for .htaccess files and <Directory> sections), the directory prefix, a URL path such as
+    '/blog/', is stripped before matching, relative substitutions are prefixed with the RewriteBase (or directory),
+    and the rules run again after an internal rewrite until the URL no longer changes, as Apache does.
+
+    Request variables (HTTP_HOST, HTTPS, REQUEST_METHOD, HTTP_USER_AGENT, REMOTE_ADDR...) are passed as keyword
+    arguments to evaluate. REQUEST_URI, QUERY_STRING and REQUEST_FILENAME (the path under document_root, if given)
+    follow the URL being rewritten. File tests (-f, -d...) call file_test(test, path), which by default reports
+    every file as missing. Results are kept in an LRU cache of cache_size entries, so replaying access logs with
+    repeated URLs only evaluates each distinct request once.
+
+    With prefilter=True, a RulePrefilter skips the rules whose pattern can't match the URL without running their
+    regexes, with the same results; evaluations counts the regexes run, and avoided those skipped. With
+    full_trace=False, results only trace the rules that applied, which saves recording every rule tried.
+
+    """
+    def __init__(self, tree, per_directory=False, directory='/', document_root=None, file_test=None,
+                 cache_size=65536, prefilter=True, full_trace=True):
+        self.tree = tree
+        self.per_directory = per_directory
+        self.directory = directory.rstrip('/') + '/'
+        self.document_root = document_root.rstrip('/') if document_root is not None else None
+        if file_test is not None:
+            self.file_test = file_test
+        self.enabled = False
+        self.base = None
+        self.rules = []
+        self.full_trace = full_trace
+        self.evaluations = 0
+        self.avoided = 0
+        self.compile()
+        self.prefilter = RulePrefilter(self.rules) if prefilter else None
+        self._evaluate_cached = lru_cache(maxsize=cache_size)(self._evaluate) if cache_size else self._evaluate
+
+    @staticmethod
+    def file_test(test, path):
+        return False
+
+    def compile(self):
+        conditions = []
+        for node in iter_context(get_tree_nodes(self.tree)):
+            name = node.name.lower()
+            if name == 'rewriteengine':
+                self.enabled = bool(node.arguments) and node.arguments[0].lower() == 'on'
+            elif name == 'rewritebase' and node.arguments:
+                self.base = node.arguments[0].rstrip('/') + '/'
+            elif name == 'rewritecond':
+                conditions.append(RewriteCondition(node))
+            elif name == 'rewriterule':
+                self.rules.append(CompiledRule(node, conditions))
+                conditions = []
+
+    def evaluate(self, url, **variables):
+        """Return the RewriteResult of a request for url (a path with an optional query string)."""
+        return self._evaluate_cached(url, tuple(sorted(variables.items())))
+
+    def evaluate_many(self, urls, **variables):
+        """Yield the RewriteResult of each url in turn, sharing the request variables and the cache."""
+        evaluate = self._evaluate_cached
+        variables = tuple(sorted(variables.items()))
+        for url in urls:
+            yield evaluate(url, variables)
+
+    def cache_info(self):
+        return self._evaluate_cached.cache_info() if hasattr(self._evaluate_cached, 'cache_info') else None
+
+    def _evaluate(self, url, variables):
+        path, _, query = url.partition('?')
+        state = RequestState(unquote(path), query, dict(variables))
+        if not self.enabled or not self.rules:
+            return RewriteResult(url, url, None, (), {})
+        rounds = 0
+        passes = 0
+        while True:
+            previous = state.path
+            if self.per_directory and not (state.path + '/').startswith(self.directory):
+                break
+            outcome = self.apply_rules(state)
+            if outcome == NEXT:
+                rounds += 1
+                if rounds >= MAX_ROUNDS:
+                    state.status = 500
+                    break
+                continue
+            if outcome == END or not self.per_directory:
+                break
+            if state.status is not None or state.location is not None or state.path == previous:
+                break
+            # the rewritten request goes through the .htaccess rules again
+            passes += 1
+            if passes >= MAX_REDIRECTS:
+                state.status = 500
+                break
+        target = state.get_url()
+        if state.location is None and state.status is not None and 300 <= state.status < 400 and state.host:
+            # redirects are sent as absolute URLs
+            scheme = 'https' if state.variables.get('HTTPS', '').lower() == 'on' else 'http'
+            target = '%s://%s%s' % (scheme, state.variables['HTTP_HOST'], target)
+        return RewriteResult(url, target, state.status, tuple(state.trace), state.env)
+
+    def get_subject(self, path):
+        """Return the string rule patterns are matched against: the path, without the directory per-directory."""
+        if self.per_directory:
+            return path[len(self.directory):] if path.startswith(self.directory) else ''
+        return path
+
+    def apply_rules(self, state):
+        """Apply the rules once to state, and return whether to stop (LAST or END) or start over (NEXT)."""
+        rules = self.rules
+        count = len(rules)
+        prefilter = self.prefilter
+        full_trace = self.full_trace
+        path = None
+        index = 0
+        while index < count:
+            if state.path is not path:
+                path = state.path
+                subject = self.get_subject(path)
+                if prefilter is not None:
+                    candidates = prefilter.get_candidates(subject)
+            if prefilter is not None:
+                position = bisect_left(candidates, index)
+                stop = candidates[position] if position < len(candidates) else count
+                if stop > index:
+                    # the rules up to the next candidate can't match: they fail without running their regexes
+                    self.avoided += prefilter.count_tried(index, stop)
+                    if full_trace:
+                        state.trace.extend(RewriteStep(rules[tried].node, subject, False)
+                                           for tried in prefilter.iter_tried(index, stop))
+                    index = prefilter.skip(stop)
+                    continue
+            rule = rules[index]
+            index += 1
+            self.evaluations += 1
+            matches = rule.regex.search(subject)
+            matched = matches is None if rule.negated else matches is not None
+            if rule.negated:
+                matches = None
+            condition_matches = None
+            if matched and rule.conditions:
+                matched, condition_matches = self.check_conditions(rule, matches, state)
+            if not matched:
+                if full_trace:
+                    state.trace.append(RewriteStep(rule.node, subject, False))
+                # the rest of a chain is skipped with the rule that failed
+                while index < count and rules[index - 1].chain:
+                    index += 1
+                continue
+            self.apply_rule(rule, matches, condition_matches, state)
+            state.trace.append(RewriteStep(rule.node, subject, True, state.get_url()))
+            if rule.status is not None:
+                state.status = rule.status
+                return END
+            if rule.end:
+                return END
+            if rule.last:
+                return LAST
+            if rule.next:
+                return NEXT
+            index += rule.skip
+        return LAST
+
+    def check_conditions(self, rule, matches, state):
+        """Return whether the conditions of a rule hold, and the last condition match for %N backreferences."""
+        conditions = rule.conditions
+        count = len(conditions)
+        last_match = None
+        result = True
+        index = 0
+        while index < count:
+            condition = conditions[index]
+            value = self.expand(condition.test_string, matches, last_match, state)
+            result, condition_match = condition.test(value, self, state)
+            if condition_match is not None:
+                last_match = condition_match
+            if condition.ornext:
+                if result:
+                    # the rest of the [OR] group needn't be checked
+                    while index < count - 1 and conditions[index].ornext:
+                        index += 1
+            elif not result:
+                return False, last_match
+            index += 1
+        return result, last_match
+
+    def apply_rule(self, rule, matches, condition_matches, state):
+        for template in rule.env:
+            assignment = self.expand(template, matches, condition_matches, state)
+            if assignment.startswith('!'):
+                state.env.pop(assignment[1:], None)
+            else:
+                name, _, value = assignment.partition(':')
+                state.env[name] = value
+        if rule.redirect is not None:
+            state.status = rule.redirect
+        if rule.substitution is not None:
+            target = self.expand(rule.substitution, matches, condition_matches, state)
+            target, separator, query = target.partition('?')
+            if separator:
+                # a query string in the substitution replaces the request's, or comes first with [QSA]
+                if rule.qsa and state.query:
+                    query = query + '&' + state.query if query else state.query
+                state.query = query
+            absolute = ABSOLUTE_URL_PATTERN.match(target)
+            if absolute is not None:
+                host, path = absolute.groups()
+                if host.lower() != state.host or rule.redirect is not None:
+                    # a URL on another host is always an external redirect
+                    state.location = target
+                    if state.status is None:
+                        state.status = 302
+                else:
+                    state.path = path or '/'
+            elif target.startswith('/'):
+                state.path = target
+            else:
+                state.path = (self.base or self.directory if self.per_directory else '/') + target
+        if rule.qsd:
+            state.query = ''
+
+    def expand(self, template, matches, condition_matches, state):
+        """Substitute backreferences and server variables in a template from compile_template."""
+        if len(template) == 1 and isinstance(template[0], str):
+            return template[0]
+        parts = []
+        for part in template:
+            if isinstance(part, str):
+                parts.append(part)
+                continue
+            kind, key = part
+            if kind == '$':
+                source = matches
+            elif kind == '%':
+                source = condition_matches
+            else:
+                parts.append(self.get_variable(key, state))
+                continue
+            if source is not None and key <= source.re.groups:
+                parts.append(source.group(key) or '')
+        return ''.join(parts)
+
+    def get_variable(self, name, state):
+        if name.startswith('HTTP:'):
+            return state.variables.get('HTTP_' + name[5:].upper().replace('-', '_'), '')
+        if name.startswith('ENV:'):
+            return state.env.get(name[4:], state.variables.get(name[4:], ''))
+        if name == 'REQUEST_URI':
+            return state.path
+        if name == 'QUERY_STRING':
+            return state.query
+        if name == 'REQUEST_FILENAME' or name == 'SCRIPT_FILENAME':
+            if name in state.variables:
+                return state.variables[name]
+            return self.document_root + state.path if self.document_root is not None else state.path
+        if name == 'HTTPS':
+            return state.variables.get('HTTPS', 'off')
+        if name == 'REQUEST_METHOD':
+            return state.variables.get('REQUEST_METHOD', 'GET')
+        return state.variables.get(name, '')
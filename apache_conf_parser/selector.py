@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+import re
+from functools import lru_cache
+
+from apache_conf_parser.directives import Directive
+from apache_conf_parser.exceptions import SelectorError
+
+# combinators: anywhere below the previous compound, or directly in its body
+DESCENDANT, CHILD = ' ', '>'
+
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?P<child>>)\s*
+  | (?P<space>\s+)
+  | (?P<name>\*|%s)
+  | \[\s*(?:(?P<key>\w+)\s*(?P<operator>[!^$*]?=)\s*)?(?P<value>"[^"]*"|'[^']*'|[^\]]*?)\s*\]
+""" % Directive.name_regexp, re.VERBOSE)
+
+OPERATORS = {
+    '=': lambda actual, value: actual == value,
+    '^=': lambda actual, value: actual.startswith(value),
+    '$=': lambda actual, value: actual.endswith(value),
+    '*=': lambda actual, value: value in actual,
+}
+
+
+def strip_quotes(text):
+    """Return an argument without the quotes around it, or None if it isn't quoted."""
+    if len(text) > 1 and text[0] in ('"', "'") and text[-1] == text[0]:
+        return text[1:-1]
+    return None
+
+
+def get_attribute(node, key):
+    if key.isdigit():
+        arguments = node.arguments
+        position = int(key)
+        return arguments[position] if position < len(arguments) else None
+    return getattr(node, key, None)
+
+
+def make_test(key, operator, value):
+    """Return a function checking a directive against one [key operator value] (or [value]) condition."""
+    if key is None:
+        return lambda node: any(argument == value or strip_quotes(argument) == value for argument in node.arguments)
+    if operator == '!=':
+        equals = make_test(key, '=', value)
+        return lambda node: not equals(node)
+    operator_compare = OPERATORS[operator]
+
+    def compare(actual, value):
+        # "/var/www" matches both [0=/var/www] and [0='"/var/www"']
+        if operator_compare(actual, value):
+            return True
+        unquoted = strip_quotes(actual)
+        return unquoted is not None and operator_compare(unquoted, value)
+
+    def test(node):
+        actual = get_attribute(node, key)
+        if actual is None:
+            return False
+        if isinstance(actual, str):
+            return compare(actual, value)
+        if hasattr(actual, '__iter__'):
+            # list attributes, such as arguments or RewriteRule.flags, match when any of their items does
+            return any(item is not None and compare(str(item), value) for item in actual)
+        return compare(str(actual), value)
+    return test
+
+
+class Compound(object):
+    """A directive or section name (or * for any) with the conditions a node must all meet, e.g. Redirect[status=301]."""
+    __slots__ = ('name', 'tests', 'text')
+
+    def __init__(self, name, tests, text):
+        self.name = None if name is None or name == '*' else name.lower()
+        self.tests = tuple(tests)
+        self.text = text
+
+    def matches(self, node):
+        if not isinstance(node, Directive):
+            return False
+        if self.name is not None:
+            name = node.name
+            if name is None or name.lower() != self.name:
+                return False
+        for test in self.tests:
+            if not test(node):
+                return False
+        return True
+
+    def __repr__(self):
+        return "<Compound %s>" % self.text
+
+
+def parse_selector(text):
+    """Split a selector into (combinator, Compound) steps. Raises SelectorError for invalid selectors."""
+    text = text.strip()
+    steps = []
+    combinator = DESCENDANT
+    name = None
+    tests = []
+    start = 0
+    position = 0
+    while position < len(text):
+        token = TOKEN_PATTERN.match(text, position)
+        if token is None:
+            raise SelectorError("Invalid selector %r at position %s." % (text, position))
+        if token.group('child') is not None or token.group('space') is not None:
+            if position == start:
+                raise SelectorError("Selector %r has a combinator without a compound before it." % text)
+            steps.append((combinator, Compound(name, tests, text[start:position])))
+            combinator = CHILD if token.group('child') is not None else DESCENDANT
+            name = None
+            tests = []
+            start = token.end()
+        elif token.group('name') is not None:
+            if position != start:
+                raise SelectorError("Selector %r has a name after a condition at position %s." % (text, position))
+            name = token.group('name')
+        else:
+            value = token.group('value')
+            if value[:1] in ('"', "'"):
+                value = value[1:-1]
+            elif not value:
+                raise SelectorError("Selector %r has an empty condition at position %s." % (text, position))
+            tests.append(make_test(token.group('key'), token.group('operator'), value))
+        position = token.end()
+    if position == start:
+        raise SelectorError("Selector %r doesn't end with a compound." % text)
+    steps.append((combinator, Compound(name, tests, text[start:])))
+    return steps
+
+
+class Selector(object):
+    """
+    A compiled selector, finding directives and sections by name, arguments and attributes, as in CSS.
+
+    A selector is a sequence of compounds, separated by combinators: whitespace for "anywhere in the body of" and
+    `>` for "directly in the body of". A compound is a case-insensitive directive or section name, or * for any,
+    followed by conditions in brackets, all of which must hold:
+
+    - `[value]`: one of the arguments is value, e.g. VirtualHost[*:443];
+    - `[key=value]`: the attribute or match group key (e.g. status for Redirect, flags for RewriteRule) or, when key
+      is a number, the argument at that position, equals value. `!=`, `^=` (starts with), `$=` (ends with) and `*=`
+      (contains) are supported too. Attributes holding lists match when any of their items does.
+
+    Values can be quoted with " or ' to hold spaces, brackets or =, and quoted arguments match with or without their
+    quotes: Directory[/var/www] and Directory["/var/www"] both match <Directory "/var/www">. For example
+    `VirtualHost[*:443] > Directory[/var/www] RewriteRule` finds the RewriteRules anywhere in a Directory section for
+    /var/www that is directly inside a VirtualHost for *:443.
+
+    Selecting from a tree walks it top-down, only testing the compounds that can match at each depth and skipping
+    the directives of bodies where only a section could still match. On a tree with a NameIndex (see
+    ApacheConfParser.build_index) whose last compound has a name, the nodes with that name are looked up and only
+    their enclosing sections are checked.
+
+    """
+    def __init__(self, text):
+        self.text = text
+        steps = parse_selector(text)
+        self.combinators = tuple(combinator for combinator, _ in steps)
+        self.compounds = tuple(compound for _, compound in steps)
+        self.last = len(steps) - 1
+        # (steps, matched steps) -> the steps of a body, see collect
+        self._body_steps = {}
+
+    def __repr__(self):
+        return "<Selector %s>" % self.text
+
+    def select(self, tree, use_index=True):
+        """
+        Return the directives and sections below tree (a parser, a section or a section's body) that match, in
+        document order, whether or not they're looked up through the tree's index.
+
+        """
+        index = getattr(tree, 'index', None)
+        if use_index and index is not None and index.root is tree and self.compounds[-1].name is not None:
+            return self.select_indexed(index)
+        found = []
+        self.collect(getattr(tree, 'body', tree).nodes.items, (0,), found)
+        return found
+
+    def collect(self, nodes, steps, found):
+        """
+        Append the nodes matching among nodes and inside their sections to found. steps are the steps the nodes can
+        match at this depth (step 0 can match anywhere). Recursion is bounded by ComplexNode.NESTING_LIMIT.
+
+        """
+        compounds = self.compounds
+        last = self.last
+        final = compounds[last] if last in steps else None
+        for node in nodes:
+            if not getattr(type(node), 'complex', False):
+                # only the last step can match a directive without a body
+                if final is not None and final.matches(node):
+                    found.append(node)
+                continue
+            matched = [step for step in steps if compounds[step].matches(node)]
+            # steps are sorted, so the last step is matched last
+            if matched and matched[-1] == last:
+                found.append(node)
+            # steps that can still match further down, and the steps following the ones this section matched
+            body_steps = self.get_body_steps(steps, tuple(matched))
+            self.collect(node.body.nodes.items, body_steps, found)
+
+    def get_body_steps(self, steps, matched):
+        key = (steps, matched)
+        body_steps = self._body_steps.get(key)
+        if body_steps is None:
+            descendants = [step for step in steps if self.combinators[step] == DESCENDANT]
+            following = [step + 1 for step in matched if step < self.last]
+            body_steps = self._body_steps[key] = tuple(sorted(set(descendants + following)))
+        return body_steps
+
+    def select_indexed(self, index):
+        final = self.compounds[-1]
+        found = []
+        for node in index.find(final.name):
+            if final.matches(node) and self.match_parents(index.get_parents(node), self.last - 1, -1):
+                found.append(node)
+        return found
+
+    def match(self, node, parents=()):
+        """Check whether node matches, given the sections enclosing it, outermost first."""
+        return self.compounds[-1].matches(node) and self.match_parents(list(parents), self.last - 1, -1)
+
+    def match_parents(self, parents, step, position):
+        """
+        Check whether steps 0 to step match the sections in parents before position (counted from the end), given
+        that step + 1 matched the node below parents[position + 1].
+
+        """
+        if step < 0:
+            return True
+        compound = self.compounds[step]
+        if self.combinators[step + 1] == CHILD:
+            if len(parents) + position < 0:
+                return False
+            return compound.matches(parents[position]) and self.match_parents(parents, step - 1, position - 1)
+        for candidate in range(position, -len(parents) - 1, -1):
+            if compound.matches(parents[candidate]) and self.match_parents(parents, step - 1, candidate - 1):
+                return True
+        return False
+
+
+@lru_cache(maxsize=256)
+def compile_selector(text):
+    """Return the Selector for text, compiled once and shared by every call with the same text."""
+    return Selector(text)
+
+
+def select(tree, selector):
+    """Return the nodes below tree matching selector, a Selector or the text of one; see Selector.select."""
+    if isinstance(selector, str):
+        selector = compile_selector(selector)
+    return selector.select(tree)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+import unittest
+
+from parameterized import parameterized
+
+from apache_conf_parser.directives.include import Include, IncludeOptional
+
+
+class TestInclude(unittest.TestCase):
+
+    @parameterized.expand([
+        ("file", 'Include conf/extra.conf', 'conf/extra.conf'),
+        ("wildcard", 'Include conf.d/*.conf', 'conf.d/*.conf'),
+        ("quoted", 'Include "conf/my extra.conf"', 'conf/my extra.conf'),
+        ("lowercase", 'include conf/extra.conf', 'conf/extra.conf'),
+    ])
+    def test_matches_valid_directives(self, name, directive_line, expected_file_path):
+        directive = Include()
+        directive.add_line(directive_line)
+        self.assertIsNotNone(
+            obj=directive.matches,
+            msg='Directive expected to match Include for "%s" ("%s"), it did not match.' % (name, directive_line)
+        )
+        self.assertEqual(directive.file_path, expected_file_path)
+        self.assertFalse(directive.optional)
+        self.assertIsNone(directive.included)
+
+    @parameterized.expand([
+        ("optional", 'IncludeOptional conf.d/*.conf'),
+        ("wrong directive name", 'Redirect /some/path'),
+    ])
+    def test_does_not_match_invalid_directives(self, name, directive_line):
+        self.assertFalse(Include.match(directive_line), msg=name)
+
+
+class TestIncludeOptional(unittest.TestCase):
+
+    def test_matches(self):
+        directive = IncludeOptional()
+        directive.add_line('IncludeOptional sites-enabled/*.conf')
+        self.assertEqual(directive.file_path, 'sites-enabled/*.conf')
+        self.assertTrue(directive.optional)
+
+    def test_does_not_match_include(self):
+        self.assertFalse(IncludeOptional.match('Include conf/extra.conf'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,10 @@
 #!/usr/bin/env python
 import unittest
 
+from apache_conf_parser import ApacheConfParser
 from apache_conf_parser.lists.node_list import NodeList
 from apache_conf_parser.directives.complex_directive import ComplexDirective
+from apache_conf_parser.directives.simple_directive import SimpleDirective
 
 
 class TestNodeList(unittest.TestCase):
@@ -38,6 +40,62 @@ class TestNodeList(unittest.TestCase):
             msg='NodeList containing unstable node(s) should be considered unstable. Instead node_list.stable returned True.',
         )
 
+    def test_stable_after_open_node_completes(self):
+        test_directive = ComplexDirective()
+        test_directive.add_line('<Immadirective>')
+        node_list = NodeList(test_directive)
+        self.assertIs(node_list.open_node, test_directive)
+        test_directive.add_line('</Immadirective>')
+        self.assertIsNone(node_list.open_node)
+        self.assertTrue(node_list.stable)
+
+    def test_stable_after_open_node_deleted(self):
+        test_directive = ComplexDirective()
+        test_directive.add_line('<Immadirective>')
+        simple_directive = SimpleDirective()
+        simple_directive.add_line('Immadirective')
+        node_list = NodeList(simple_directive, test_directive)
+        del node_list[-1]
+        self.assertTrue(node_list.stable)
+
+    def test_stable_after_open_node_replaced(self):
+        stable_directive = ComplexDirective()
+        stable_directive.add_line('<Immadirective>')
+        stable_directive.add_line('</Immadirective>')
+        open_directive = ComplexDirective()
+        open_directive.add_line('<Immadirective>')
+        node_list = NodeList(stable_directive)
+        node_list[0] = open_directive
+        self.assertFalse(node_list.stable)
+        node_list[0:1] = [stable_directive]
+        self.assertTrue(node_list.stable)
+
+    def test_open_node_is_the_last_node(self):
+        first_directive = ComplexDirective()
+        first_directive.add_line('<Immadirective>')
+        inserted_directive = ComplexDirective()
+        inserted_directive.add_line('<Immadirective>')
+        node_list = NodeList(first_directive)
+        node_list.insert(0, inserted_directive)
+        self.assertIs(node_list.open_node, first_directive)
+
+    def test_open_node_unstable_after_append(self):
+        body = ApacheConfParser('', infile=False)
+        node_list = NodeList(body)
+        self.assertTrue(node_list.stable)
+        open_directive = ComplexDirective()
+        open_directive.add_line('<Immadirective>')
+        body.nodes.append(open_directive)
+        self.assertIs(node_list.open_node, body)
+        self.assertFalse(node_list.stable)
+
+    def test_stable_after_pop(self):
+        test_directive = ComplexDirective()
+        test_directive.add_line('<Immadirective>')
+        node_list = NodeList(test_directive)
+        node_list.pop()
+        self.assertTrue(node_list.stable)
+
 
 if __name__ == '__main__':
     unittest.main()
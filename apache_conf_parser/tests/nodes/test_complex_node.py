@@ -118,6 +118,55 @@ class TestComplexNode(unittest.TestCase):
                     expected_err_msg, err),
             )
 
+    def test_add_nested_complex_directives(self):
+        node = ComplexNode(ComplexDirective.get_node_candidates())
+        test_lines = [
+            '<IfModule mod_rewrite.c>',
+            '<Directory /var/www>',
+            '<If "-f %{REQUEST_FILENAME}">',
+            'RewriteRule ^a$ b [L]',
+            '</If>',
+            'Options -Indexes',
+            '</Directory>',
+            '</IfModule>',
+        ]
+        for test_line in test_lines:
+            node.add_line(test_line)
+        node.complete = True
+        if_module = node.nodes[0]
+        directory = if_module.body.nodes[0]
+        self.assertEqual(
+            first=[n.name for n in directory.body.nodes],
+            second=['If', 'Options'],
+            msg='Expected nested directives to be added to the innermost open section',
+        )
+        self.assertEqual(str(node), "\n".join(test_lines))
+
+    def test_closing_tag_of_outer_section_while_inner_open(self):
+        node = ComplexNode(ComplexDirective.get_node_candidates())
+        node.add_line('<Outer>')
+        node.add_line('<Inner>')
+        with self.assertRaises(NodeMatchError):
+            node.add_line('</Outer>')
+
+    def test_add_line_past_nesting_limit_within_complex_directives(self):
+        node = ComplexNode(ComplexDirective.get_node_candidates())
+        levels = ComplexNode.NESTING_LIMIT // 2 + 1
+        for level in range(levels):
+            node.add_line('<Level%d>' % level)
+        with self.assertRaises(NestingLimitError):
+            node.add_line('Redirect here there')
+
+    def test_empty_complex_directive_at_nesting_limit(self):
+        node = ComplexNode(ComplexDirective.get_node_candidates())
+        levels = ComplexNode.NESTING_LIMIT // 2 + 1
+        for level in range(levels):
+            node.add_line('<Level%d>' % level)
+        for level in reversed(range(levels)):
+            node.add_line('</Level%d>' % level)
+        node.complete = True
+        self.assertTrue(node.complete)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+import unittest
+
+from apache_conf_parser.directives.complex_directive import ComplexDirective
+from apache_conf_parser.directives.redirect import Redirect
+from apache_conf_parser.directives.redirect_match import RedirectMatch
+from apache_conf_parser.directives.rewrite_rule import RewriteRule
+from apache_conf_parser.directives.simple_directive import SimpleDirective
+from apache_conf_parser.nodes.blank_node import BlankNode
+from apache_conf_parser.nodes.comment_node import CommentNode
+from apache_conf_parser.nodes.dispatcher import DISPATCHER_CACHE_SIZE, NodeDispatcher, get_dispatcher
+
+
+class TestNodeDispatcher(unittest.TestCase):
+    LINES = [
+        '',
+        '   ',
+        '\t',
+        '   \\',
+        '\\',
+        '#',
+        ' # a comment',
+        '# a comment\\',
+        'ServerName example.com',
+        '  servername example.com',
+        'Redirect /here /there',
+        'Redirect 301 /here /there',
+        'redirect /here /there',
+        'Redirect',
+        'Redirectfoo /here /there',
+        'RedirectMatch ^/a(.*)$ /b$1',
+        'RedirectMatch 301 ^/a(.*)$ /b$1',
+        'RedirectMatchfoo a b',
+        'RewriteRule ^index\\.php$ - [L]',
+        'REWRITERULE ^index\\.php$ - [L]',
+        'RewriteRule . /index.php [L,R=301]',
+        'RewriteCond %{REQUEST_FILENAME} !-f',
+        'LongDirective first \\',
+        '<VirtualHost *:80>',
+        '  <Directory /var/www>',
+        '<Directory \\',
+        '</VirtualHost>',
+        '<>',
+        '9Directive',
+        'é',
+    ]
+
+    @staticmethod
+    def linear_scan(candidates, line):
+        for node_cls in candidates:
+            if node_cls.match(line):
+                return node_cls
+        return None
+
+    def test_same_class_as_linear_scan(self):
+        candidates = ComplexDirective.get_node_candidates()
+        dispatcher = NodeDispatcher(candidates)
+        for line in self.LINES:
+            self.assertIs(
+                dispatcher.get_node_class(line),
+                self.linear_scan(candidates, line),
+                msg='Dispatcher disagrees with a linear scan of the candidates for line: %r' % line,
+            )
+
+    def test_same_class_as_linear_scan_any_candidate_order(self):
+        candidates = [SimpleDirective, CommentNode, ComplexDirective, Redirect, BlankNode, RedirectMatch, RewriteRule]
+        dispatcher = NodeDispatcher(candidates)
+        for line in self.LINES:
+            self.assertIs(dispatcher.get_node_class(line), self.linear_scan(candidates, line), msg=repr(line))
+
+    def test_keyword_is_case_insensitive(self):
+        self.assertEqual(NodeDispatcher.get_key('  rewriterule ^a$ b'), NodeDispatcher.get_key('RewriteRule ^a$ b'))
+
+    def test_route_keyword(self):
+        dispatcher = NodeDispatcher([CommentNode, BlankNode, RewriteRule, Redirect, SimpleDirective, ComplexDirective])
+        self.assertEqual(dispatcher.get_route(NodeDispatcher.get_key('RewriteRule a b')), (RewriteRule, SimpleDirective))
+
+    def test_route_first_chars(self):
+        dispatcher = NodeDispatcher([CommentNode, BlankNode, RewriteRule, Redirect, SimpleDirective, ComplexDirective])
+        self.assertEqual(dispatcher.get_route(NodeDispatcher.get_key(' # comment')), (CommentNode,))
+        self.assertEqual(dispatcher.get_route(NodeDispatcher.get_key('<Directory />')), (ComplexDirective,))
+        self.assertEqual(dispatcher.get_route(NodeDispatcher.get_key('  ')), (BlankNode,))
+
+    def test_match_None(self):
+        dispatcher = NodeDispatcher(ComplexDirective.get_node_candidates())
+        self.assertIsNone(dispatcher.get_node_class(None))
+
+    def test_shared_per_candidate_set(self):
+        candidates = ComplexDirective.get_node_candidates()
+        self.assertIs(NodeDispatcher.for_candidates(candidates), NodeDispatcher.for_candidates(list(candidates)))
+
+    def test_shared_dispatchers_are_bounded(self):
+        candidates = ComplexDirective.get_node_candidates()
+        for end in range(DISPATCHER_CACHE_SIZE * 2):
+            NodeDispatcher.for_candidates(tuple(candidates) + (SimpleDirective,) * end)
+        self.assertLessEqual(get_dispatcher.cache_info().currsize, DISPATCHER_CACHE_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,6 @@
 #!/usr/bin/env python
+import gc
+import pickle
 import unittest
 
 from apache_conf_parser.exceptions import NodeCompleteError
@@ -184,6 +186,67 @@ class TestNode(unittest.TestCase):
         node2.add_line('first')
         self.assertEqual(node1, node2)
 
+    def test_lazy_add_line_defers_matching(self):
+        node = self.CLASS()
+        node.lazy = True
+        node.add_line('first')
+        self.assertEqual(node._matches, None)
+        self.assertEqual(node.matches, {})
+        self.assertFalse(node.lazy)
+
+    def test_eq_lazy_and_eager(self):
+        node1 = self.CLASS()
+        node1.lazy = True
+        node1.add_line('first')
+        node2 = self.CLASS()
+        node2.add_line('first')
+        self.assertEqual(node1, node2)
+
+    def test_pickle(self):
+        node = self.CLASS()
+        node.add_line('first')
+        self.assertEqual(pickle.loads(pickle.dumps(node)), node)
+
+
+class TestNodeCandidates(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(self.forget_local_subclasses)
+
+    @staticmethod
+    def forget_local_subclasses():
+        # drop the classes defined by the tests from the candidates of later tests
+        Node.invalidate_candidates()
+        gc.collect()
+
+    def test_candidates_are_shared(self):
+        self.assertIs(Node.get_candidates(), Node.get_candidates())
+        self.assertEqual(Node.get_candidates(), tuple(Node.get_subclasses()))
+
+    def test_exclude(self):
+        candidates = Node.get_candidates()
+        excluded = candidates[0]
+        self.assertEqual(Node.get_candidates(exclude=excluded), candidates[1:])
+
+    def test_new_subclass_invalidates_candidates(self):
+        candidates = Node.get_candidates()
+
+        class RegisteredNode(Node):
+            is_node_candidate = True
+            keyword = 'RegisteredNodeTest'
+
+            def add_line(self, line):
+                super(RegisteredNode, self).add_line(line)
+
+        self.assertIsNot(Node.get_candidates(), candidates)
+        self.assertIn(RegisteredNode, Node.get_candidates())
+
+    def test_invalidate_candidates(self):
+        candidates = Node.get_candidates()
+        Node.invalidate_candidates()
+        self.assertIsNot(Node.get_candidates(), candidates)
+        self.assertEqual(Node.get_candidates(), candidates)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+import pickle
+import unittest
+from importlib.metadata import EntryPoint
+from unittest.mock import patch
+
+from apache_conf_parser.directives.redirect import Redirect
+from apache_conf_parser.directives.rewrite_cond import RewriteCond
+from apache_conf_parser.directives.simple_directive import SimpleDirective
+from apache_conf_parser.nodes.blank_node import BlankNode
+from apache_conf_parser.nodes.comment_node import CommentNode
+from apache_conf_parser.nodes.dispatcher import NodeDispatcher
+from apache_conf_parser.nodes.registry import BUILTIN_DIRECTIVES, DirectiveRegistry, registry
+
+
+class TestDirectiveRegistry(unittest.TestCase):
+
+    def test_builtin_directives(self):
+        self.assertEqual(sorted(registry), sorted(keyword.lower() for keyword in BUILTIN_DIRECTIVES))
+        self.assertIs(registry.get('RewriteCond'), RewriteCond)
+
+    def test_case_insensitive(self):
+        self.assertIn('rewritecond', registry)
+        self.assertIs(registry.get('REWRITECOND'), RewriteCond)
+
+    def test_unknown_keyword(self):
+        self.assertNotIn('ServerName', registry)
+        self.assertIsNone(registry.get('ServerName'))
+
+    def test_string_target_loaded_on_first_get(self):
+        directives = DirectiveRegistry({'Redirect': 'apache_conf_parser.directives.redirect:Redirect'})
+        self.assertEqual(directives._classes, {})
+        self.assertIs(directives.get('Redirect'), Redirect)
+        self.assertEqual(directives._classes, {'redirect': Redirect})
+
+    def test_register_replaces(self):
+        directives = DirectiveRegistry({'Redirect': Redirect})
+        version = directives.version
+        directives.get('Redirect')
+        directives.register('redirect', RewriteCond)
+        self.assertGreater(directives.version, version)
+        self.assertIs(directives.get('Redirect'), RewriteCond)
+
+    def test_get_prefixed(self):
+        directives = DirectiveRegistry(BUILTIN_DIRECTIVES)
+        self.assertEqual([c.__name__ for c in directives.get_prefixed('redirectmatch')], ['Redirect', 'RedirectMatch'])
+        self.assertEqual(directives.get_prefixed('servername'), [])
+
+    def test_load_entry_points_without_entry_points(self):
+        directives = DirectiveRegistry()
+        directives.load_entry_points(group='apache_conf_parser.tests.no_such_group')
+        self.assertEqual(len(directives), 0)
+
+    def test_load_entry_points_dict(self):
+        # the form returned by entry_points() before Python 3.10
+        entry_point = EntryPoint('Redirect', 'apache_conf_parser.directives.redirect:Redirect', 'other.group')
+        directives = DirectiveRegistry()
+        with patch('importlib.metadata.entry_points', return_value={'other.group': [entry_point]}):
+            directives.load_entry_points(group='other.group')
+            directives.load_entry_points(group='apache_conf_parser.tests.no_such_group')
+        self.assertIs(directives.get('Redirect'), Redirect)
+        self.assertEqual(len(directives), 1)
+
+    def test_pickle_default_registry(self):
+        self.assertIs(pickle.loads(pickle.dumps(registry)), registry)
+
+    def test_pickle_registry(self):
+        directives = pickle.loads(pickle.dumps(DirectiveRegistry({'Redirect': Redirect})))
+        self.assertIs(directives.get('Redirect'), Redirect)
+
+
+class TestDispatcherRegistry(unittest.TestCase):
+    CANDIDATES = [CommentNode, BlankNode, SimpleDirective]
+
+    def test_registered_class_routed_before_base(self):
+        dispatcher = NodeDispatcher(self.CANDIDATES, DirectiveRegistry({'RewriteCond': RewriteCond}))
+        self.assertIs(dispatcher.get_node_class('RewriteCond %{HTTPS} off'), RewriteCond)
+        self.assertIs(dispatcher.get_node_class('ServerName example.com'), SimpleDirective)
+
+    def test_without_registry(self):
+        dispatcher = NodeDispatcher(self.CANDIDATES)
+        self.assertIs(dispatcher.get_node_class('RewriteCond %{HTTPS} off'), SimpleDirective)
+
+    def test_routes_follow_registration(self):
+        directives = DirectiveRegistry()
+        dispatcher = NodeDispatcher(self.CANDIDATES, directives)
+        self.assertIs(dispatcher.get_node_class('RewriteCond %{HTTPS} off'), SimpleDirective)
+        directives.register('RewriteCond', RewriteCond)
+        self.assertIs(dispatcher.get_node_class('RewriteCond %{HTTPS} off'), RewriteCond)
+
+
+if __name__ == '__main__':
+    unittest.main()
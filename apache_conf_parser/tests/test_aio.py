@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.aio import aiter_parse, aparse, aparse_many
+from apache_conf_parser.exceptions import NodeCompleteError, ParserError
+
+
+class TestAsyncParse(unittest.IsolatedAsyncioTestCase):
+    TEST_LINES = [
+        '# a comment',
+        'Redirect 301 /here /there',
+        '<VirtualHost *:80>',
+        '    ServerName example.com',
+        '    RewriteRule ^a$ /b [L]',
+        '</VirtualHost>',
+        '',
+        'Listen 80',
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = self.write('site.conf', self.TEST_LINES)
+
+    def write(self, name, lines, newline="\n"):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', newline='') as conf:
+            conf.write(newline.join(lines) + newline)
+        return path
+
+    async def test_aparse(self):
+        tree = await aparse(self.path)
+        self.assertEqual(tree, ApacheConfParser(self.path))
+
+    async def test_aparse_lazy(self):
+        tree = await aparse(self.path, lazy=True)
+        self.assertTrue(tree.nodes[1].lazy)
+        self.assertEqual(tree, ApacheConfParser(self.path, lazy=True))
+
+    async def test_aparse_process_executor(self):
+        with ProcessPoolExecutor(1) as executor:
+            tree = await aparse(self.path, executor=executor)
+        self.assertEqual(tree, ApacheConfParser(self.path))
+
+    async def test_aparse_errors(self):
+        with self.assertRaises(FileNotFoundError):
+            await aparse(os.path.join(self.directory, 'missing.conf'))
+        with self.assertRaises(ParserError):
+            await aparse(self.write('broken.conf', ['<VirtualHost *:80>']))
+
+    async def test_aparse_many(self):
+        paths = [self.write('site%d.conf' % i, ['Listen %d' % i]) for i in range(10)]
+        paths.insert(3, os.path.join(self.directory, 'missing.conf'))
+        results = [result async for result in aparse_many(iter(paths), limit=3)]
+        self.assertEqual([result.path for result in results], paths)
+        self.assertIsInstance(results[3].error, FileNotFoundError)
+        self.assertEqual([str(result.tree) for result in results if result.ok], ['Listen %d' % i for i in range(10)])
+
+    async def test_aparse_many_unordered(self):
+        paths = [self.write('site%d.conf' % i, ['Listen %d' % i]) for i in range(10)]
+        results = [result async for result in aparse_many(paths, limit=4, ordered=False)]
+        self.assertEqual(sorted(result.path for result in results), sorted(paths))
+        self.assertTrue(all(result.ok for result in results))
+
+    async def test_aparse_many_limit(self):
+        running = []
+
+        def paths():
+            for i in range(20):
+                yield self.write('site%d.conf' % i, ['Listen %d' % i])
+
+        async def count_running():
+            while True:
+                running.append(len([task for task in asyncio.all_tasks() if task.get_coro().__name__ == 'aparse_result']))
+                await asyncio.sleep(0)
+
+        counter = asyncio.ensure_future(count_running())
+        try:
+            results = [result async for result in aparse_many(paths(), limit=5)]
+        finally:
+            counter.cancel()
+        peak = max(running)
+        self.assertEqual(len(results), 20)
+        self.assertLessEqual(peak, 5)
+        with self.assertRaises(ValueError):
+            [result async for result in aparse_many(paths(), limit=0)]
+
+    async def test_aiter_parse_path(self):
+        nodes = [node async for node in aiter_parse(self.path)]
+        self.assertEqual([node.dumps() for node in nodes], [node.dumps() for node in ApacheConfParser(self.path).nodes])
+
+    async def test_aiter_parse_path_line_endings(self):
+        path = self.write('windows.conf', self.TEST_LINES, newline="\r\n")
+        nodes = [node async for node in aiter_parse(path, batch=2)]
+        self.assertEqual([str(node) for node in nodes], [str(node) for node in ApacheConfParser(path).nodes])
+
+    async def test_aiter_parse_stream(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(("\n".join(self.TEST_LINES) + "\n").encode('utf-8'))
+        reader.feed_eof()
+        nodes = [node async for node in aiter_parse(reader, lazy=True)]
+        expected = ApacheConfParser("\n".join(self.TEST_LINES), infile=False).nodes
+        self.assertTrue(nodes[1].lazy)
+        self.assertEqual(nodes, list(expected))
+
+    async def test_aiter_parse_stream_line_endings(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'<VirtualHost *:80>\r\nServerName a\r\n</VirtualHost>\r\n')
+        reader.feed_eof()
+        node, = [node async for node in aiter_parse(reader)]
+        self.assertEqual(str(node), '<VirtualHost *:80>\nServerName a\n</VirtualHost>')
+
+    async def test_aiter_parse_yields_complete_nodes(self):
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'<Directory /var/www>\n    Options -Indexes\n</Directory>\n')
+        node = await aiter_parse(reader).__anext__()
+        self.assertEqual(node.name, 'Directory')
+        self.assertTrue(node.complete)
+
+    async def test_aiter_parse_unclosed_section(self):
+        with self.assertRaises(NodeCompleteError):
+            [node async for node in aiter_parse(['<Directory /var/www>', '    Options -Indexes'])]
@@ -1,9 +1,19 @@
 #!/usr/bin/env python
+import io
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
 from unittest.mock import patch, mock_open
 
-from apache_conf_parser import ApacheConfParser
-from apache_conf_parser.exceptions import NodeCompleteError
+from apache_conf_parser import ApacheConfParser, iter_parse
+from apache_conf_parser.directives.complex_directive import ComplexDirective
+from apache_conf_parser.directives.rewrite_rule import RewriteRule
+from apache_conf_parser.directives.simple_directive import SimpleDirective
+from apache_conf_parser.exceptions import InvalidLineError, NodeCompleteError, ParserError
+from apache_conf_parser.nodes.blank_node import BlankNode
+from apache_conf_parser.nodes.comment_node import CommentNode
 
 
 class TestApacheConfParser(unittest.TestCase):
@@ -57,6 +67,278 @@ class TestApacheConfParser(unittest.TestCase):
                 msg='Expected "{}" in the raised NodeCompleteError exception message, received: {}'.format(expected_err_msg, err),
             )
 
+    def test_read_conf_from_mapped_file(self):
+        test_content = "\n".join([
+            'RewriteEngine On',
+            '<Directory /var/www>',
+            '    Options -Indexes \\',
+            '        +FollowSymLinks',
+            '</Directory>',
+        ])
+        with tempfile.NamedTemporaryFile('w', suffix='.conf', delete=False) as conf_file:
+            conf_file.write(test_content + "\n")
+        try:
+            apache_conf_parser = ApacheConfParser(conf_file.name, mapped=True)
+            expected = str(ApacheConfParser(conf_file.name))
+        finally:
+            os.unlink(conf_file.name)
+        actual = str(apache_conf_parser)
+        self.assertEqual(
+            first=expected,
+            second=actual,
+            msg='Expected str(apache_conf_parser) to return %s, received: %s' % (expected, actual)
+        )
+
+    def test_mapped_file_released(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.conf', delete=False) as conf_file:
+            conf_file.write('<Directory /var/www>\n')
+        self.addCleanup(os.unlink, conf_file.name)
+        delayed = ApacheConfParser(conf_file.name, mapped=True, delay=True)
+        self.assertIsNone(delayed.source._buffer)
+        with self.assertRaises(NodeCompleteError):
+            delayed.parse()
+        self.assertTrue(delayed.source.closed)
+        self.assertIsNone(delayed.source._buffer)
+
+    def test_lazy_parse(self):
+        test_content = "\n".join([
+            '# a comment',
+            'Redirect 301 /here /there',
+            '<VirtualHost *:80>',
+            '    RewriteRule ^a$ /b [L]',
+            '    Options -Indexes \\',
+            '        +FollowSymLinks',
+            '</VirtualHost>',
+        ])
+        eager = ApacheConfParser(test_content, infile=False)
+        lazy = ApacheConfParser(test_content, infile=False, lazy=True)
+        redirect = lazy.nodes[1]
+        self.assertTrue(
+            expr=redirect.lazy,
+            msg='Expected nodes to stay lazy until one of their parsed attributes is accessed',
+        )
+        self.assertEqual(redirect.status, '301')
+        self.assertFalse(redirect.lazy)
+        self.assertEqual(lazy.nodes, eager.nodes)
+        self.assertEqual(lazy.dumps(), eager.dumps())
+
+    def test_lazy_parse_invalid_arguments(self):
+        apache_conf_parser = ApacheConfParser('Options a<b', infile=False, lazy=True)
+        with self.assertRaises(InvalidLineError):
+            apache_conf_parser.nodes[0].arguments
+
+    def test_deprecated_nodes(self):
+        with self.assertWarns(DeprecationWarning):
+            nodes = ApacheConfParser.NODES
+        self.assertEqual(nodes[:2], [CommentNode, BlankNode])
+        self.assertEqual(nodes[-2:], [SimpleDirective, ComplexDirective])
+        self.assertIn(RewriteRule, nodes)
+
+    def test_lazy_parse_failure_is_repeated(self):
+        apache_conf_parser = ApacheConfParser('Options ok a<b c\n', infile=False, lazy=True)
+        directive = apache_conf_parser.nodes[0]
+        for _ in range(2):
+            with self.assertRaises(InvalidLineError):
+                directive.arguments
+            with self.assertRaises(InvalidLineError):
+                directive.name
+        self.assertTrue(directive.lazy)
+        self.assertEqual(str(apache_conf_parser), 'Options ok a<b c')
+
+    def test_iter_parse_yields_top_level_nodes(self):
+        test_content = "\n".join([
+            '# a comment',
+            'Redirect here there',
+            '<VirtualHost *:80>',
+            '    ServerName example.com',
+            '</VirtualHost>',
+        ])
+        nodes = list(iter_parse(io.StringIO(test_content)))
+        expected = [node.dumps() for node in ApacheConfParser(test_content, infile=False).nodes]
+        actual = [node.dumps() for node in nodes]
+        self.assertEqual(
+            first=expected,
+            second=actual,
+            msg='Expected iter_parse to yield the top-level nodes %s, received: %s' % (expected, actual)
+        )
+
+    def test_iter_parse_from_path(self):
+        test_content = 'Redirect here there\nRewriteEngine On\n'
+        with tempfile.NamedTemporaryFile('w', suffix='.conf', delete=False) as conf_file:
+            conf_file.write(test_content)
+        try:
+            actual = [str(node) for node in iter_parse(conf_file.name)]
+        finally:
+            os.unlink(conf_file.name)
+        self.assertEqual(actual, ['Redirect here there', 'RewriteEngine On'])
+
+    def test_iter_parse_is_lazy(self):
+        def lines():
+            yield '<Directory /var/www>'
+            yield '    Options -Indexes'
+            yield '</Directory>'
+            raise AssertionError('Read past the first complete top-level node.')
+
+        node = next(iter_parse(lines()))
+        self.assertEqual(node.name, 'Directory')
+        self.assertTrue(node.complete)
+
+    def test_iter_parse_line_endings(self):
+        nodes = list(iter_parse(['<VirtualHost *:80>\r\n', 'ServerName a\r\n', '</VirtualHost>\r\n']))
+        self.assertEqual([str(node) for node in nodes], ['<VirtualHost *:80>\nServerName a\n</VirtualHost>'])
+
+    def test_iter_parse_unclosed_section(self):
+        with self.assertRaises(NodeCompleteError):
+            list(iter_parse(['<Directory /var/www>', '    Options -Indexes']))
+
+
+class TestApplyEdit(unittest.TestCase):
+
+    TEST_LINES = [
+        '# a comment',
+        'Listen 80',
+        '<VirtualHost *:80>',
+        '    ServerName example.com',
+        '    <Directory /var/www>',
+        '        Options -Indexes \\',
+        '            +FollowSymLinks',
+        '        RewriteRule ^a$ /b [L]',
+        '    </Directory>',
+        '    Redirect 301 /here /there',
+        '</VirtualHost>',
+        'LogLevel warn',
+    ]
+
+    def parse(self, lines, lazy=False):
+        apache_conf_parser = ApacheConfParser("", infile=False, delay=True, lazy=lazy)
+        apache_conf_parser.source = list(lines)
+        apache_conf_parser.parse()
+        return apache_conf_parser
+
+    def assert_edit(self, start_line, end_line, new_lines, lazy=False):
+        apache_conf_parser = self.parse(self.TEST_LINES, lazy)
+        apache_conf_parser.apply_edit(start_line, end_line, new_lines)
+        expected_lines = self.TEST_LINES[:start_line] + new_lines + self.TEST_LINES[end_line:]
+        expected = self.parse(expected_lines, lazy)
+        self.assertEqual(
+            first=expected.dumps(),
+            second=apache_conf_parser.dumps(),
+            msg='Expected the edited tree to match a fresh parse of the edited lines',
+        )
+        self.assertEqual(expected, apache_conf_parser)
+        self.assertEqual(str(apache_conf_parser), "\n".join(expected_lines))
+        self.assertEqual(apache_conf_parser.source, expected_lines)
+        return apache_conf_parser
+
+    def test_edit_in_nested_section_keeps_other_nodes(self):
+        apache_conf_parser = self.parse(self.TEST_LINES)
+        virtual_host = apache_conf_parser.nodes[2]
+        directory = virtual_host.body.nodes[1]
+        rewrite_rule = directory.body.nodes[1]
+        redirect = virtual_host.body.nodes[2]
+        edited = apache_conf_parser.apply_edit(5, 7, ['        Options +Indexes'])
+        self.assertEqual([str(node) for node in edited], ['        Options +Indexes'])
+        self.assertIs(apache_conf_parser.nodes[2], virtual_host)
+        self.assertIs(virtual_host.body.nodes[1], directory)
+        self.assertIs(directory.body.nodes[0], edited[0])
+        self.assertIs(directory.body.nodes[1], rewrite_rule)
+        self.assertIs(virtual_host.body.nodes[2], redirect)
+
+    def test_replace_line(self):
+        self.assert_edit(3, 4, ['    ServerName example.org'])
+
+    def test_insert_lines(self):
+        apache_conf_parser = self.assert_edit(8, 8, ['        Require all granted', ''])
+        self.assertEqual(apache_conf_parser.nodes[2].body.nodes[1].body.nodes[2].name, 'Require')
+
+    def test_insert_inside_continued_directive(self):
+        self.assert_edit(6, 6, ['            +MultiViews \\'])
+
+    def test_delete_lines(self):
+        apache_conf_parser = self.assert_edit(4, 9, [])
+        self.assertEqual(len(apache_conf_parser.nodes[2].body.nodes), 2)
+
+    def test_edit_from_string(self):
+        apache_conf_parser = self.parse(self.TEST_LINES)
+        apache_conf_parser.apply_edit(11, 12, 'LogLevel debug\nErrorLog logs/error_log')
+        self.assertEqual(
+            first=[str(node) for node in apache_conf_parser.nodes[3:]],
+            second=['LogLevel debug', 'ErrorLog logs/error_log'],
+        )
+
+    def test_continuation_takes_in_next_node(self):
+        apache_conf_parser = self.assert_edit(0, 1, ['Listen 8080 \\'])
+        self.assertEqual(apache_conf_parser.nodes[0].arguments, ['8080', 'Listen', '80'])
+
+    def test_close_enclosing_section(self):
+        apache_conf_parser = self.assert_edit(8, 11, ['    </Directory>', '</VirtualHost>', 'Redirect 301 /here /there'])
+        self.assertEqual(apache_conf_parser.nodes[3].name, 'Redirect')
+
+    def test_lazy_edit(self):
+        apache_conf_parser = self.parse(self.TEST_LINES, lazy=True)
+        edited = apache_conf_parser.apply_edit(3, 4, ['    ServerName example.org'])
+        self.assertTrue(
+            expr=edited[0].lazy,
+            msg='Expected the nodes re-parsed by an edit of a lazy tree to be lazy',
+        )
+        self.assertEqual(edited[0].arguments, ['example.org'])
+
+    def test_invalid_edit_leaves_tree_unchanged(self):
+        apache_conf_parser = self.parse(self.TEST_LINES)
+        expected = apache_conf_parser.dumps()
+        for start_line, end_line, new_lines in [(4, 5, []), (9, 9, ['</Directory>']), (1, 1, ['<Directory /x>'])]:
+            with self.assertRaises(ParserError):
+                apache_conf_parser.apply_edit(start_line, end_line, new_lines)
+            self.assertEqual(apache_conf_parser.dumps(), expected)
+            self.assertEqual(apache_conf_parser.source, self.TEST_LINES)
+
+    def test_edit_out_of_range(self):
+        apache_conf_parser = self.parse(self.TEST_LINES)
+        for start_line, end_line in [(-1, 0), (3, 2), (0, 13)]:
+            with self.assertRaises(IndexError):
+                apache_conf_parser.apply_edit(start_line, end_line, [])
+
+    def test_edit_incomplete_node(self):
+        apache_conf_parser = ApacheConfParser("", infile=False, delay=True)
+        with self.assertRaises(NodeCompleteError):
+            apache_conf_parser.apply_edit(0, 0, ['Listen 80'])
+
+
+class TestLazyImports(unittest.TestCase):
+
+    @staticmethod
+    def run_fresh(code):
+        """Run code in a new interpreter and return the package modules it imported."""
+        code += "\nimport sys\nprint(' '.join(sorted(m for m in sys.modules if m.startswith('apache_conf_parser'))))"
+        output = subprocess.check_output([sys.executable, '-c', code], universal_newlines=True)
+        return output.split()
+
+    def test_import_loads_no_keyword_directives(self):
+        modules = self.run_fresh('import apache_conf_parser')
+        self.assertNotIn('apache_conf_parser.mapped_file', modules)
+        self.assertNotIn('apache_conf_parser.directives.redirect', modules)
+        self.assertNotIn('apache_conf_parser.directives.rewrite_rule', modules)
+
+    def test_parse_loads_used_directives(self):
+        modules = self.run_fresh(
+            'from apache_conf_parser import ApacheConfParser\n'
+            'node = ApacheConfParser("RewriteCond %{HTTPS} off", infile=False).nodes[0]\n'
+            'assert type(node).__name__ == "RewriteCond", node'
+        )
+        self.assertIn('apache_conf_parser.directives.rewrite_cond', modules)
+        self.assertNotIn('apache_conf_parser.directives.rewrite_rule', modules)
+
+    def test_lazy_attributes(self):
+        import apache_conf_parser
+        from apache_conf_parser.directives.rewrite_cond import RewriteCond
+        from apache_conf_parser.mapped_file import MappedFile
+
+        self.assertIs(apache_conf_parser.RewriteCond, RewriteCond)
+        self.assertIs(apache_conf_parser.MappedFile, MappedFile)
+        self.assertIn('RewriteCond', dir(apache_conf_parser))
+        with self.assertRaises(AttributeError):
+            apache_conf_parser.NoSuchDirective
+
 
 if __name__ == '__main__':
     unittest.main()
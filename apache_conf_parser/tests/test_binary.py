@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import unittest
+from array import array
+from unittest.mock import patch
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.binary import HEADER, INT32, MAGIC, dump_binary, load_binary
+from apache_conf_parser.directives.include import Include
+from apache_conf_parser.directives.simple_directive import SimpleDirective
+from apache_conf_parser.nodes import Node
+from apache_conf_parser.nodes.complex_node import ComplexNode
+
+
+class TestBinary(unittest.TestCase):
+    TEST_LINES = [
+        '# main site',
+        '',
+        '<VirtualHost *:80>',
+        '    ServerName example.com',
+        '    RewriteRule ^old/(.*)$ /new/$1 [L,R=301]',
+        '    Include conf/extra.conf',
+        '    <Directory \\',
+        '        /var/www>',
+        '        Options -Indexes \\',
+        '            +FollowSymLinks',
+        '    </Directory>',
+        '</VirtualHost>',
+        'Redirect 301 /a /b',
+    ]
+
+    def setUp(self):
+        self.tree = ApacheConfParser("\n".join(self.TEST_LINES), infile=False)
+
+    def test_round_trip(self):
+        loaded = load_binary(dump_binary(self.tree))
+        self.assertIsInstance(loaded, ApacheConfParser)
+        self.assertEqual(loaded, self.tree)
+        self.assertEqual(str(loaded), str(self.tree))
+        self.assertEqual(loaded.dumps(), self.tree.dumps())
+        self.assertEqual(loaded.source, self.tree.source)
+
+    def test_loaded_tree_keeps_parsed_attributes(self):
+        loaded = load_binary(dump_binary(self.tree))
+        virtual_host = loaded.nodes[2]
+        self.assertEqual(virtual_host.name, 'VirtualHost')
+        self.assertEqual(list(virtual_host.arguments), ['*:80'])
+        self.assertEqual(virtual_host.body.nodes[1].flags, ['L', 'R=301'])
+        self.assertIsInstance(virtual_host.body.nodes[2], Include)
+        self.assertIsNone(virtual_host.body.nodes[2].included)
+        self.assertEqual(virtual_host.body.nodes[3].lines, ['    <Directory \\', '        /var/www>'])
+        self.assertEqual(loaded.nodes[0].comment, ' main site')
+
+    def test_load_skips_matching(self):
+        data = dump_binary(self.tree)
+        with patch.object(Node, 'match_line', side_effect=AssertionError('matched a line')):
+            load_binary(data)
+
+    def test_loaded_tree_accepts_more_lines(self):
+        loaded = load_binary(dump_binary(self.tree))
+        loaded.complete = False
+        loaded.add_line('KeepAlive On')
+        self.assertEqual(loaded.nodes[-1].name, 'KeepAlive')
+
+    def test_lazy_tree(self):
+        lazy_tree = ApacheConfParser("\n".join(self.TEST_LINES), infile=False, lazy=True)
+        loaded = load_binary(dump_binary(lazy_tree))
+        self.assertEqual(loaded, lazy_tree)
+        self.assertEqual(loaded.nodes, self.tree.nodes)
+
+    def test_single_node(self):
+        directive = SimpleDirective()
+        directive.add_line('ServerName example.com')
+        self.assertEqual(load_binary(dump_binary(directive)), directive)
+
+    def test_empty_tree(self):
+        tree = ApacheConfParser("", infile=False)
+        self.assertEqual(load_binary(dump_binary(tree)), tree)
+
+    def test_changed_node(self):
+        self.tree.nodes[-1].changed = True
+        loaded = load_binary(dump_binary(self.tree))
+        self.assertTrue(loaded.nodes[-1].changed)
+        self.assertEqual(loaded, self.tree)
+
+    def test_incomplete_tree(self):
+        node = ComplexNode(ApacheConfParser.get_node_candidates())
+        node.add_line('<VirtualHost *:80>')
+        with self.assertRaises(ValueError):
+            dump_binary(node)
+
+    def test_bad_magic(self):
+        with self.assertRaises(ValueError):
+            load_binary(b'not a binary tree at all')
+
+    def test_unsupported_version(self):
+        data = bytearray(dump_binary(self.tree))
+        struct.pack_into('<H', data, len(MAGIC), 99)
+        with self.assertRaises(ValueError):
+            load_binary(bytes(data))
+
+    def test_included_trees(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        for name, content in [('main.conf', 'Include common.conf\nInclude common.conf\n'),
+                              ('common.conf', 'ServerName example.com\n')]:
+            with open(os.path.join(directory, name), 'w') as conf:
+                conf.write(content)
+        tree = ApacheConfParser(os.path.join(directory, 'main.conf'), includes=True)
+        loaded = load_binary(dump_binary(tree))
+        self.assertEqual(loaded.nodes, tree.nodes)
+        first, second = loaded.nodes[0].included[0], loaded.nodes[1].included[0]
+        self.assertIs(first, second)
+        self.assertEqual(first, tree.nodes[0].included[0])
+        self.assertEqual(sorted(loaded.resolver.trees), sorted(tree.resolver.trees))
+        self.assertIs(loaded.resolver.trees[os.path.join(directory, 'main.conf')], loaded)
+        self.assertEqual(loaded.resolver._expansions, tree.resolver._expansions)
+
+    def test_extra_attributes(self):
+        node = self.tree.nodes[-1]
+        node.extra = {'count': 3, 'names': ('a', None), 'flags': [True, False]}
+        self.assertEqual(load_binary(dump_binary(self.tree)).nodes[-1].extra, node.extra)
+        node.extra = object()
+        with self.assertRaises(ValueError):
+            dump_binary(self.tree)
+
+    def test_unknown_class(self):
+        data = dump_binary(self.tree)
+        name = b'apache_conf_parser.directives.redirect:Redirect'
+        self.assertIn(name, data)
+        # a class table entry naming anything but a node class is rejected before importing its module
+        forged = data.replace(name, b'subprocess:Popen' + b'.' * (len(name) - len(b'subprocess:Popen')))
+        with patch('apache_conf_parser.binary.load_target', side_effect=AssertionError('imported')):
+            with self.assertRaises(ValueError):
+                load_binary(forged)
+
+    def test_too_short(self):
+        with self.assertRaises(ValueError):
+            load_binary(dump_binary(self.tree)[:HEADER.size - 1])
+
+    def test_records_are_little_endian_32_bit(self):
+        data = dump_binary(self.tree)
+        _, _, strings_size, records_size, _ = HEADER.unpack_from(data)
+        self.assertEqual(array(INT32).itemsize, 4)
+        offset = HEADER.size + strings_size
+        records = array(INT32, data[offset:offset + records_size])
+        if sys.byteorder != 'little':
+            records.byteswap()
+        self.assertEqual(list(records), list(struct.unpack_from('<%di' % (records_size // 4), data, offset)))
+
+    def test_truncated(self):
+        data = dump_binary(self.tree)
+        for size in [len(data) - 1, len(data) - 4]:
+            with self.assertRaises(ValueError):
+                load_binary(data[:size])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.cache import ParseCache, parse_cached
+from apache_conf_parser.nodes import Node
+
+
+class TestParseCache(unittest.TestCase):
+    TEST_LINES = [
+        '<VirtualHost *:80>',
+        '    ServerName example.com',
+        '    RewriteRule ^old/(.*)$ /new/$1 [L,R=301]',
+        '</VirtualHost>',
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.cache = ParseCache(os.path.join(self.directory, 'cache'))
+        self.path = self.write('site.conf', self.TEST_LINES)
+
+    def write(self, name, lines):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as conf:
+            conf.write("\n".join(lines) + "\n")
+        return path
+
+    def test_miss_then_hit(self):
+        first = self.cache.parse(self.path)
+        self.assertEqual(first, ApacheConfParser(self.path))
+        second = self.cache.parse(self.path)
+        self.assertEqual(second, first)
+        self.assertIsNot(second, first)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_hit_skips_matching(self):
+        self.cache.parse(self.path)
+        with patch.object(Node, 'match_line', side_effect=AssertionError('matched a line')):
+            tree = self.cache.parse(self.path)
+        self.assertEqual(str(tree), "\n".join(self.TEST_LINES))
+
+    def test_changed_file(self):
+        self.cache.parse(self.path)
+        self.write('site.conf', self.TEST_LINES + ['# changed'])
+        tree = self.cache.parse(self.path)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertEqual(len(tree.nodes), 2)
+
+    def test_same_size_and_mtime_different_content(self):
+        self.cache.parse(self.path)
+        stat = os.stat(self.path)
+        self.write('site.conf', [line.replace('example.com', 'example.org') for line in self.TEST_LINES])
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        tree = self.cache.parse(self.path)
+        self.assertEqual(self.cache.misses, 2)
+        self.assertIn('example.org', str(tree))
+
+    def test_corrupt_entry_is_a_miss(self):
+        self.cache.parse(self.path)
+        with open(self.cache.get_entry_path(self.path), 'wb') as entry:
+            entry.write(b'not a pickle')
+        self.assertEqual(self.cache.parse(self.path), ApacheConfParser(self.path))
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_other_format_is_a_miss(self):
+        self.cache.parse(self.path)
+        with patch('apache_conf_parser.cache.FORMAT', 0):
+            self.cache.parse(self.path)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+        self.cache.parse(self.path)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 3))
+
+    def test_lru_eviction(self):
+        paths = [self.write('site%d.conf' % i, self.TEST_LINES + ['# %d' % i]) for i in range(3)]
+        self.cache.parse(paths[0])
+        entry_size = os.path.getsize(self.cache.get_entry_path(paths[0]))
+        self.cache.max_size = entry_size * 2 + 100
+        self.cache.parse(paths[1])
+        os.utime(self.cache.get_entry_path(paths[0]), ns=(0, 0))
+        os.utime(self.cache.get_entry_path(paths[1]), ns=(1, 1))
+        self.cache.parse(paths[0])  # a hit refreshes paths[0]
+        self.cache.parse(paths[2])
+        self.assertTrue(os.path.exists(self.cache.get_entry_path(paths[0])))
+        self.assertFalse(os.path.exists(self.cache.get_entry_path(paths[1])))
+        self.assertTrue(os.path.exists(self.cache.get_entry_path(paths[2])))
+
+    def test_no_temporary_files_left(self):
+        self.cache.parse(self.path)
+        self.assertEqual(os.listdir(self.cache.directory), [os.path.basename(self.cache.get_entry_path(self.path))])
+
+    def test_clear(self):
+        self.cache.parse(self.path)
+        self.cache.clear()
+        self.assertEqual(os.listdir(self.cache.directory), [])
+
+    def test_parse_cached(self):
+        self.assertEqual(parse_cached(self.path, self.cache), ApacheConfParser(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
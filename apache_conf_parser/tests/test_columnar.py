@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+import unittest
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.columnar import BLANK, COMMENT, DIRECTIVE, SECTION, ColumnarTree, parse_columnar
+from apache_conf_parser.directives.redirect import Redirect
+
+
+class TestColumnarTree(unittest.TestCase):
+    TEST_LINES = [
+        '# main site',
+        '',
+        '<VirtualHost *:80>',
+        '    ServerName example.com',
+        '    Redirect 301 /old /new',
+        '    <Directory \\',
+        '        /var/www>',
+        '        Options -Indexes \\',
+        '            +FollowSymLinks',
+        '        servername other.example.com',
+        '    </Directory>',
+        '    <Location />',
+        '    </Location>',
+        '</VirtualHost>',
+    ]
+
+    def setUp(self):
+        self.tree = ApacheConfParser("\n".join(self.TEST_LINES), infile=False)
+        self.columnar = ColumnarTree.from_tree(self.tree)
+
+    def test_arrays(self):
+        self.assertEqual(list(self.columnar.kinds), [
+            COMMENT, BLANK, SECTION, DIRECTIVE, DIRECTIVE, SECTION, DIRECTIVE, DIRECTIVE, SECTION])
+        self.assertEqual(list(self.columnar.parents), [-1, -1, -1, 2, 2, 2, 5, 5, 2])
+        self.assertEqual(list(self.columnar.first_children), [-1, -1, 3, -1, -1, 6, -1, -1, -1])
+        self.assertEqual(list(self.columnar.last_children), [-1, -1, 8, -1, -1, 7, -1, -1, -1])
+        self.assertEqual(list(self.columnar.subtree_ends), [1, 2, 9, 4, 5, 8, 7, 8, 9])
+        self.assertEqual(list(self.columnar.line_starts), [0, 1, 2, 3, 4, 5, 7, 9, 11])
+        self.assertEqual(list(self.columnar.line_ends), [1, 2, 14, 4, 5, 11, 9, 10, 13])
+
+    def test_view_api(self):
+        virtual_host = self.columnar.nodes[2]
+        self.assertEqual(virtual_host.name, 'VirtualHost')
+        self.assertEqual(virtual_host.arguments, ('*:80',))
+        self.assertEqual([node.name for node in virtual_host.nodes], ['ServerName', 'Redirect', 'Directory', 'Location'])
+        directory = virtual_host.nodes[2]
+        self.assertEqual(directory.lines, ['    <Directory \\', '        /var/www>'])
+        self.assertEqual(directory.tail, '    </Directory>')
+        self.assertEqual(directory.parent, virtual_host)
+        self.assertEqual(directory.nodes[0].arguments, ('-Indexes', '+FollowSymLinks'))
+        redirect = virtual_host.nodes[1]
+        self.assertIs(redirect.node_class, Redirect)
+        self.assertEqual(redirect.status, '301')
+
+    def test_section_api(self):
+        def walk(nodes, walked):
+            for node in nodes:
+                walked.append((node.name, tuple(getattr(node, 'arguments', ())), node.complete, node.stable))
+                if hasattr(node, 'body'):
+                    walked.append((node.header.name, tuple(node.header.arguments), node.body.complete))
+                    walk(node.body.nodes, walked)
+            return walked
+
+        self.assertEqual(walk(self.columnar.nodes, []), walk(self.tree.nodes, []))
+        section, regular = self.columnar[2], self.tree.nodes[2]
+        self.assertEqual(str(section.body), str(regular.body))
+        self.assertEqual(section.body.dumps(1), regular.body.dumps(1))
+        self.assertEqual(section.header.dumps(), regular.header.dumps())
+        self.assertEqual(str(self.columnar[8].body), '')
+        with self.assertRaises(AttributeError):
+            self.columnar[3].body
+
+    def test_str_and_dumps(self):
+        for node, columnar_node in zip(self.tree.nodes, self.columnar.nodes):
+            self.assertEqual(str(columnar_node), str(node))
+            self.assertEqual(columnar_node.dumps(), node.dumps())
+
+    def test_find(self):
+        actual = [node.arguments for node in self.columnar.find('ServerName')]
+        expected = [('example.com',), ('other.example.com',)]
+        self.assertEqual(
+            first=expected,
+            second=actual,
+            msg='Expected find to return nodes with arguments {}, received: {}'.format(expected, actual),
+        )
+        self.assertEqual(len(self.columnar.find('directory', kind=SECTION)), 1)
+        self.assertEqual(self.columnar.find('Missing'), [])
+
+    def test_to_tree(self):
+        parser = self.columnar.to_tree()
+        self.assertEqual(parser.nodes, self.tree.nodes)
+        self.assertEqual(str(parser), str(self.tree))
+
+    def test_to_node(self):
+        self.assertEqual(self.columnar.nodes[2].nodes[2].to_node(), self.tree.nodes[2].body.nodes[2])
+
+    def test_parse_columnar(self):
+        columnar = parse_columnar(self.TEST_LINES)
+        self.assertEqual(columnar.text, self.columnar.text)
+        self.assertEqual(list(columnar.name_ids), list(self.columnar.name_ids))
+
+    def test_empty(self):
+        columnar = parse_columnar([])
+        self.assertEqual(len(columnar), 0)
+        self.assertEqual(columnar.nodes, [])
+        self.assertEqual(columnar.to_tree().nodes, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+import unittest
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.compact import CompactDirective, CompactSection, CompactTree, compact, parse_compact
+from apache_conf_parser.directives.redirect import Redirect
+
+
+class TestCompact(unittest.TestCase):
+    TEST_LINES = [
+        '# main site',
+        '',
+        '<VirtualHost *:80>',
+        '    ServerName example.com',
+        '    Redirect 301 /old /new',
+        '    <Directory \\',
+        '        /var/www>',
+        '        Options -Indexes \\',
+        '            +FollowSymLinks',
+        '    </Directory>',
+        '    <Location />',
+        '    </Location>',
+        '</VirtualHost>',
+    ]
+
+    def setUp(self):
+        self.tree = ApacheConfParser("\n".join(self.TEST_LINES), infile=False)
+        self.compact_tree = compact(self.tree)
+
+    def test_str(self):
+        expected = str(self.tree)
+        actual = str(self.compact_tree)
+        self.assertEqual(
+            first=expected,
+            second=actual,
+            msg='Expected str(compact_tree) to return {}, received: {}'.format(expected, actual),
+        )
+
+    def test_dumps(self):
+        self.assertEqual(self.compact_tree.dumps(), self.tree.dumps())
+
+    def test_read_api(self):
+        virtual_host = self.compact_tree.nodes[2]
+        self.assertIsInstance(virtual_host, CompactSection)
+        self.assertEqual(virtual_host.name, 'VirtualHost')
+        self.assertEqual(virtual_host.arguments, ('*:80',))
+        redirect = virtual_host.nodes[1]
+        self.assertIsInstance(redirect, CompactDirective)
+        self.assertIs(redirect.node_class, Redirect)
+        self.assertEqual(redirect.status, '301')
+        self.assertEqual(redirect.url_path, '/old')
+        self.assertEqual(virtual_host.nodes[2].nodes[0].arguments, ('-Indexes', '+FollowSymLinks'))
+
+    def test_shared_empty_containers(self):
+        location = self.compact_tree.nodes[2].nodes[3]
+        self.assertIs(location.nodes, ())
+        self.assertIs(self.compact_tree.nodes[0].name, None)
+
+    def test_slots(self):
+        for node in self.compact_tree.nodes:
+            self.assertFalse(hasattr(node, '__dict__'))
+
+    def test_eq_ignores_lines(self):
+        other = parse_compact([' # main site', '', '<VirtualHost   *:80>'] + self.TEST_LINES[3:])
+        self.assertEqual(self.compact_tree, other)
+
+    def test_not_eq(self):
+        other = parse_compact(self.TEST_LINES[:4] + ['    Redirect 302 /old /new'] + self.TEST_LINES[5:])
+        self.assertNotEqual(self.compact_tree, other)
+
+    def test_parse_compact(self):
+        self.assertEqual(parse_compact(self.TEST_LINES), self.compact_tree)
+
+    def test_section_api(self):
+        walked = []
+
+        def walk(nodes):
+            for node in nodes:
+                walked.append((node.name, tuple(getattr(node, 'arguments', ())), node.complete, node.stable))
+                if getattr(node, 'complex', False) or isinstance(node, CompactSection):
+                    walked.append((node.header.name, tuple(node.header.arguments), node.body.complete))
+                    walk(node.body.nodes)
+
+        walk(self.tree.nodes)
+        expected = list(walked)
+        del walked[:]
+        walk(self.compact_tree.nodes)
+        self.assertEqual(walked, expected)
+        section = self.compact_tree.nodes[2]
+        self.assertEqual(str(section.body), str(self.tree.nodes[2].body))
+        self.assertEqual(section.header.dumps(), self.tree.nodes[2].header.dumps())
+
+    def test_expand(self):
+        self.assertEqual(self.compact_tree.expand().nodes, self.tree.nodes)
+        self.assertIsInstance(compact(self.compact_tree.expand()), CompactTree)
+
+    def test_expand_trailing_blank_line(self):
+        lines = self.TEST_LINES + ['']
+        self.assertEqual(str(parse_compact(lines).expand()), "\n".join(lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+import unittest
+
+from apache_conf_parser.events import EventHandler, EventParser, parse_events
+from apache_conf_parser.exceptions import InvalidLineError, NestingLimitError, NodeCompleteError, NodeMatchError
+from apache_conf_parser.nodes.complex_node import ComplexNode
+
+
+class RecordingHandler(EventHandler):
+    def __init__(self):
+        self.events = []
+
+    def start_section(self, name, args, lineno):
+        self.events.append(('start_section', name, args, lineno))
+
+    def end_section(self, name):
+        self.events.append(('end_section', name))
+
+    def directive(self, name, args, lineno):
+        self.events.append(('directive', name, args, lineno))
+
+    def comment(self, text):
+        self.events.append(('comment', text))
+
+
+class TestEventParser(unittest.TestCase):
+
+    def test_events(self):
+        test_lines = [
+            '# main site',
+            '',
+            '<VirtualHost *:80>',
+            '    ServerName example.com',
+            '    <Directory /var/www>',
+            '        RewriteRule ^old/(.*)$ /new/$1 [L,R=301]',
+            '    </Directory>',
+            '</VirtualHost>',
+        ]
+        expected = [
+            ('comment', ' main site'),
+            ('start_section', 'VirtualHost', ['*:80'], 3),
+            ('directive', 'ServerName', ['example.com'], 4),
+            ('start_section', 'Directory', ['/var/www'], 5),
+            ('directive', 'RewriteRule', ['^old/(.*)$', '/new/$1', '[L,R=301]'], 6),
+            ('end_section', 'Directory'),
+            ('end_section', 'VirtualHost'),
+        ]
+        actual = parse_events(test_lines, RecordingHandler()).events
+        self.assertEqual(
+            first=expected,
+            second=actual,
+            msg='Expected events to be {}, received: {}'.format(expected, actual),
+        )
+
+    def test_continuation_lines(self):
+        test_lines = [
+            '<Directory \\',
+            '    /var/www>',
+            'Options -Indexes \\',
+            '    +FollowSymLinks',
+            '</Directory>',
+        ]
+        expected = [
+            ('start_section', 'Directory', ['/var/www'], 1),
+            ('directive', 'Options', ['-Indexes', '+FollowSymLinks'], 3),
+            ('end_section', 'Directory'),
+        ]
+        self.assertEqual(parse_events(test_lines, RecordingHandler()).events, expected)
+
+    def test_default_handler_ignores_events(self):
+        parse_events(['<Directory /var/www>', 'Options -Indexes', '</Directory>'], EventHandler())
+
+    def test_unmatched_line(self):
+        with self.assertRaises(NodeMatchError):
+            parse_events(['\\'], EventHandler())
+
+    def test_closing_tag_of_outer_section_while_inner_open(self):
+        with self.assertRaises(NodeMatchError):
+            parse_events(['<Outer>', '<Inner>', '</Outer>'], EventHandler())
+
+    def test_angle_brackets_in_arguments(self):
+        with self.assertRaises(InvalidLineError):
+            parse_events(['Options a<b'], EventHandler())
+
+    def test_unclosed_section(self):
+        parser = EventParser(EventHandler())
+        parser.feed('<Directory /var/www>')
+        with self.assertRaises(NodeCompleteError):
+            parser.close()
+
+    def test_nesting_limit(self):
+        levels = ComplexNode.NESTING_LIMIT // 2 + 1
+        test_lines = ['<Level%d>' % level for level in range(levels)] + ['Redirect here there']
+        with self.assertRaises(NestingLimitError):
+            parse_events(test_lines, EventHandler())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.directives.include import Include, IncludeOptional
+from apache_conf_parser.exceptions import IncludeError
+from apache_conf_parser.includes import PARALLEL_MIN_FILES, IncludeResolver, flatten, iter_includes
+
+
+class TestIncludeResolver(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def write(self, name, lines):
+        path = os.path.join(self.root, name)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as conf:
+            conf.write("\n".join(lines))
+        return path
+
+    def names(self, nodes):
+        return [node.name for node in nodes if node.name is not None]
+
+    def test_resolve_nested_and_shared_files(self):
+        self.write('snippets/ssl.conf', ['SSLEngine on'])
+        self.write('sites/b.conf', ['<VirtualHost *:443>', 'ServerName b', 'Include snippets/ssl.conf', '</VirtualHost>'])
+        self.write('sites/a.conf', ['<VirtualHost *:443>', 'ServerName a', 'Include snippets/ssl.conf', '</VirtualHost>'])
+        main = self.write('httpd.conf', ['Listen 80', 'Include sites/*.conf'])
+        tree = ApacheConfParser(main, includes=True)
+
+        include = tree.nodes[1]
+        self.assertIsInstance(include, Include)
+        self.assertEqual([str(t.nodes[0].body.nodes[0]) for t in include.included], ['ServerName a', 'ServerName b'])
+        ssl_a = include.included[0].nodes[0].body.nodes[1].included[0]
+        ssl_b = include.included[1].nodes[0].body.nodes[1].included[0]
+        self.assertIs(ssl_a, ssl_b)
+        self.assertEqual(len(tree.resolver.trees), 4)
+        self.assertEqual(tree.resolver.graph[os.path.abspath(main)], [
+            os.path.join(self.root, 'sites', 'a.conf'), os.path.join(self.root, 'sites', 'b.conf')])
+
+    def test_server_root_directive(self):
+        self.write('conf/extra.conf', ['KeepAlive On'])
+        main = self.write('conf/httpd.conf', ['ServerRoot "%s"' % self.root, 'Include conf/extra.conf'])
+        tree = ApacheConfParser(main, includes=True)
+        self.assertEqual(self.names(flatten(tree.nodes)), ['ServerRoot', 'KeepAlive'])
+
+    def test_directory(self):
+        self.write('conf.d/b.conf', ['B on'])
+        self.write('conf.d/a/c.conf', ['C on'])
+        self.write('conf.d/a.conf', ['A on'])
+        tree = ApacheConfParser(self.write('httpd.conf', ['Include conf.d']), includes=True)
+        self.assertEqual(self.names(flatten(tree.nodes)), ['A', 'C', 'B'])
+
+    def test_include_optional_without_matches(self):
+        tree = ApacheConfParser(
+            self.write('httpd.conf', ['IncludeOptional missing/*.conf', 'IncludeOptional missing.conf']), includes=True)
+        self.assertIsInstance(tree.nodes[0], IncludeOptional)
+        self.assertEqual(tree.nodes[0].included, [])
+        self.assertEqual(list(flatten(tree.nodes)), [])
+
+    def test_missing_file(self):
+        with self.assertRaises(IncludeError):
+            ApacheConfParser(self.write('httpd.conf', ['Include missing.conf']), includes=True)
+
+    def test_wildcard_without_matches(self):
+        with self.assertRaises(IncludeError):
+            ApacheConfParser(self.write('httpd.conf', ['Include missing/*.conf']), includes=True)
+
+    def test_invalid_included_file(self):
+        self.write('broken.conf', ['<VirtualHost *:80>'])
+        with self.assertRaises(IncludeError):
+            ApacheConfParser(self.write('httpd.conf', ['Include broken.conf']), includes=True)
+
+    def test_cycle(self):
+        self.write('a.conf', ['Include b.conf'])
+        self.write('b.conf', ['Include a.conf'])
+        with self.assertRaises(IncludeError) as raised:
+            ApacheConfParser(self.write('httpd.conf', ['Include a.conf']), includes=True)
+        self.assertIn('a.conf -> ', str(raised.exception))
+
+    def test_self_include(self):
+        with self.assertRaises(IncludeError):
+            ApacheConfParser(self.write('httpd.conf', ['Include httpd.conf']), includes=True)
+
+    def test_diamond_is_not_a_cycle(self):
+        self.write('common.conf', ['KeepAlive On'])
+        self.write('a.conf', ['Include common.conf'])
+        self.write('b.conf', ['Include common.conf'])
+        tree = ApacheConfParser(self.write('httpd.conf', ['Include a.conf', 'Include b.conf']), includes=True)
+        self.assertEqual(self.names(flatten(tree.nodes)), ['KeepAlive', 'KeepAlive'])
+
+    def test_shared_resolver_parses_files_once(self):
+        self.write('common.conf', ['KeepAlive On'])
+        resolver = IncludeResolver(server_root=self.root)
+        first = ApacheConfParser(self.write('one.conf', ['Include common.conf']), includes=resolver)
+        second = ApacheConfParser(self.write('two.conf', ['Include common.conf']), includes=resolver)
+        self.assertIs(first.nodes[0].included[0], second.nodes[0].included[0])
+
+    def test_parallel_parsing(self):
+        for i in range(4):
+            self.write('sites/%d.conf' % i, ['ServerName site%d' % i])
+        resolver = IncludeResolver(workers=2, parallel_min_files=4)
+        tree = ApacheConfParser(self.write('httpd.conf', ['Include sites/*.conf']), includes=resolver)
+        self.assertEqual([str(node) for node in flatten(tree.nodes)], ['ServerName site%d' % i for i in range(4)])
+
+    def test_parses_in_process_by_default(self):
+        resolver = IncludeResolver()
+        self.assertEqual(resolver.get_workers(1000), 1)
+        resolver = IncludeResolver(workers=4)
+        self.assertEqual(resolver.get_workers(PARALLEL_MIN_FILES - 1), 1)
+        self.assertEqual(resolver.get_workers(PARALLEL_MIN_FILES), 4)
+        with patch('apache_conf_parser.includes.current_process') as current_process:
+            current_process.return_value.daemon = True
+            self.assertEqual(resolver.get_workers(PARALLEL_MIN_FILES), 1)
+
+    def test_resolved_trees_compare_equal(self):
+        self.write('extra.conf', ['KeepAlive On'])
+        path = self.write('httpd.conf', ['Include extra.conf'])
+        self.assertEqual(ApacheConfParser(path, includes=True), ApacheConfParser(path, includes=True))
+
+    def test_unresolved_by_default(self):
+        self.write('extra.conf', ['KeepAlive On'])
+        tree = ApacheConfParser(self.write('httpd.conf', ['Include extra.conf']))
+        self.assertIsNone(tree.nodes[0].included)
+
+
+class TestIterIncludes(unittest.TestCase):
+
+    def test_includes_inside_sections(self):
+        tree = ApacheConfParser("\n".join([
+            'Include a.conf',
+            '<VirtualHost *:80>',
+            '    <Directory /var/www>',
+            '        IncludeOptional b.conf',
+            '    </Directory>',
+            '    Include c.conf',
+            '</VirtualHost>',
+        ]), infile=False)
+        self.assertEqual([node.file_path for node in iter_includes(tree.nodes)], ['a.conf', 'b.conf', 'c.conf'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+import copy
+import pickle
+import unittest
+from unittest.mock import patch
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.binary import dump_binary, load_binary
+from apache_conf_parser.directives.simple_directive import SimpleDirective
+from apache_conf_parser.index import NameIndex, get_index_name
+
+
+class TestNameIndex(unittest.TestCase):
+    TEST_CONTENT = "\n".join([
+        '# a comment',
+        'RewriteEngine On',
+        '<VirtualHost *:80>',
+        '    ServerName example.com',
+        '    RewriteRule ^a$ /b [L]',
+        '    <Directory /var/www>',
+        '        rewriterule ^c$ /d [L]',
+        '        Options -Indexes \\',
+        '            +FollowSymLinks',
+        '    </Directory>',
+        '</VirtualHost>',
+        '',
+        'RewriteRule ^e$ /f [L]',
+    ])
+
+    def setUp(self):
+        self.tree = ApacheConfParser(self.TEST_CONTENT, infile=False, index=True)
+        self.index = self.tree.index
+        self.virtual_host = self.tree.nodes[2]
+        self.directory = self.virtual_host.body.nodes[2]
+
+    def assert_matches_walk(self, tree):
+        """Check the index against the names found by walking the tree."""
+        expected = {}
+        stack = [iter(tree.nodes)]
+        while stack:
+            for node in stack[-1]:
+                name = get_index_name(node)
+                if name is not None:
+                    expected.setdefault(name, []).append(node)
+                if getattr(type(node), 'complex', False):
+                    stack.append(iter(node.body.nodes))
+                    break
+            else:
+                stack.pop()
+        self.assertEqual(tree.index.names(), sorted(expected))
+        for name, nodes in expected.items():
+            self.assertEqual(list(map(id, tree.index.find(name))), list(map(id, nodes)))
+
+    def test_find_is_case_insensitive(self):
+        rules = self.index.find('REWRITERULE')
+        self.assertEqual([str(rule).strip() for rule in rules], [
+            'RewriteRule ^a$ /b [L]', 'rewriterule ^c$ /d [L]', 'RewriteRule ^e$ /f [L]'])
+        self.assertIn('rewriteengine', self.index)
+        self.assertNotIn('Redirect', self.index)
+        self.assertEqual(self.index.find('Redirect'), [])
+        self.assertEqual(self.index.count('RewriteRule'), 3)
+
+    def test_sections_and_parents(self):
+        self.assertEqual(self.index.find('VirtualHost'), [self.virtual_host])
+        self.assertEqual(self.index.find('directory'), [self.directory])
+        options, = self.index.find('Options')
+        self.assertEqual(self.index.get_parents(options), [self.virtual_host, self.directory])
+        self.assertEqual(
+            first=[(str(node).strip(), len(parents)) for node, parents in self.index.find_with_parents('RewriteRule')],
+            second=[('RewriteRule ^a$ /b [L]', 1), ('rewriterule ^c$ /d [L]', 2), ('RewriteRule ^e$ /f [L]', 0)],
+        )
+        self.assert_matches_walk(self.tree)
+
+    def test_lazy_nodes_stay_lazy(self):
+        tree = ApacheConfParser(self.TEST_CONTENT, infile=False, lazy=True, index=True)
+        rules = tree.index.find('rewriterule')
+        self.assertEqual(len(rules), 3)
+        self.assertTrue(all(rule.lazy for rule in rules))
+        self.assert_matches_walk(tree)
+
+    def test_append_insert_and_delete(self):
+        redirect = SimpleDirective()
+        redirect.add_line('Redirect 301 /here /there')
+        self.directory.body.nodes.append(redirect)
+        self.assertEqual(self.index.find('redirect'), [redirect])
+        self.assertEqual(self.index.get_parents(redirect), [self.virtual_host, self.directory])
+        self.tree.nodes.insert(0, ApacheConfParser('ServerName other.example.com', infile=False).nodes[0])
+        self.assertEqual(self.index.count('ServerName'), 2)
+        del self.virtual_host.body.nodes[1]
+        self.assertEqual(self.index.count('RewriteRule'), 2)
+        self.assert_matches_walk(self.tree)
+
+    def test_find_in_document_order(self):
+        rules = self.index.find('RewriteRule')
+        rule = ApacheConfParser('RewriteRule ^g$ /h [L]', infile=False).nodes[0]
+        self.tree.nodes.insert(0, rule)
+        self.assertEqual(self.index.find('RewriteRule'), [rule] + rules)
+        self.virtual_host.body.nodes[1:2] = []
+        self.directory.body.nodes.append(rules[0])
+        self.assertEqual(self.index.find('RewriteRule'), [rule, rules[1], rules[0], rules[2]])
+        self.tree.apply_edit(0, 0, ['RewriteRule ^i$ /j [L]'])
+        self.assertEqual(str(self.index.find('RewriteRule')[0]).strip(), 'RewriteRule ^i$ /j [L]')
+        self.assert_matches_walk(self.tree)
+
+    def make_rule(self, number):
+        return ApacheConfParser('RewriteRule ^%d$ /x [L]' % number, infile=False).nodes[0]
+
+    def test_edits_keep_order_keys(self):
+        body = self.directory.body.nodes
+        with patch.object(NameIndex, 'renumber', side_effect=AssertionError('renumbered')):
+            for number in range(50):
+                self.tree.nodes.append(self.make_rule(number))
+                self.tree.nodes.insert(0, self.make_rule(number))
+                body[len(body):] = [self.make_rule(number), self.make_rule(number)]
+                body[0:0] = [self.make_rule(number), self.make_rule(number)]
+            # room for about 64 inserts between two nodes
+            for number in range(60):
+                body.insert(3, self.make_rule(number))
+            self.assert_matches_walk(self.tree)
+
+    def test_inserts_at_one_place(self):
+        self.index.find('RewriteRule')
+        with patch.object(NameIndex, 'renumber', autospec=True, side_effect=NameIndex.renumber) as renumber:
+            for number in range(200):
+                self.tree.nodes.insert(2, self.make_rule(number))
+                self.assertIs(self.index.find('RewriteRule')[0], self.tree.nodes[2])
+        self.assertTrue(renumber.called)
+        self.assert_matches_walk(self.tree)
+
+    def test_delete_section(self):
+        del self.tree.nodes[2]
+        self.assertEqual(self.index.names(), ['rewriteengine', 'rewriterule'])
+        self.assertEqual(self.index.count('RewriteRule'), 1)
+        # changes to the removed section are no longer indexed
+        self.directory.body.nodes.append(self.tree.nodes[0])
+        self.assertEqual(self.index.count('RewriteEngine'), 1)
+
+    def test_replace_and_move_section(self):
+        section = ApacheConfParser('<IfModule mod_rewrite.c>\n    RewriteRule ^g$ /h\n</IfModule>', infile=False).nodes[0]
+        self.tree.nodes[2:3] = [section]
+        self.assertEqual(self.index.names(), ['ifmodule', 'rewriteengine', 'rewriterule'])
+        self.assertEqual(self.index.get_parents(section.body.nodes[0]), [section])
+        self.assertEqual(self.index.count('RewriteRule'), 2)
+        self.tree.nodes[0] = self.virtual_host
+        self.assertEqual(self.index.get_parents(self.directory), [self.virtual_host])
+        self.assertEqual(self.index.count('RewriteRule'), 4)
+        self.assert_matches_walk(self.tree)
+
+    def test_apply_edit(self):
+        self.tree.apply_edit(6, 7, ['        Redirect 301 /c /d'])
+        redirect, = self.index.find('Redirect')
+        self.assertEqual(self.index.get_parents(redirect), [self.virtual_host, self.directory])
+        self.tree.apply_edit(9, 11, ['    </Directory>', '</VirtualHost>', '<Location />', '</Location>'])
+        self.assertEqual(self.index.count('Location'), 1)
+        self.assert_matches_walk(self.tree)
+
+    def test_build_index_on_parsed_tree(self):
+        tree = ApacheConfParser(self.TEST_CONTENT, infile=False)
+        self.assertIsNone(tree.index)
+        index = tree.build_index()
+        self.assertIsInstance(index, NameIndex)
+        self.assertIs(tree.index, index)
+        self.assert_matches_walk(tree)
+        self.assertEqual(tree, self.tree)
+
+    def test_pickle_and_copy(self):
+        for tree in [pickle.loads(pickle.dumps(self.tree)), copy.deepcopy(self.tree)]:
+            self.assertIsNot(tree.index, self.index)
+            self.assertEqual(tree.index.count('RewriteRule'), 3)
+            tree.nodes[2].body.nodes.append(ApacheConfParser('RewriteEngine Off', infile=False).nodes[0])
+            self.assertEqual(tree.index.count('RewriteEngine'), 2)
+            self.assert_matches_walk(tree)
+
+    def test_binary_round_trip_drops_index(self):
+        tree = load_binary(dump_binary(self.tree))
+        self.assertIsNone(tree.index)
+        self.assertEqual(tree, self.tree)
+        tree.build_index()
+        self.assert_matches_walk(tree)
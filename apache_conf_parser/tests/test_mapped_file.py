@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+import os
+import tempfile
+import unittest
+
+from apache_conf_parser.mapped_file import MappedFile
+
+
+class TestMappedFile(unittest.TestCase):
+
+    def write_file(self, content):
+        with tempfile.NamedTemporaryFile('wb', suffix='.conf', delete=False) as conf_file:
+            conf_file.write(content)
+        self.addCleanup(os.unlink, conf_file.name)
+        return conf_file.name
+
+    def test_lines(self):
+        path = self.write_file(b'RewriteEngine On\n\nRewriteRule ^a$ b [L]\n')
+        with MappedFile(path) as mapped_file:
+            actual = list(mapped_file)
+        expected = ['RewriteEngine On', '', 'RewriteRule ^a$ b [L]']
+        self.assertEqual(
+            first=expected,
+            second=actual,
+            msg='Expected lines to be {}, received: {}'.format(expected, actual),
+        )
+
+    def test_no_trailing_newline(self):
+        path = self.write_file(b'RewriteEngine On\nRewriteBase /')
+        with MappedFile(path) as mapped_file:
+            self.assertEqual(list(mapped_file), ['RewriteEngine On', 'RewriteBase /'])
+
+    def test_crlf_line_endings(self):
+        path = self.write_file(b'RewriteEngine On\r\nRewriteBase /\r\n')
+        with MappedFile(path) as mapped_file:
+            self.assertEqual(list(mapped_file), ['RewriteEngine On', 'RewriteBase /'])
+
+    def test_empty_file(self):
+        path = self.write_file(b'')
+        with MappedFile(path) as mapped_file:
+            self.assertEqual(list(mapped_file), [])
+
+    def test_encoding(self):
+        path = self.write_file('# café\n'.encode('utf-8'))
+        with MappedFile(path, encoding='utf-8') as mapped_file:
+            self.assertEqual(list(mapped_file), ['# café'])
+
+    def test_closed(self):
+        path = self.write_file(b'RewriteEngine On\n')
+        mapped_file = MappedFile(path)
+        mapped_file.close()
+        self.assertEqual(list(mapped_file), [])
+
+    def test_mapped_on_first_use(self):
+        path = self.write_file(b'RewriteEngine On\n')
+        mapped_file = MappedFile(path)
+        self.assertIsNone(mapped_file._buffer)
+        with mapped_file:
+            self.assertIsNotNone(mapped_file._buffer)
+            self.assertEqual(list(mapped_file), ['RewriteEngine On'])
+        self.assertTrue(mapped_file.closed)
+        self.assertIsNone(mapped_file._buffer)
+
+    def test_missing_file(self):
+        mapped_file = MappedFile(os.path.join(tempfile.gettempdir(), 'missing-apache-conf-parser.conf'))
+        with self.assertRaises(FileNotFoundError):
+            list(mapped_file)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+import os
+import shutil
+import tempfile
+import unittest
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.columnar import ColumnarTree
+from apache_conf_parser.compact import CompactTree
+from apache_conf_parser.exceptions import NodeMatchError
+from apache_conf_parser.parallel import parse_many
+
+
+class TestParseMany(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.paths = []
+        for i in range(10):
+            self.paths.append(self.write('site%d.conf' % i, [
+                '<IfModule mod_rewrite.c>',
+                '    RewriteEngine On',
+                '    RewriteRule ^old%d$ /new [R=301,L]' % i,
+                '</IfModule>',
+            ]))
+
+    def write(self, name, lines):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as conf:
+            conf.write("\n".join(lines))
+        return path
+
+    def test_ordered(self):
+        results = list(parse_many(self.paths, workers=2, chunksize=3))
+        self.assertEqual([result.path for result in results], self.paths)
+        for result in results:
+            self.assertTrue(result.ok)
+            self.assertIsInstance(result.tree, ColumnarTree)
+            self.assertEqual(str(result.tree.to_tree()), str(ApacheConfParser(result.path)))
+
+    def test_unordered(self):
+        results = list(parse_many(self.paths, workers=2, chunksize=1, ordered=False))
+        self.assertEqual(sorted(result.path for result in results), sorted(self.paths))
+
+    def test_in_process(self):
+        results = list(parse_many(self.paths, workers=1))
+        self.assertEqual([result.path for result in results], self.paths)
+
+    def test_forms(self):
+        path = self.paths[0]
+        result, = parse_many([path], workers=2, form='tree')
+        self.assertEqual(result.tree, ApacheConfParser(path))
+        result, = parse_many([path], workers=2, form='compact')
+        self.assertIsInstance(result.tree, CompactTree)
+
+    def test_unknown_form(self):
+        with self.assertRaises(ValueError):
+            parse_many(self.paths, form='xml')
+
+    def test_errors_are_reported_per_file(self):
+        invalid = self.write('invalid.conf', ['\\'])
+        missing = os.path.join(self.directory, 'missing.conf')
+        results = list(parse_many([invalid, self.paths[0], missing], workers=2))
+        self.assertEqual([result.ok for result in results], [False, True, False])
+        self.assertIsNone(results[0].tree)
+        self.assertIsInstance(results[0].error, NodeMatchError)
+        self.assertIsInstance(results[2].error, (IOError, OSError))
+
+
+if __name__ == '__main__':
+    unittest.main()
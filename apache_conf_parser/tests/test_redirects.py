@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+import unittest
+
+from parameterized import parameterized
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.exceptions import DirectiveError
+from apache_conf_parser.redirects import RedirectIndex, RedirectMatcher
+
+TEST_CONTENT = "\n".join([
+    'Redirect /docs http://docs.example.com',
+    'Redirect 301 /docs/old http://archive.example.com/old',
+    'RedirectPermanent /blog/ https://blog.example.com/',
+    'Redirect permanent /shop/cart https://shop.example.com/cart',
+    '<IfModule mod_alias.c>',
+    '    Redirect seeother /shop https://shop.example.com',
+    '    RedirectTemp /tmp http://example.com/temporary?from=tmp',
+    '</IfModule>',
+    'Redirect gone /removed',
+    '<Location /elsewhere>',
+    '    Redirect /elsewhere http://other.example.com',
+    '</Location>',
+    'Redirect 307 /a/b/c http://example.com/abc',
+    'Redirect /a/b http://example.com/ab',
+])
+
+
+class TestRedirectIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = RedirectIndex(ApacheConfParser(TEST_CONTENT, infile=False))
+
+    @parameterized.expand([
+        ('/docs', 'http://docs.example.com', 302),
+        ('/docs/', 'http://docs.example.com/', 302),
+        ('/docs/guide/intro.html?lang=en', 'http://docs.example.com/guide/intro.html?lang=en', 302),
+        # the first match wins, not the longest one
+        ('/docs/old/page', 'http://docs.example.com/old/page', 302),
+        ('/documents', None, None),
+        ('/blog', None, None),
+        ('/blog/', 'https://blog.example.com/', 301),
+        ('/blog//2024/post', 'https://blog.example.com/2024/post', 301),
+        ('/shop/cart/item', 'https://shop.example.com/cart/item', 301),
+        ('/shop/checkout', 'https://shop.example.com/checkout', 303),
+        ('/tmp?b=c', 'http://example.com/temporary?from=tmp', 302),
+        ('/removed/page', None, 410),
+        ('/elsewhere', None, None),
+        ('/a/b/c/d', 'http://example.com/abc/d', 307),
+        ('/a/b/x', 'http://example.com/ab/x', 302),
+        ('/a/b%20c', None, None),
+        ('/a/b/caf%C3%A9', 'http://example.com/ab/caf%C3%A9', 302),
+        ('/', None, None),
+    ])
+    def test_resolve(self, url, location, status):
+        result = self.index.resolve(url)
+        if status is None:
+            self.assertIsNone(result)
+        else:
+            self.assertEqual((result.location, result.status), (location, status))
+
+    def test_find(self):
+        self.assertIs(self.index.find('/docs/old?x=1').node, self.index.tree.nodes[0])
+        self.assertIsNone(self.index.find('/nothing'))
+
+    def test_matches_linear_scan(self):
+        paths = ['/docs', '/docs/old', '/blog/x', '/shop', '/shopping', '/a', '/a/b', '/a/b/c', '/tmp/', '/removed']
+
+        def linear_find(path):
+            for entry in self.index.entries:
+                url_path = entry.url_path
+                if path == url_path.rstrip('/') and not entry.slash or path.startswith(
+                        url_path if entry.slash else url_path + '/'):
+                    return entry
+
+        for path in paths:
+            self.assertIs(self.index.find(path), linear_find(path), path)
+
+    def test_root(self):
+        index = RedirectIndex(ApacheConfParser('Redirect /a/ http://a.example.com/\nRedirect / http://example.com/',
+                                               infile=False))
+        self.assertEqual(index.resolve('/x/y').location, 'http://example.com/x/y')
+        self.assertEqual(index.resolve('/a/y').location, 'http://a.example.com/y')
+        self.assertEqual(index.resolve('/a').location, 'http://example.com/a')
+
+    def test_resolve_many(self):
+        results = list(self.index.resolve_many(['/docs/a', '/nowhere', '/blog/b']))
+        self.assertEqual([result and result.location for result in results],
+                         ['http://docs.example.com/a', None, 'https://blog.example.com/b'])
+
+    def test_section(self):
+        section = ApacheConfParser(TEST_CONTENT, infile=False).nodes[6]
+        index = RedirectIndex(section)
+        self.assertEqual(index.resolve('/elsewhere/x').location, 'http://other.example.com/x')
+        self.assertEqual(len(index.entries), 1)
+
+    @parameterized.expand([
+        ('Redirect',),
+        ('Redirect 301 /a',),
+        ('Redirect gone /a http://example.com',),
+        ('Redirect a http://example.com',),
+        ('Redirect /a http://example.com extra',),
+    ])
+    def test_invalid(self, content):
+        with self.assertRaises(DirectiveError):
+            RedirectIndex(ApacheConfParser(content, infile=False))
+
+
+REDIRECT_MATCH_CONTENT = "\n".join([
+    'RedirectMatch ^/blog/(\\d+)/(.*)$ https://blog.example.com/$2?year=$1',
+    'RedirectMatch 301 \\.gif$ http://images.example.com/converted.png',
+    'RedirectMatch permanent ^/docs/(.*)\\.pdf$ http://docs.example.com/pdf/$1',
+    'RedirectMatch gone ^/old-',
+    '<IfModule mod_alias.c>',
+    '    RedirectMatch (?i)^/Shop/(.*) https://shop.example.com/$1',
+    '</IfModule>',
+    'RedirectMatch ^/(fr|de)/(.*)$ http://$1.example.com/$2',
+    'RedirectMatch ^/docs/ http://docs.example.com/',
+    'RedirectMatch \\$price http://example.com/\\$1',
+])
+
+
+class TestRedirectMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = RedirectMatcher(ApacheConfParser(REDIRECT_MATCH_CONTENT, infile=False))
+
+    @parameterized.expand([
+        ('/blog/2024/post', 'https://blog.example.com/post?year=2024', 302),
+        ('/blog/2024/post?x=1', 'https://blog.example.com/post?year=2024', 302),
+        # the first match wins, even when a later regex has a longer literal
+        ('/blog/2024/image.gif', 'https://blog.example.com/image.gif?year=2024', 302),
+        ('/img/a.gif?x=1', 'http://images.example.com/converted.png?x=1', 301),
+        ('/docs/guide.pdf', 'http://docs.example.com/pdf/guide', 301),
+        ('/docs/guide.html', 'http://docs.example.com/', 302),
+        ('/old-page', None, 410),
+        ('/SHOP/cart/caf%C3%A9', 'https://shop.example.com/cart/caf%C3%A9', 302),
+        ('/de/seite', 'http://de.example.com/seite', 302),
+        ('/a/$price', 'http://example.com/$1', 302),
+        ('/nothing', None, None),
+    ])
+    def test_resolve(self, url, location, status):
+        result = self.matcher.resolve(url)
+        if status is None:
+            self.assertIsNone(result)
+        else:
+            self.assertEqual((result.location, result.status), (location, status))
+
+    def test_matches_sequential_search(self):
+        paths = ['/blog/1/a.gif', '/docs/a.pdf', '/docs/x', '/shop/a', '/SHOP', '/fr/', '/old-x.gif', '/x', '/$price']
+        for path in paths:
+            expected = next((entry for entry in self.matcher.entries if entry.regex.search(path)), None)
+            self.assertIs(self.matcher.find(path), expected, path)
+
+    def test_prefilter(self):
+        self.matcher.find('/nothing/here')
+        # only the regex whose literal string is just a slash runs
+        self.assertEqual(self.matcher.evaluations, 1)
+        self.assertEqual(list(self.matcher.get_candidates('/docs/a.gif')), [1, 2, 5, 6])
+
+    @parameterized.expand([
+        ('/adm%C4%B1n',),
+        ('/ADM%C4%B0N',),
+        ('/%C5%BFecret',),
+        ('/%E2%84%AAey',),
+    ])
+    def test_non_ascii_case_folding(self, path):
+        # re matches ı and İ with i, ſ with s and the Kelvin sign with k when ignoring case, str.lower doesn't
+        matcher = RedirectMatcher(ApacheConfParser("\n".join([
+            'RedirectMatch (?i)/admin /denied',
+            'RedirectMatch (?i)^/secret /denied',
+            'RedirectMatch (?i)/key /denied',
+        ]), infile=False))
+        result = matcher.resolve(path)
+        self.assertEqual(result and result.location, '/denied')
+
+    def test_resolve_many(self):
+        results = list(self.matcher.resolve_many(['/docs/a.pdf', '/x']))
+        self.assertEqual(results[0].location, 'http://docs.example.com/pdf/a')
+        self.assertIsNone(results[1])
+
+    @parameterized.expand([
+        ('RedirectMatch ^/(a http://example.com',),
+        ('RedirectMatch 301 ^/a',),
+        ('RedirectMatch gone ^/a http://example.com',),
+    ])
+    def test_invalid(self, content):
+        with self.assertRaises(DirectiveError):
+            RedirectMatcher(ApacheConfParser(content, infile=False))
@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+import unittest
+
+from parameterized import parameterized
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.exceptions import DirectiveError
+from apache_conf_parser.literals import LiteralAutomaton, fold_subject, get_literal_prefix, get_required_literals
+from apache_conf_parser.rewrite import RewriteSimulator, compile_pattern
+
+HTACCESS = "\n".join([
+    '<IfModule mod_rewrite.c>',
+    'RewriteEngine On',
+    'RewriteBase /',
+    'RewriteRule ^index\\.php$ - [L]',
+    'RewriteCond %{REQUEST_FILENAME} !-f',
+    'RewriteCond %{REQUEST_FILENAME} !-d',
+    'RewriteRule . /index.php [L]',
+    '</IfModule>',
+])
+
+SERVER_CONFIG = "\n".join([
+    'RewriteEngine on',
+    'RewriteCond %{HTTP_HOST} ^www\\.(.+)$ [NC]',
+    'RewriteRule ^/(.*)$ https://%1/$1 [R=301,L]',
+    'RewriteCond %{HTTP:User-Agent} bot [NC,OR]',
+    'RewriteCond %{REMOTE_ADDR} =192.0.2.1',
+    'RewriteRule ^/private/ - [F]',
+    'RewriteRule ^/gone/ - [G]',
+    'RewriteRule ^/old/(\\d+)$ /new?id=$1 [QSA]',
+    'RewriteRule ^/new$ /end [C]',
+    'RewriteRule ^/end$ /chained [L]',
+    'RewriteRule ^/skip$ /skipped [S=1]',
+    'RewriteRule ^/skipped$ /not-reached [L]',
+    'RewriteRule ^/moved/(.*)$ /$1 [R=permanent,L]',
+    'RewriteRule ^/external$ http://other.example.org/page [L]',
+    'RewriteRule ^/search$ /find? [L]',
+    'RewriteRule ^/drop$ /dropped [QSD,L]',
+    'RewriteRule ^/env/(\\w+)$ - [E=SECTION:$1,L]',
+    'RewriteRule ^/(.*)a(.*)$ /$1b$2 [N]',
+    'RewriteRule ^/Case$ /lower [NC,L]',
+    'RewriteCond %{QUERY_STRING} -gt10',
+    'RewriteRule ^/count$ /many [L]',
+    'RewriteRule !^/(end|bb) /unmatched',
+])
+
+
+class TestRewriteSimulator(unittest.TestCase):
+
+    def setUp(self):
+        self.simulator = RewriteSimulator(ApacheConfParser(SERVER_CONFIG, infile=False), cache_size=0)
+
+    def evaluate(self, url, **variables):
+        variables.setdefault('HTTP_HOST', 'example.com')
+        return self.simulator.evaluate(url, **variables)
+
+    @parameterized.expand([
+        ('/private/a', {'HTTP_USER_AGENT': 'SomeBot/1.0'}, '/private/a', 403),
+        ('/private/a', {'REMOTE_ADDR': '192.0.2.1'}, '/private/a', 403),
+        ('/private/a', {'REMOTE_ADDR': '192.0.2.2'}, '/unmatched', None),
+        ('/gone/a', {}, '/gone/a', 410),
+        ('/old/5?x=2', {}, '/chained?id=5&x=2', None),
+        ('/skip', {}, '/unmatched', None),
+        ('/moved/a?x=1', {}, 'http://example.com/a?x=1', 301),
+        ('/moved/a', {'HTTPS': 'on'}, 'https://example.com/a', 301),
+        ('/external?x=1', {}, 'http://other.example.org/page?x=1', 302),
+        ('/search?q=1', {}, '/find', None),
+        ('/drop?q=1', {}, '/dropped', None),
+        ('/banana', {}, '/bbnbnb', None),
+        ('/CASE', {}, '/lower', None),
+        ('/count?12', {}, '/many?12', None),
+        ('/count?9', {}, '/unmatched?9', None),
+        ('/end', {}, '/end', None),
+        ('/a%20b', {}, '/unmatched', None),
+    ])
+    def test_evaluate(self, url, variables, target, status):
+        result = self.evaluate(url, **variables)
+        self.assertEqual(result.target, target)
+        self.assertEqual(result.status, status)
+
+    def test_condition_backreferences(self):
+        result = self.evaluate('/a/b?q=1', HTTP_HOST='WWW.Example.com')
+        self.assertEqual(result.target, 'https://Example.com/a/b?q=1')
+        self.assertEqual(result.status, 301)
+        self.assertTrue(result.redirect)
+
+    def test_env(self):
+        result = self.evaluate('/env/news')
+        self.assertEqual(result.env, {'SECTION': 'news'})
+        self.assertEqual(result.target, '/env/news')
+
+    def test_trace(self):
+        result = self.evaluate('/old/5')
+        self.assertEqual(
+            [(step.rule.arguments[0], step.input, step.matched, step.output) for step in result.trace],
+            [
+                ('^/(.*)$', '/old/5', False, None),
+                ('^/private/', '/old/5', False, None),
+                ('^/gone/', '/old/5', False, None),
+                ('^/old/(\\d+)$', '/old/5', True, '/new?id=5'),
+                ('^/new$', '/new', True, '/end?id=5'),
+                ('^/end$', '/end', True, '/chained?id=5'),
+            ]
+        )
+        self.assertTrue(result.rewritten)
+
+    def test_failed_chain_skips_the_rest_of_the_chain(self):
+        patterns = [step.rule.arguments[0] for step in self.evaluate('/end').trace]
+        self.assertIn('^/new$', patterns)
+        self.assertNotIn('^/end$', patterns)
+        self.assertIn('^/skip$', patterns)
+
+    def test_next_loop_limit(self):
+        simulator = RewriteSimulator(ApacheConfParser("RewriteEngine On\nRewriteRule ^/(.*)$ /a$1 [N]", infile=False))
+        self.assertEqual(simulator.evaluate('/x').status, 500)
+
+    def test_engine_off(self):
+        for content in ['RewriteRule ^/ /x', 'RewriteEngine On\nRewriteEngine Off\nRewriteRule ^/ /x']:
+            result = RewriteSimulator(ApacheConfParser(content, infile=False)).evaluate('/a')
+            self.assertEqual(result.target, '/a')
+            self.assertEqual(result.trace, ())
+            self.assertFalse(result.rewritten)
+
+    def test_cache(self):
+        simulator = RewriteSimulator(ApacheConfParser(SERVER_CONFIG, infile=False), cache_size=2)
+        first = simulator.evaluate('/old/1')
+        self.assertIs(simulator.evaluate('/old/1'), first)
+        self.assertIsNot(simulator.evaluate('/old/1', HTTP_HOST='example.com'), first)
+        results = list(simulator.evaluate_many(['/old/1', '/old/2', '/old/1']))
+        self.assertEqual([result.target for result in results], ['/chained?id=1', '/chained?id=2', '/chained?id=1'])
+        self.assertIs(results[0], results[2])
+        self.assertEqual(simulator.cache_info().hits, 3)
+
+    def test_patterns_are_shared(self):
+        RewriteSimulator(ApacheConfParser(SERVER_CONFIG, infile=False))
+        hits = compile_pattern.cache_info().hits
+        RewriteSimulator(ApacheConfParser(SERVER_CONFIG, infile=False))
+        self.assertGreater(compile_pattern.cache_info().hits, hits)
+
+    @parameterized.expand([
+        ('RewriteRule ^a$ /b [L,X]',),
+        ('RewriteRule ^a$ /b L',),
+        ('RewriteRule ^(a$ /b',),
+        ('RewriteRule ^a$',),
+        ('RewriteRule ^a$ /b [R=sometimes]',),
+        ('RewriteCond %{HTTP_HOST} ^a [L]\nRewriteRule ^a$ /b',),
+    ])
+    def test_invalid_rules(self, content):
+        with self.assertRaises(DirectiveError):
+            RewriteSimulator(ApacheConfParser(content, infile=False))
+
+
+class TestPerDirectoryRewriteSimulator(unittest.TestCase):
+
+    def test_front_controller(self):
+        existing = {'/var/www/style.css'}
+        simulator = RewriteSimulator(ApacheConfParser(HTACCESS, infile=False), per_directory=True,
+                                     document_root='/var/www', file_test=lambda test, path: path in existing)
+        result = simulator.evaluate('/foo/bar?x=1')
+        self.assertEqual(result.target, '/index.php?x=1')
+        # the rewritten request goes through the rules again, and stops at the first one
+        self.assertEqual([(step.input, step.matched) for step in result.trace],
+                         [('foo/bar', False), ('foo/bar', True), ('index.php', True)])
+        self.assertEqual(simulator.evaluate('/style.css').target, '/style.css')
+        self.assertEqual(simulator.evaluate('/').target, '/')
+
+    def test_directory_and_base(self):
+        content = "\n".join([
+            '<Directory /var/www/blog>',
+            '    RewriteEngine On',
+            '    RewriteBase /news/',
+            '    RewriteRule ^(\\d+)$ post.php?id=$1 [L]',
+            '    RewriteRule ^archive/(.*)$ /blog/$1 [L]',
+            '</Directory>',
+        ])
+        section = ApacheConfParser(content, infile=False).nodes[0]
+        simulator = RewriteSimulator(section, per_directory=True, directory='/blog')
+        self.assertEqual(simulator.evaluate('/blog/42').target, '/news/post.php?id=42')
+        self.assertEqual(simulator.evaluate('/blog/archive/archive/7').target, '/news/post.php?id=7')
+        # outside the directory, the rules don't apply
+        self.assertEqual(simulator.evaluate('/other/42').target, '/other/42')
+
+    def test_end_stops_the_next_passes(self):
+        content = "RewriteEngine On\nRewriteRule ^a$ b [END]\nRewriteRule ^b$ c [L]"
+        simulator = RewriteSimulator(ApacheConfParser(content, infile=False), per_directory=True)
+        self.assertEqual(simulator.evaluate('/a').target, '/b')
+        content = content.replace('END', 'L')
+        simulator = RewriteSimulator(ApacheConfParser(content, infile=False), per_directory=True)
+        self.assertEqual(simulator.evaluate('/a').target, '/c')
+
+    def test_rewrite_loop(self):
+        content = "RewriteEngine On\nRewriteRule ^(.*)$ x$1 [L]"
+        simulator = RewriteSimulator(ApacheConfParser(content, infile=False), per_directory=True)
+        self.assertEqual(simulator.evaluate('/a').status, 500)
+
+
+PREFILTER_CONFIG = "\n".join([
+    'RewriteEngine On',
+    'RewriteRule ^/blog/(\\d+)$ /post.php?id=$1 [L]',
+    'RewriteRule ^/shop/ - [C]',
+    'RewriteRule \\.html$ /static$0 [C]',
+    'RewriteRule ^/static/ - [L]',
+    'RewriteRule ^/skip/ /skipped [S=2]',
+    'RewriteRule ^/skipped$ /one',
+    'RewriteRule ^/one$ /two',
+    'RewriteRule !^/keep /kept [NC]',
+    'RewriteRule (?i)^/CASE/ /lower [L]',
+    'RewriteRule ^/(a|b)/ /ab [L]',
+    'RewriteRule \\.php$ /php [L]',
+])
+
+
+class TestRulePrefilter(unittest.TestCase):
+
+    def setUp(self):
+        tree = ApacheConfParser(PREFILTER_CONFIG, infile=False)
+        self.filtered = RewriteSimulator(tree, cache_size=0)
+        self.unfiltered = RewriteSimulator(tree, cache_size=0, prefilter=False)
+
+    def test_keys(self):
+        self.assertEqual(self.filtered.prefilter.keys, [
+            ('prefix', '/blog/'),
+            ('prefix', '/shop/'),
+            ('literal', '.html'),
+            ('prefix', '/static/'),
+            ('prefix', '/skip/'),
+            ('prefix', '/skipped'),
+            ('prefix', '/one'),
+            (None, None),
+            ('prefix', '/case/'),
+            ('prefix', '/'),
+            ('literal', '.php'),
+        ])
+
+    @parameterized.expand([
+        ('/blog/42',),
+        ('/shop/a.html',),
+        ('/shop/a.htm',),
+        ('/static/a.html',),
+        ('/skip/x',),
+        ('/skipped',),
+        ('/keep/a.php',),
+        ('/Case/x',),
+        ('/keep/b/c',),
+        ('/keep',),
+    ])
+    def test_same_results(self, url):
+        expected = self.unfiltered.evaluate(url)
+        result = self.filtered.evaluate(url)
+        self.assertEqual((result.target, result.status), (expected.target, expected.status))
+        self.assertEqual([(step.rule, step.input, step.matched, step.output) for step in result.trace],
+                         [(step.rule, step.input, step.matched, step.output) for step in expected.trace])
+
+    def test_evaluations_avoided(self):
+        for url in ['/blog/42', '/keep/a.php', '/shop/a.htm', '/keep']:
+            self.unfiltered.evaluate(url)
+            self.filtered.evaluate(url)
+        self.assertEqual(self.filtered.evaluations + self.filtered.avoided, self.unfiltered.evaluations)
+        self.assertGreater(self.filtered.avoided, self.filtered.evaluations)
+        self.assertEqual(self.unfiltered.avoided, 0)
+
+    @parameterized.expand([
+        ('/adm%C4%B1n',),
+        ('/ADM%C4%B0N/x',),
+        ('/a/%C5%BFecret',),
+        ('/a/%E2%84%AAey',),
+    ])
+    def test_non_ascii_case_folding(self, url):
+        # re matches ı and İ with i, ſ with s and the Kelvin sign with k when ignoring case, str.lower doesn't
+        tree = ApacheConfParser("\n".join([
+            'RewriteEngine On',
+            'RewriteRule ^/admin - [F,NC]',
+            'RewriteRule secret - [F,NC]',
+            'RewriteRule (?i)key - [F]',
+        ]), infile=False)
+        self.assertEqual(RewriteSimulator(tree, prefilter=False).evaluate(url).status, 403)
+        self.assertEqual(RewriteSimulator(tree).evaluate(url).status, 403)
+
+    def test_partial_trace(self):
+        simulator = RewriteSimulator(ApacheConfParser(PREFILTER_CONFIG, infile=False), full_trace=False)
+        result = simulator.evaluate('/keep/a.php')
+        self.assertEqual([(step.input, step.output) for step in result.trace], [('/keep/a.php', '/php')])
+        self.assertTrue(result.rewritten)
+        self.assertFalse(simulator.evaluate('/keep/x').rewritten)
+
+
+class TestLiterals(unittest.TestCase):
+
+    @parameterized.expand([
+        (r'^blog/(.*)$', 'blog/'),
+        (r'^index\.php$', 'index.php'),
+        (r'^(blog)/x+', 'blog/'),
+        (r'(?i)^Blog/', 'blog/'),
+        (r'\Aab', 'ab'),
+        (r'^(blog|news)/', None),
+        (r'^a|^b', None),
+        (r'^a?b', None),
+        (r'(?m)^ab', None),
+        (r'^(?i:ab)c', None),
+        (r'blog/', None),
+    ])
+    def test_get_literal_prefix(self, pattern, expected):
+        self.assertEqual(get_literal_prefix(pattern), expected)
+
+    @parameterized.expand([
+        (r'^/(blog|news)/(\d+)-(?:abc)+x\.html$', ['/', '/', '-', 'abc', 'x.html']),
+        (r'(?i)^/Old/(.*)', ['/old/']),
+        (r'^/a?b', ['/', 'b']),
+        (r'(?=ab)a(?:cd)?e', ['a', 'e']),
+        (r'.*', []),
+    ])
+    def test_get_required_literals(self, pattern, expected):
+        self.assertEqual(get_required_literals(pattern), expected)
+
+    def test_fold_subject(self):
+        self.assertEqual(fold_subject('/Blog/A.HTML'), '/blog/a.html')
+        self.assertIsNone(fold_subject('/adm\u0131n'))
+
+    def test_automaton(self):
+        literals = ['he', 'she', 'his', 'hers', 'e']
+        automaton = LiteralAutomaton(literals)
+        self.assertEqual(automaton.search('ushers'), {0, 1, 3, 4})
+        self.assertEqual(automaton.search('this'), {2})
+        self.assertEqual(automaton.search(''), set())
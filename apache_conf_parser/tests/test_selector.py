@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+import unittest
+
+from parameterized import parameterized
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.exceptions import SelectorError
+from apache_conf_parser.selector import Selector, compile_selector, select
+
+TEST_CONTENT = "\n".join([
+    'RewriteEngine On',
+    '<VirtualHost *:443>',
+    '    ServerName secure.example.com',
+    '    <Directory /var/www>',
+    '        RewriteRule ^a$ /b [L,R=301]',
+    '        <IfModule mod_rewrite.c>',
+    '            RewriteRule ^c$ /d [L]',
+    '        </IfModule>',
+    '    </Directory>',
+    '    <Directory /srv>',
+    '        RewriteRule ^e$ /f [L]',
+    '    </Directory>',
+    '    Redirect 301 /old /new',
+    '</VirtualHost>',
+    '<VirtualHost *:80 *:8080>',
+    '    ServerName example.com',
+    '    <Location "/a=b">',
+    '        Redirect 302 /here /there',
+    '    </Location>',
+    '    rewriterule ^g$ /h',
+    '</VirtualHost>',
+    '# RewriteRule in a comment',
+    'Redirect /x /y',
+])
+
+
+class TestSelector(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = ApacheConfParser(TEST_CONTENT, infile=False)
+        self.indexed_tree = ApacheConfParser(TEST_CONTENT, infile=False, index=True)
+
+    @parameterized.expand([
+        ('RewriteRule', ['RewriteRule ^a$ /b [L,R=301]', 'RewriteRule ^c$ /d [L]', 'RewriteRule ^e$ /f [L]',
+                         'rewriterule ^g$ /h']),
+        ('VIRTUALHOST[*:443] > Directory[/var/www] RewriteRule',
+         ['RewriteRule ^a$ /b [L,R=301]', 'RewriteRule ^c$ /d [L]']),
+        ('VirtualHost > Directory > RewriteRule', ['RewriteRule ^a$ /b [L,R=301]', 'RewriteRule ^e$ /f [L]']),
+        ('VirtualHost > RewriteRule', ['rewriterule ^g$ /h']),
+        ('VirtualHost[*:8080] ServerName', ['ServerName example.com']),
+        ('Redirect[status=301]', ['Redirect 301 /old /new']),
+        ('Redirect[status!=301]', ['Redirect 302 /here /there', 'Redirect /x /y']),
+        ('Redirect[url_path^=/h]', ['Redirect 302 /here /there']),
+        ('Redirect[url$=ew]', ['Redirect 301 /old /new']),
+        ('RewriteRule[flags=R=301]', ['RewriteRule ^a$ /b [L,R=301]']),
+        ('RewriteRule[substitution*=d]', ['RewriteRule ^c$ /d [L]']),
+        ('RewriteRule[0=^e$]', ['RewriteRule ^e$ /f [L]']),
+        ('Location[\'"/a=b"\'] > *', ['Redirect 302 /here /there']),
+        ('Location[0*="=b"] Redirect', ['Redirect 302 /here /there']),
+        ('Location[/a=b] > *', ['Redirect 302 /here /there']),
+        ('Location["/a=b"] > *', ['Redirect 302 /here /there']),
+        ('Location[0=/a=b] > *', ['Redirect 302 /here /there']),
+        ('Location[0$="b"] > *', ['Redirect 302 /here /there']),
+        ('* > * > IfModule RewriteRule', ['RewriteRule ^c$ /d [L]']),
+        ('IfModule > RewriteRule[L]', []),
+        ('Directory[/srv] IfModule', []),
+        ('[/x]', ['Redirect /x /y']),
+        ('Directory[/var/www][/srv]', []),
+    ])
+    def test_select(self, selector, expected):
+        for tree in [self.tree, self.indexed_tree]:
+            actual = [str(node).strip() for node in select(tree, selector) if not getattr(node, 'complex', False)]
+            self.assertEqual(
+                first=expected,
+                second=actual,
+                msg='Expected %r to select %s, received: %s' % (selector, expected, actual),
+            )
+
+    def test_select_sections(self):
+        directories = self.tree.select('VirtualHost[*:443] > Directory')
+        self.assertEqual([directory.arguments[0] for directory in directories], ['/var/www', '/srv'])
+        self.assertEqual(self.indexed_tree.select('virtualhost'), list(self.indexed_tree.nodes[1:3]))
+
+    def test_quoted_arguments(self):
+        for index in [False, True]:
+            tree = ApacheConfParser('<Directory "/var/www">\n    Options None\n</Directory>', infile=False, index=index)
+            for selector in ['Directory[/var/www]', 'Directory["/var/www"]', 'Directory[\'"/var/www"\']',
+                             'Directory[0=/var/www] > Options', 'Directory[0^=/var]']:
+                self.assertEqual(len(tree.select(selector)), 1, selector)
+
+    def test_select_from_section(self):
+        virtual_host = self.tree.nodes[1]
+        self.assertEqual(len(select(virtual_host, 'RewriteRule')), 3)
+        self.assertEqual(len(select(virtual_host, 'VirtualHost RewriteRule')), 0)
+        self.assertEqual(len(select(virtual_host.body, 'Directory')), 2)
+
+    def test_index_and_walk_agree(self):
+        selectors = ['RewriteRule', 'Directory RewriteRule', '* > RewriteRule', 'VirtualHost * > RewriteRule[L]',
+                     'IfModule', 'VirtualHost Directory > IfModule > RewriteRule', 'Redirect[status]']
+        for text in selectors:
+            selector = Selector(text)
+            self.assertEqual(
+                first=selector.select(self.indexed_tree, use_index=False),
+                second=selector.select(self.indexed_tree),
+            )
+
+    def test_index_and_walk_agree_after_edits(self):
+        self.indexed_tree.nodes.insert(0, ApacheConfParser('RewriteRule ^z$ /y [L]', infile=False).nodes[0])
+        body = self.indexed_tree.nodes[2].body
+        directory = body.nodes[1]
+        del body.nodes[1]
+        self.indexed_tree.nodes.append(directory)
+        for text in ['RewriteRule', 'Directory', '* > RewriteRule']:
+            selector = Selector(text)
+            self.assertEqual(
+                first=selector.select(self.indexed_tree, use_index=False),
+                second=selector.select(self.indexed_tree),
+            )
+
+    def test_match(self):
+        selector = Selector('VirtualHost > Directory RewriteRule')
+        virtual_host = self.tree.nodes[1]
+        directory = virtual_host.body.nodes[1]
+        if_module = directory.body.nodes[1]
+        rule = if_module.body.nodes[0]
+        self.assertTrue(selector.match(rule, [virtual_host, directory, if_module]))
+        self.assertFalse(selector.match(rule, [directory, if_module]))
+        self.assertFalse(selector.match(if_module, [virtual_host, directory]))
+
+    def test_compile_selector_is_cached(self):
+        self.assertIs(compile_selector('Directory > RewriteRule'), compile_selector('Directory > RewriteRule'))
+
+    @parameterized.expand([
+        ('',),
+        ('> RewriteRule',),
+        ('Directory >',),
+        ('Directory[]',),
+        ('[/var/www]Directory',),
+        ('Directory[/var/www',),
+        ('Rewrite-Rule',),
+    ])
+    def test_invalid_selectors(self, text):
+        with self.assertRaises(SelectorError):
+            Selector(text)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+import os
+import shutil
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.vhosts import VirtualHostResolver, normalize_host, parse_address
+
+TEST_CONTENT = "\n".join([
+    'Listen 80',
+    'Listen 443',
+    '<VirtualHost *:80>',
+    '    ServerName default.example.com',
+    '</VirtualHost>',
+    '<VirtualHost *:80>',
+    '    ServerName www.example.com',
+    '    ServerAlias example.com *.example.com',
+    '</VirtualHost>',
+    '<VirtualHost *:80>',
+    '    ServerName api.example.com',
+    '    ServerAlias *.api.example.com',
+    '</VirtualHost>',
+    '<IfModule mod_ssl.c>',
+    '    <VirtualHost _default_:443>',
+    '        ServerName https://secure.example.com:443',
+    '        ServerAlias shop?.example.org *.shop.example.org',
+    '    </VirtualHost>',
+    '    <VirtualHost *:443>',
+    '        ServerName other.example.org',
+    '    </VirtualHost>',
+    '</IfModule>',
+    '<VirtualHost 192.0.2.10:80 [2001:db8::10]:80>',
+    '    ServerName internal.example.net',
+    '</VirtualHost>',
+    '<VirtualHost 192.0.2.10:80>',
+    '    ServerName intranet.example.net',
+    '</VirtualHost>',
+    '<VirtualHost 192.0.2.20>',
+    '</VirtualHost>',
+    'ServerName main.example.com',
+])
+
+
+class TestVirtualHostResolver(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = ApacheConfParser(TEST_CONTENT, infile=False)
+        self.resolver = VirtualHostResolver(self.tree)
+
+    def get_server_name(self, host, port=None, ip=None):
+        entry = self.resolver.resolve_entry(host, port, ip)
+        return entry.server_name if entry is not None else None
+
+    @parameterized.expand([
+        ('www.example.com', 80, 'www.example.com'),
+        ('WWW.Example.COM.', 80, 'www.example.com'),
+        ('example.com', 80, 'www.example.com'),
+        ('example.com:80', None, 'www.example.com'),
+        ('default.example.com', 80, 'default.example.com'),
+        ('unknown.example.net', 80, 'default.example.com'),
+        ('blog.example.com', 80, 'www.example.com'),
+        # *.example.com comes before *.api.example.com in the configuration
+        ('v1.api.example.com', 80, 'www.example.com'),
+        # the first virtual host with a matching name wins, even over a later exact ServerName
+        ('api.example.com', 80, 'www.example.com'),
+        ('secure.example.com', 443, 'secure.example.com'),
+        ('other.example.org:443', None, 'other.example.org'),
+        ('shop1.example.org', 443, 'secure.example.com'),
+        ('shop12.example.org', 443, 'secure.example.com'),
+        ('eu.shop.example.org', 443, 'secure.example.com'),
+        ('nothing.example.org', 443, 'secure.example.com'),
+    ])
+    def test_resolve_name_based(self, host, port, expected):
+        self.assertEqual(
+            first=expected,
+            second=self.get_server_name(host, port, '198.51.100.1'),
+            msg='Expected %s:%s to be served by %s' % (host, port, expected),
+        )
+
+    def test_resolve_returns_section(self):
+        section = self.resolver.resolve('www.example.com', ip='198.51.100.1')
+        self.assertIs(section, self.tree.nodes[3])
+        # no virtual host listens there: the main server answers
+        self.assertIsNone(self.resolver.resolve('www.example.com', 8080, '198.51.100.1'))
+
+    def test_ip_based_hosts_take_precedence(self):
+        self.assertEqual(self.get_server_name('www.example.com', 80, '192.0.2.10'), 'internal.example.net')
+        self.assertEqual(self.get_server_name('intranet.example.net', 80, '192.0.2.10'), 'intranet.example.net')
+        self.assertEqual(self.get_server_name('intranet.example.net', 80, '2001:DB8::10'), 'internal.example.net')
+        self.assertEqual(self.get_server_name('www.example.com', 80, '192.0.2.99'), 'www.example.com')
+        # listens on every port of its IP, and inherits the main server's name
+        self.assertEqual(self.get_server_name('www.example.com', 8080, '192.0.2.20'), 'main.example.com')
+        self.assertEqual(self.get_server_name('www.example.com', 443, '192.0.2.10'), 'secure.example.com')
+
+    def test_without_ip_every_host_on_the_port_is_considered(self):
+        self.assertEqual(self.get_server_name('intranet.example.net', 80), 'intranet.example.net')
+        self.assertEqual(self.get_server_name('www.example.com', 8080), 'main.example.com')
+
+    def test_rebuild(self):
+        self.tree.nodes[3].body.nodes[0] = ApacheConfParser('ServerName changed.example.net', infile=False).nodes[0]
+        self.assertEqual(self.get_server_name('changed.example.net', 80), 'default.example.com')
+        self.resolver.rebuild()
+        self.assertEqual(self.get_server_name('changed.example.net', 80), 'changed.example.net')
+
+    def test_included_virtual_hosts(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        os.makedirs(os.path.join(directory, 'sites'))
+        with open(os.path.join(directory, 'sites', 'site.conf'), 'w') as conf:
+            conf.write('<VirtualHost *:80>\n    ServerName included.example.com\n</VirtualHost>\n')
+        path = os.path.join(directory, 'httpd.conf')
+        with open(path, 'w') as conf:
+            conf.write('ServerRoot %s\nInclude sites/*.conf\n' % directory)
+        resolver = VirtualHostResolver(ApacheConfParser(path, includes=True))
+        self.assertEqual(resolver.resolve_entry('included.example.com').server_name, 'included.example.com')
+
+    @parameterized.expand([
+        ('*:80', ('*', '80')),
+        ('_default_:443', ('*', '443')),
+        ('*', ('*', '*')),
+        ('192.0.2.1', ('192.0.2.1', '*')),
+        ('[2001:DB8::1]:8443', ('2001:db8::1', '8443')),
+        ('[2001:db8::1]', ('2001:db8::1', '*')),
+    ])
+    def test_parse_address(self, address, expected):
+        self.assertEqual(parse_address(address), expected)
+
+    @parameterized.expand([
+        ('Example.COM', 'example.com'),
+        ('https://example.com:8443', 'example.com'),
+        ('example.com.', 'example.com'),
+        ('[::1]:80', '::1'),
+    ])
+    def test_normalize_host(self, host, expected):
+        self.assertEqual(normalize_host(host), expected)
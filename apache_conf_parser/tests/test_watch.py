@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.exceptions import ParserError
+from apache_conf_parser.watch import CREATED, DELETED, MODIFIED, ConfigWatcher, Inotify
+
+try:
+    Inotify().close()
+    HAS_INOTIFY = True
+except OSError:
+    HAS_INOTIFY = False
+
+
+class TestConfigWatcher(unittest.TestCase):
+    use_inotify = False
+
+    TEST_LINES = [
+        '<VirtualHost *:80>',
+        '    ServerName example.com',
+        '</VirtualHost>',
+    ]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = self.write('site.conf', self.TEST_LINES)
+        self.htaccess_path = self.write(os.path.join('www', '.htaccess'), ['RewriteEngine On'])
+        self.write('notes.txt', ['not a configuration file'])
+        self.watcher = ConfigWatcher(self.directory, interval=0.01, use_inotify=self.use_inotify)
+        self.addCleanup(self.watcher.close)
+        self.events = []
+        self.watcher.subscribe(self.events.append)
+
+    def write(self, name, lines):
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as conf:
+            conf.write("\n".join(lines) + "\n")
+        return path
+
+    def poll(self, kinds):
+        """Poll until events of the given kinds were sent, or fail."""
+        for _ in range(100):
+            self.watcher.poll(0.05)
+            if sorted(event.kind for event in self.events) == sorted(kinds):
+                return self.events
+        self.fail('Expected events %s, received: %s' % (kinds, self.events))
+
+    def test_initial_trees(self):
+        self.assertEqual(sorted(self.watcher.trees), sorted([self.path, self.htaccess_path]))
+        self.assertEqual(self.watcher.get(self.path), ApacheConfParser(self.path))
+        self.assertEqual(self.events, [])
+
+    def test_modified_file(self):
+        tree = self.watcher.get(self.path)
+        htaccess_tree = self.watcher.get(self.htaccess_path)
+        self.write('site.conf', self.TEST_LINES + ['Listen 80'])
+        event, = self.poll([MODIFIED])
+        self.assertEqual(event.path, self.path)
+        self.assertIs(event.tree, self.watcher.get(self.path))
+        self.assertIsNot(event.tree, tree)
+        self.assertEqual(event.tree.nodes[1].name, 'Listen')
+        self.assertIs(self.watcher.get(self.htaccess_path), htaccess_tree)
+
+    def test_same_content_is_not_parsed_again(self):
+        tree = self.watcher.get(self.path)
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(self.watcher.scan(), [])
+        self.watcher.poll(0.05)
+        self.assertEqual(self.events, [])
+        self.assertIs(self.watcher.get(self.path), tree)
+
+    def test_created_and_deleted_files(self):
+        created_path = self.write(os.path.join('sites', 'new', 'other.conf'), ['Listen 8080'])
+        event, = self.poll([CREATED])
+        self.assertEqual(event.path, created_path)
+        self.assertEqual(str(self.watcher.get(created_path)), 'Listen 8080')
+        del self.events[:]
+        os.unlink(self.path)
+        event, = self.poll([DELETED])
+        self.assertEqual(event.path, self.path)
+        self.assertIsNone(event.tree)
+        self.assertIsNone(self.watcher.get(self.path))
+
+    def test_deleted_directory(self):
+        shutil.rmtree(os.path.join(self.directory, 'www'))
+        event, = self.poll([DELETED])
+        self.assertEqual(event.path, self.htaccess_path)
+        self.assertEqual(list(self.watcher.trees), [self.path])
+
+    def test_renamed_directory(self):
+        moved_path = os.path.join(self.directory, 'public', '.htaccess')
+        os.rename(os.path.join(self.directory, 'www'), os.path.join(self.directory, 'public'))
+        self.poll([DELETED, CREATED])
+        self.assertEqual(sorted(self.watcher.trees), sorted([self.path, moved_path]))
+        del self.events[:]
+        self.write(os.path.join('public', '.htaccess'), ['RewriteEngine Off'])
+        event, = self.poll([MODIFIED])
+        self.assertEqual(event.path, moved_path)
+        self.assertEqual(self.watcher.get(moved_path).nodes[0].arguments, ['Off'])
+
+    def test_invalid_file_keeps_previous_tree(self):
+        tree = self.watcher.get(self.path)
+        self.write('site.conf', self.TEST_LINES[:2])
+        event, = self.poll([MODIFIED])
+        self.assertIsNone(event.tree)
+        self.assertIsInstance(event.error, ParserError)
+        self.assertIs(self.watcher.get(self.path), tree)
+        self.assertIs(self.watcher.errors[self.path], event.error)
+        del self.events[:]
+        self.write('site.conf', self.TEST_LINES)
+        event, = self.poll([MODIFIED])
+        self.assertIsNone(event.error)
+        self.assertNotIn(self.path, self.watcher.errors)
+
+    def test_unreadable_file_keeps_previous_tree(self):
+        tree = self.watcher.get(self.path)
+        real_open = open
+
+        def unreadable(path, *args, **kwargs):
+            if path == self.path:
+                raise PermissionError(13, 'Permission denied', path)
+            return real_open(path, *args, **kwargs)
+
+        with patch('apache_conf_parser.watch.open', side_effect=unreadable, create=True):
+            event, = self.watcher.update([self.path], reread=True)
+            self.assertEqual(self.watcher.update([self.path], reread=True), [])
+            self.watcher.scan()
+        self.assertEqual(event.kind, MODIFIED)
+        self.assertIsInstance(event.error, PermissionError)
+        self.assertIs(self.watcher.get(self.path), tree)
+        self.assertIs(self.watcher.errors[self.path], event.error)
+        del self.events[:]
+        event, = self.watcher.scan()
+        self.assertIsNone(event.error)
+        self.assertNotIn(self.path, self.watcher.errors)
+
+    def test_failing_subscriber(self):
+        def fail(event):
+            raise RuntimeError('subscriber failed')
+
+        received = []
+        self.watcher.unsubscribe(self.events.append)
+        self.watcher.subscribe(fail)
+        self.watcher.subscribe(received.append)
+        with self.watcher:
+            self.write('site.conf', self.TEST_LINES + ['Listen 80'])
+            for _ in range(200):
+                if received:
+                    break
+                self.watcher._stopping.wait(0.01)
+            self.assertTrue(self.watcher._thread.is_alive())
+        self.assertEqual([event.kind for event in received], [MODIFIED])
+        self.assertIsInstance(self.watcher.subscriber_errors[fail], RuntimeError)
+
+    def test_unsubscribe(self):
+        self.watcher.unsubscribe(self.events.append)
+        self.write('site.conf', self.TEST_LINES + ['Listen 80'])
+        self.assertEqual(len(self.watcher.scan()), 1)
+        self.assertEqual(self.events, [])
+
+    def test_background_thread(self):
+        received = []
+        self.watcher.subscribe(received.append)
+        with self.watcher:
+            self.write('site.conf', self.TEST_LINES + ['Listen 80'])
+            for _ in range(200):
+                if received:
+                    break
+                self.watcher._stopping.wait(0.01)
+        self.assertEqual([event.kind for event in received], [MODIFIED])
+        self.assertIsNone(self.watcher._thread)
+
+
+@unittest.skipUnless(HAS_INOTIFY, 'inotify is not available')
+class TestConfigWatcherInotify(TestConfigWatcher):
+    use_inotify = True
+
+    def test_uses_inotify(self):
+        self.assertIsNotNone(self.watcher.inotify)
+
+    def test_directory_moved_away_is_no_longer_watched(self):
+        outside = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, outside)
+        os.rename(os.path.join(self.directory, 'www'), os.path.join(outside, 'www'))
+        self.poll([DELETED])
+        self.assertEqual(sorted(self.watcher.inotify.directories.values()), [self.directory])
+        del self.events[:]
+        with open(os.path.join(outside, 'www', 'site.conf'), 'w') as conf:
+            conf.write('Listen 80\n')
+        self.assertEqual(self.watcher.poll(0.05), [])
+        self.assertEqual(list(self.watcher.trees), [self.path])
+
+    def test_same_size_and_mtime_different_content(self):
+        stat = os.stat(self.path)
+        self.write('site.conf', [line.replace('example.com', 'example.org') for line in self.TEST_LINES])
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        event, = self.poll([MODIFIED])
+        self.assertEqual(event.tree.nodes[0].body.nodes[0].arguments, ['example.org'])
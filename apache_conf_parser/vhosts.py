@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+from fnmatch import fnmatchcase
+
+from apache_conf_parser.includes import flatten
+
+WILDCARD_CHARS = frozenset("*?")
+
+# the address of a virtual host listening on every IP, and the port of one listening on every port
+ANY = '*'
+
+
+def parse_address(address):
+    """Split a <VirtualHost> address into (ip, port); _default_ and * stand for any IP, a missing port for any port."""
+    address = address.strip("\"'")
+    if address.startswith('['):
+        ip, _, rest = address[1:].partition(']')
+        port = rest[1:] if rest.startswith(':') else ANY
+    elif address.count(':') == 1:
+        ip, port = address.split(':')
+    else:
+        ip, port = address, ANY
+    if ip == '_default_':
+        ip = ANY
+    return ip.lower(), port or ANY
+
+
+def normalize_host(host):
+    """Return the case-folded host name of a ServerName, ServerAlias or request Host, without scheme or port."""
+    host = host.strip("\"'").lower()
+    if '://' in host:
+        host = host.split('://', 1)[1]
+    if host.startswith('['):
+        return host[1:].split(']', 1)[0]
+    if host.count(':') == 1:
+        host = host.split(':', 1)[0]
+    return host.rstrip('.')
+
+
+class VirtualHostEntry(object):
+    """A <VirtualHost> section with its position in the configuration, addresses and names."""
+    __slots__ = ('section', 'order', 'addresses', 'server_name', 'aliases')
+
+    def __init__(self, section, order, addresses, server_name, aliases):
+        self.section = section
+        self.order = order
+        self.addresses = addresses
+        self.server_name = server_name
+        self.aliases = aliases
+
+    def __repr__(self):
+        return "<VirtualHostEntry %s %s>" % (" ".join("%s:%s" % address for address in self.addresses),
+                                             self.server_name)
+
+
+class LabelTrie(object):
+    """
+    Trie of host names by reversed labels, holding *.suffix aliases at their suffix: looking a host up visits one
+    node per label.
+
+    """
+    __slots__ = ('children', 'entry')
+
+    def __init__(self):
+        self.children = {}
+        # the first virtual host with a *.suffix alias for the suffix leading to this node
+        self.entry = None
+
+    def add(self, suffix, entry):
+        node = self
+        for label in reversed(suffix.split('.')):
+            child = node.children.get(label)
+            if child is None:
+                child = node.children[label] = LabelTrie()
+            node = child
+        if node.entry is None or entry.order < node.entry.order:
+            node.entry = entry
+
+    def find(self, labels):
+        """Return the first virtual host with a wildcard alias matching the host split into labels, or None."""
+        best = None
+        node = self
+        # a *.suffix alias matches when at least one label is left in front of the suffix
+        for position in range(len(labels) - 1, 0, -1):
+            node = node.children.get(labels[position])
+            if node is None:
+                break
+            if node.entry is not None and (best is None or node.entry.order < best.order):
+                best = node.entry
+        return best
+
+
+class NameTable(object):
+    """
+    The name-based virtual hosts sharing an address, in configuration order, indexed by ServerName and ServerAlias:
+    a hash map of exact names, a LabelTrie of *.suffix aliases and, for other wildcard aliases, a list checked in
+    order.
+
+    """
+    def __init__(self, entries):
+        self.entries = entries
+        self.names = {}
+        self.trie = LabelTrie()
+        self.patterns = []
+        for entry in entries:
+            for name in [entry.server_name] + entry.aliases:
+                if name is None:
+                    continue
+                if WILDCARD_CHARS.isdisjoint(name):
+                    self.names.setdefault(name, entry)
+                elif name.startswith('*.') and WILDCARD_CHARS.isdisjoint(name[2:]):
+                    self.trie.add(name[2:], entry)
+                else:
+                    self.patterns.append((entry.order, name, entry))
+
+    def find(self, host):
+        """Return the virtual host serving host: the first one with a matching name, else the first one."""
+        best = self.names.get(host)
+        wildcard = self.trie.find(host.split('.'))
+        if wildcard is not None and (best is None or wildcard.order < best.order):
+            best = wildcard
+        for order, pattern, entry in self.patterns:
+            if best is not None and order >= best.order:
+                break
+            if fnmatchcase(host, pattern):
+                best = entry
+                break
+        return best if best is not None else self.entries[0]
+
+
+class VirtualHostResolver(object):
+    """
+    Find the <VirtualHost> section Apache would serve a request with, following its name-based virtual host
+    selection.
+
+    The virtual hosts listening on the request's IP and port are considered; virtual hosts for that IP take
+    precedence over those for any IP (* or _default_). Among them, the first one (in configuration order) whose
+    ServerName or ServerAlias matches the requested host serves the request, or else the first one, the default for
+    that address. Without an IP, every virtual host listening on the port is considered.
+
+    Virtual hosts are read once, including those in sections such as <IfModule> and in resolved includes (see
+    IncludeResolver), and a NameTable is built the first time each address is looked up, so lookups hash the host
+    name and walk one trie node per label. Call rebuild after changing the configuration.
+
+    """
+    def __init__(self, tree):
+        self.tree = tree
+        self.rebuild()
+
+    def rebuild(self):
+        self.server_name = None
+        self.entries = []
+        self._tables = {}
+        # the main server's ServerName can come after the virtual hosts
+        sections = list(self.iter_virtual_hosts(self.tree.nodes))
+        self.entries = [self.read_entry(section, order) for order, section in enumerate(sections)]
+
+    def iter_virtual_hosts(self, nodes):
+        for node in flatten(nodes):
+            name = node.name.lower() if node.name is not None else None
+            if name == 'virtualhost':
+                yield node
+            elif getattr(type(node), 'complex', False):
+                for section in self.iter_virtual_hosts(node.body.nodes):
+                    yield section
+            elif name == 'servername' and self.server_name is None and node.arguments:
+                # virtual hosts without a ServerName inherit the main server's
+                self.server_name = normalize_host(node.arguments[0])
+
+    def read_entry(self, section, order):
+        server_name = None
+        aliases = []
+        stack = [flatten(section.body.nodes)]
+        while stack:
+            for node in stack[-1]:
+                name = node.name.lower() if node.name is not None else None
+                if name == 'servername' and server_name is None and node.arguments:
+                    server_name = normalize_host(node.arguments[0])
+                elif name == 'serveralias':
+                    aliases += [normalize_host(alias) for alias in node.arguments]
+                elif getattr(type(node), 'complex', False):
+                    stack.append(flatten(node.body.nodes))
+                    break
+            else:
+                stack.pop()
+        addresses = [parse_address(address) for address in section.arguments]
+        return VirtualHostEntry(section, order, addresses, server_name or self.server_name, aliases)
+
+    def get_table(self, ip, port):
+        """Return the NameTable of the virtual hosts a request to ip (None for any) and port goes to, or None."""
+        key = (ip, port)
+        if key in self._tables:
+            return self._tables[key]
+        ports = (port, ANY)
+        if ip is None:
+            entries = [e for e in self.entries if any(p in ports for _, p in e.addresses)]
+        else:
+            entries = [e for e in self.entries if any(i == ip and p in ports for i, p in e.addresses)]
+            if not entries:
+                entries = [e for e in self.entries if any(i == ANY and p in ports for i, p in e.addresses)]
+        table = self._tables[key] = NameTable(entries) if entries else None
+        return table
+
+    def resolve_entry(self, host, port=None, ip=None):
+        """Return the VirtualHostEntry serving a request, or None when the main server would; see resolve."""
+        if port is None:
+            host, _, port = host.rpartition(':') if host.count(':') == 1 else (host, None, '80')
+        table = self.get_table(ip.lower() if ip is not None else None, str(port))
+        if table is None:
+            return None
+        return table.find(normalize_host(host))
+
+    def resolve(self, host, port=None, ip=None):
+        """
+        Return the <VirtualHost> section serving a request for host (which can include the port, as in a Host
+        header), on port (default 80) and ip, or None when no virtual host listens there and the main server would.
+
+        """
+        entry = self.resolve_entry(host, port, ip)
+        return entry.section if entry is not None else None
@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+import ctypes
+import ctypes.util
+import fnmatch
+import hashlib
+import os
+import select
+import struct
+import threading
+
+from apache_conf_parser.cache import parse_data
+
+# The files watched by default, matched against their names.
+PATTERNS = ('*.conf', '.htaccess')
+
+# event kinds
+CREATED, MODIFIED, DELETED = 'created', 'modified', 'deleted'
+
+
+class WatchEvent(object):
+    """
+    A change to a watched file. tree is the file's new tree; it is None for a deleted file, and for a file that no
+    longer parses or can't be read, with error set to the exception raised.
+
+    """
+    __slots__ = ('kind', 'path', 'tree', 'error')
+
+    def __init__(self, kind, path, tree=None, error=None):
+        self.kind = kind
+        self.path = path
+        self.tree = tree
+        self.error = error
+
+    def __repr__(self):
+        return "<WatchEvent %s %s%s>" % (self.kind, self.path, "" if self.error is None else ": %r" % self.error)
+
+
+class Inotify(object):
+    """
+    Minimal binding of the Linux inotify API through ctypes, reporting changes to the files of watched directories.
+    Raises OSError where inotify isn't available.
+
+    """
+    IN_ATTRIB = 0x4
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_ISDIR = 0x40000000
+
+    # files are checked once written and closed rather than on every write, so half-written files are rarely parsed
+    MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    MASK |= IN_DELETE_SELF | IN_MOVE_SELF
+
+    # watch descriptor, mask, cookie and name length, followed by the name
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            init = libc.inotify_init1
+        except (OSError, AttributeError):
+            raise OSError("inotify is not available on this platform.")
+        # IN_NONBLOCK and IN_CLOEXEC have the values of their os.O_* counterparts
+        fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code))
+        self.libc = libc
+        self.fd = fd
+        self.directories = {}
+
+    def add_watch(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, os.strerror(code), directory)
+        self.directories[wd] = directory
+
+    def remove_watches(self, directory):
+        """
+        Stop watching directory and the directories below it. A watch follows its directory when it's renamed, so
+        the watches of a renamed directory would report its changes under its previous path.
+
+        """
+        prefix = directory + os.sep
+        for wd, path in list(self.directories.items()):
+            if path == directory or path.startswith(prefix):
+                del self.directories[wd]
+                # fails if the kernel already dropped the watch, e.g. for a deleted directory
+                self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self, timeout=None):
+        """
+        Wait up to timeout seconds for changes and return them as (path, mask) pairs; path is None when the kernel
+        dropped events (IN_Q_OVERFLOW).
+
+        """
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changes = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                changes.append((None, mask))
+                continue
+            directory = self.directories.get(wd)
+            if mask & self.IN_IGNORED:
+                self.directories.pop(wd, None)
+            elif directory is not None:
+                changes.append((os.path.join(directory, name) if name else directory, mask))
+        return changes
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class ConfigWatcher(object):
+    """
+    Keep the parsed trees of the configuration files under a directory in memory, up to date with the files.
+
+    Files whose names match patterns are parsed once when the watcher is created; after that, only files whose
+    size or mtime changed are read again, and only those whose content hash changed are parsed again. Changes are
+    noticed through inotify where it's available (Linux), or else by comparing every file's stat every interval
+    seconds; pass use_inotify=False to always poll. Each change is sent to the subscribers as a WatchEvent.
+
+    Call poll() to wait for and apply the next changes, or start() to do so in a background thread until stop();
+    the watcher is also a context manager doing both. trees maps the path of every file that parses to its latest
+    tree. A file that stops parsing, e.g. while it's being edited, or can't be read keeps its previous tree until
+    it parses again; errors maps its path to the exception, which is also sent in an event. An exception raised by a
+    subscriber is stored in subscriber_errors, by subscriber, and doesn't keep the other subscribers from receiving
+    the event; in the background thread, any other error is stored in errors under the directory's path and
+    watching goes on.
+
+    """
+    def __init__(self, directory, patterns=PATTERNS, interval=1.0, use_inotify=None):
+        self.directory = os.path.abspath(directory)
+        self.patterns = patterns
+        self.interval = interval
+        self.trees = {}
+        self.errors = {}
+        self.subscriber_errors = {}
+        self._states = {}
+        self._subscribers = []
+        self._lock = threading.RLock()
+        self._thread = None
+        self._stopping = threading.Event()
+        self.inotify = None
+        if use_inotify is not False:
+            try:
+                self.inotify = Inotify()
+            except OSError:
+                if use_inotify:
+                    raise
+        self.scan()
+
+    def matches(self, path):
+        name = os.path.basename(path)
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.patterns)
+
+    def subscribe(self, callback):
+        """Call callback with every WatchEvent, from the thread applying the changes."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers.remove(callback)
+
+    def get(self, path):
+        """Return the latest tree of a watched file, or None."""
+        return self.trees.get(os.path.abspath(path))
+
+    def find_files(self, directory):
+        """Return the watched files under directory, adding inotify watches for its directories."""
+        paths = []
+        for root, _, names in os.walk(directory):
+            if self.inotify is not None:
+                try:
+                    self.inotify.add_watch(root)
+                except OSError:
+                    # removed meanwhile
+                    continue
+            paths += [os.path.join(root, name) for name in names if self.matches(name)]
+        return paths
+
+    def scan(self):
+        """Check every file under the directory now, and return the events sent."""
+        with self._lock:
+            paths = set(self.find_files(self.directory)) | set(self._states)
+        return self.update(paths)
+
+    def update(self, paths, reread=False):
+        """
+        Check the given files, re-parsing those that changed, and return the events sent. With reread=True, files
+        are hashed again even when their size and mtime didn't change.
+
+        """
+        events = []
+        with self._lock:
+            for path in sorted(paths):
+                event = self.check(path, reread)
+                if event is not None:
+                    events.append(event)
+            subscribers = list(self._subscribers)
+        for event in events:
+            for callback in subscribers:
+                try:
+                    callback(event)
+                except Exception as e:
+                    self.subscriber_errors[callback] = e
+        return events
+
+    def check(self, path, reread=False):
+        previous = self._states.get(path)
+        try:
+            with open(path, 'rb') as conf:
+                stat = os.fstat(conf.fileno())
+                if not reread and previous is not None and previous[:2] == (stat.st_size, stat.st_mtime_ns):
+                    return None
+                data = conf.read()
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            if previous is None:
+                return None
+            del self._states[path]
+            self.trees.pop(path, None)
+            self.errors.pop(path, None)
+            return WatchEvent(DELETED, path)
+        except OSError as e:
+            # e.g. a file that can't be read: it keeps its tree, and is read and parsed again once it can be read
+            self._states[path] = (None, None, None)
+            error = self.errors.get(path)
+            if isinstance(error, OSError) and error.errno == e.errno:
+                # already reported
+                return None
+            self.errors[path] = e
+            return WatchEvent(CREATED if previous is None else MODIFIED, path, error=e)
+        digest = hashlib.blake2b(data).digest()
+        self._states[path] = (stat.st_size, stat.st_mtime_ns, digest)
+        if previous is not None and previous[2] == digest:
+            return None
+        kind = CREATED if previous is None else MODIFIED
+        try:
+            tree = parse_data(data)
+        except Exception as e:
+            self.errors[path] = e
+            return WatchEvent(kind, path, error=e)
+        self.trees[path] = tree
+        self.errors.pop(path, None)
+        return WatchEvent(kind, path, tree)
+
+    def poll(self, timeout=None):
+        """
+        Wait up to timeout seconds (by default interval) for changes, apply them and return the events sent. Without
+        inotify, every file is checked once the time is up.
+
+        """
+        timeout = self.interval if timeout is None else timeout
+        if self.inotify is None:
+            if self._stopping.wait(timeout):
+                return []
+            return self.scan()
+        paths = set()
+        for path, mask in self.inotify.read(timeout):
+            if path is None:
+                # missed events: check everything
+                return self.scan()
+            if mask & (Inotify.IN_DELETE_SELF | Inotify.IN_MOVE_SELF):
+                # a watched directory went away or was renamed: watch what's under the directory again
+                self.inotify.remove_watches(path)
+                return self.scan()
+            if mask & Inotify.IN_ISDIR:
+                # a directory moved away or deleted, or one (with its files) moved in or created
+                if mask & Inotify.IN_MOVED_FROM:
+                    self.inotify.remove_watches(path)
+                prefix = path + os.sep
+                with self._lock:
+                    paths.update(p for p in self._states if p.startswith(prefix))
+                if mask & (Inotify.IN_CREATE | Inotify.IN_MOVED_TO):
+                    paths.update(self.find_files(path))
+            elif self.matches(path):
+                paths.add(path)
+        # inotify reported these files as changed, even if a write kept their size and mtime
+        return self.update(paths, reread=True) if paths else []
+
+    def start(self):
+        """Apply changes in a background thread until stop() is called."""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self.run, name='ConfigWatcher %s' % self.directory, daemon=True)
+        self._thread.start()
+
+    def run(self):
+        while not self._stopping.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                # e.g. the directory can't be read any more: try again after interval
+                self.errors[self.directory] = e
+                self._stopping.wait(self.interval)
+            else:
+                self.errors.pop(self.directory, None)
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def close(self):
+        self.stop()
+        if self.inotify is not None:
+            self.inotify.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Latency of other coroutines while many configuration files are parsed: parsing them in the event loop, compared to
+aparse_many with the default thread executor and with a process pool.
+
+    python benchmarks/bench_aio.py [files]
+
+"""
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.aio import aparse_many
+
+
+def write_files(directory, count):
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, 'site%d.conf' % i)
+        with open(path, 'w') as conf:
+            for j in range(25):
+                conf.write('<VirtualHost *:80>\n    ServerName site%d-%d.example.com\n' % (i, j))
+                conf.write('    RewriteRule ^old/(.*)$ /new/$1 [L,R=301]\n</VirtualHost>\n')
+        paths.append(path)
+    return paths
+
+
+async def measure(bulk_parse):
+    """Run bulk_parse while a ticker sleeps 1 ms at a time; return the total time and the ticker's lags."""
+    lags = []
+    done = False
+
+    async def ticker():
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await bulk_parse()
+    elapsed = time.perf_counter() - start
+    done = True
+    await task
+    return elapsed, sorted(lags)
+
+
+def main(count):
+    directory = tempfile.mkdtemp()
+    try:
+        paths = write_files(directory, count)
+
+        async def in_loop():
+            for path in paths:
+                ApacheConfParser(path)
+
+        async def with_threads():
+            async for _ in aparse_many(paths):
+                pass
+
+        async def with_processes():
+            with ProcessPoolExecutor() as executor:
+                async for _ in aparse_many(paths, executor=executor):
+                    pass
+
+        print("%d files, %d lines" % (count, count * 100))
+        print("%-16s %10s %14s %14s" % ("", "total (s)", "p99 lag (ms)", "max lag (ms)"))
+        for name, bulk_parse in [("in the loop", in_loop), ("aparse_many", with_threads),
+                                 ("process pool", with_processes)]:
+            elapsed, lags = asyncio.run(measure(bulk_parse))
+            p99 = lags[int(len(lags) * 0.99)] if lags else elapsed
+            print("%-16s %10.2f %14.2f %14.2f" % (name, elapsed, p99 * 1000, (lags[-1] if lags else elapsed) * 1000))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Time taken to rebuild a parsed configuration by parsing its text, unpickling it and loading its binary form.
+
+    python benchmarks/bench_binary.py [virtual hosts]
+
+"""
+import pickle
+import sys
+import time
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.binary import dump_binary, load_binary
+
+
+def make_config(size):
+    lines = []
+    for i in range(size):
+        lines += [
+            '# site %d' % i,
+            '<VirtualHost *:80>',
+            '    ServerName site%d.example.com' % i,
+            '    DocumentRoot /var/www/site%d' % i,
+            '    Redirect 301 /old/%d /new/%d' % (i, i),
+            '    RewriteRule ^blog/(.*)$ /posts/$1 [L,R=301]',
+            '    Options -Indexes +FollowSymLinks',
+            '</VirtualHost>',
+            '',
+        ]
+    return "\n".join(lines)
+
+
+def timed(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(size):
+    text = make_config(size)
+    tree = ApacheConfParser(text, infile=False)
+    pickled = pickle.dumps(tree, pickle.HIGHEST_PROTOCOL)
+    binary = dump_binary(tree)
+    print("%d lines" % (size * 9))
+    print("%-8s %10s %10s %10s" % ("", "size (KiB)", "dump (ms)", "load (ms)"))
+    print("%-8s %10.0f %10s %10.1f" % ("text", len(text) / 1024.0, "", timed(lambda: ApacheConfParser(text, infile=False)) * 1000))
+    print("%-8s %10.0f %10.1f %10.1f" % (
+        "pickle", len(pickled) / 1024.0, timed(lambda: pickle.dumps(tree, pickle.HIGHEST_PROTOCOL)) * 1000,
+        timed(lambda: pickle.loads(pickled)) * 1000))
+    print("%-8s %10.0f %10.1f %10.1f" % (
+        "binary", len(binary) / 1024.0, timed(lambda: dump_binary(tree)) * 1000, timed(lambda: load_binary(binary)) * 1000))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Time taken to parse an unchanged configuration file directly versus loading it from a warm ParseCache.
+
+    python benchmarks/bench_cache.py [virtual hosts]
+
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.cache import ParseCache
+
+
+def make_config(size):
+    lines = []
+    for i in range(size):
+        lines += [
+            '# site %d' % i,
+            '<VirtualHost *:80>',
+            '    ServerName site%d.example.com' % i,
+            '    DocumentRoot /var/www/site%d' % i,
+            '    Redirect 301 /old/%d /new/%d' % (i, i),
+            '    RewriteRule ^blog/(.*)$ /posts/$1 [L,R=301]',
+            '    Options -Indexes +FollowSymLinks',
+            '</VirtualHost>',
+            '',
+        ]
+    return lines
+
+
+def timed(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(size):
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'sites.conf')
+        with open(path, 'w') as conf:
+            conf.write("\n".join(make_config(size)))
+        cache = ParseCache(os.path.join(directory, 'cache'))
+        cache.parse(path)
+        parse = timed(lambda: ApacheConfParser(path))
+        cached = timed(lambda: cache.parse(path))
+        print("%d lines, %.0f KiB cache entry" % (size * 9, os.path.getsize(cache.get_entry_path(path)) / 1024.0))
+        print("parse        %8.1f ms" % (parse * 1000))
+        print("cache hit    %8.1f ms" % (cached * 1000))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+"""
+Time taken to parse many small section-heavy configurations, such as a tree of .htaccess files.
+
+    python benchmarks/bench_candidates.py [files]
+
+"""
+import sys
+import time
+
+from apache_conf_parser import ApacheConfParser
+
+HTACCESS = "\n".join([
+    '<IfModule mod_rewrite.c>',
+    '    RewriteEngine On',
+    '    RewriteRule ^index\\.php$ - [L]',
+    '</IfModule>',
+    '<Files .htpasswd>',
+    '    Require all denied',
+    '</Files>',
+    '<FilesMatch "\\.(jpg|png)$">',
+    '    Header set Cache-Control "max-age=3600"',
+    '</FilesMatch>',
+])
+
+
+def main(files):
+    start = time.perf_counter()
+    for _ in range(files):
+        ApacheConfParser(HTACCESS, infile=False)
+    elapsed = time.perf_counter() - start
+    print("%d files: %.2f s, %.0f us per file" % (files, elapsed, elapsed * 1e6 / files))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Memory held by a parsed configuration as regular nodes versus a columnar tree, and the time taken to find every
+directive with a given name.
+
+    python benchmarks/bench_columnar.py [virtual hosts]
+
+"""
+import gc
+import sys
+import time
+import tracemalloc
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.columnar import parse_columnar
+
+
+def make_config(size):
+    lines = []
+    for i in range(size):
+        lines += [
+            '# site %d' % i,
+            '<VirtualHost *:80>',
+            '    ServerName site%d.example.com' % i,
+            '    DocumentRoot /var/www/site%d' % i,
+            '    Redirect 301 /old/%d /new/%d' % (i, i),
+            '    RewriteRule ^blog/(.*)$ /posts/$1 [L,R=301]',
+            '    Options -Indexes +FollowSymLinks',
+            '</VirtualHost>',
+            '',
+        ]
+    return lines
+
+
+def retained(func):
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def walk(nodes, name):
+    found = []
+    for node in nodes:
+        if node.name is not None and node.name.lower() == name:
+            found.append(node)
+        if getattr(type(node), 'complex', False):
+            found += walk(node.body.nodes, name)
+    return found
+
+
+def timed(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(size):
+    lines = make_config(size)
+    tree, tree_size = retained(lambda: ApacheConfParser("\n".join(lines), infile=False))
+    columnar, columnar_size = retained(lambda: parse_columnar(lines))
+    print("%d lines, %d directives" % (len(lines), size * 6))
+    print("%-9s %12s %14s %14s" % ("", "held (KiB)", "per directive", "find (ms)"))
+    for label, held, find in (
+            ("nodes", tree_size, lambda: walk(tree.nodes, 'servername')),
+            ("columnar", columnar_size, lambda: columnar.find('ServerName'))):
+        print("%-9s %12.0f %12.0f B %14.2f" % (label, held / 1024.0, held / (size * 6.0), timed(find) * 1000))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
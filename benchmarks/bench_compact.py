@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Memory held by a parsed configuration as regular nodes versus compact nodes.
+
+    python benchmarks/bench_compact.py [virtual hosts]
+
+"""
+import gc
+import sys
+import tracemalloc
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.compact import parse_compact
+
+
+def make_config(size):
+    lines = []
+    for i in range(size):
+        lines += [
+            '# site %d' % i,
+            '<VirtualHost *:80>',
+            '    ServerName site%d.example.com' % i,
+            '    DocumentRoot /var/www/site%d' % i,
+            '    Redirect 301 /old/%d /new/%d' % (i, i),
+            '    RewriteRule ^blog/(.*)$ /posts/$1 [L,R=301]',
+            '    Options -Indexes +FollowSymLinks',
+            '</VirtualHost>',
+            '',
+        ]
+    return lines
+
+
+def retained(func):
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main(size):
+    lines = make_config(size)
+    tree, tree_size = retained(lambda: ApacheConfParser("\n".join(lines), infile=False))
+    del tree
+    compact_tree, compact_size = retained(lambda: parse_compact(lines))
+    del compact_tree
+    print("%d lines, %d directives" % (len(lines), size * 6))
+    print("%-8s %12s %14s" % ("", "held (KiB)", "per directive"))
+    for label, held in (("nodes", tree_size), ("compact", compact_size)):
+        print("%-8s %12.0f %12.0f B" % (label, held / 1024.0, held / (size * 6.0)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Time and peak memory of scanning a configuration with the event parser versus building an ApacheConfParser tree.
+
+    python benchmarks/bench_events.py [virtual hosts]
+
+"""
+import sys
+import time
+import tracemalloc
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.events import EventHandler, parse_events
+
+
+class CountingHandler(EventHandler):
+    def __init__(self):
+        self.directives = 0
+
+    def directive(self, name, args, lineno):
+        self.directives += 1
+
+
+def make_config(size):
+    lines = []
+    for i in range(size):
+        lines += [
+            '# site %d' % i,
+            '<VirtualHost *:80>',
+            '    ServerName site%d.example.com' % i,
+            '    DocumentRoot /var/www/site%d' % i,
+            '    <Directory /var/www/site%d>' % i,
+            '        Options -Indexes',
+            '        RewriteEngine On',
+            '        RewriteRule ^old/(.*)$ /new/$1 [L,R=301]',
+            '    </Directory>',
+            '</VirtualHost>',
+            '',
+        ]
+    return lines
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(size):
+    lines = make_config(size)
+    tree_time, tree_peak = measure(lambda: ApacheConfParser("\n".join(lines), infile=False))
+    event_time, event_peak = measure(lambda: parse_events(lines, CountingHandler()))
+    print("%d lines" % len(lines))
+    print("%-8s %10s %12s" % ("", "time (s)", "peak (KiB)"))
+    print("%-8s %10.3f %12.0f" % ("tree", tree_time, tree_peak / 1024.0))
+    print("%-8s %10.3f %12.0f" % ("events", event_time, event_peak / 1024.0))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
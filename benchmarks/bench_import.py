@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""
+Cold-start cost: time taken by a new interpreter to import the package, and to import it and parse a small
+.htaccess file, against the import-time budget. Exits with status 1 when the import is over budget.
+
+    python benchmarks/bench_import.py [runs]
+
+"""
+import os
+import subprocess
+import sys
+import time
+
+# Budget for `import apache_conf_parser` on top of the bare interpreter start-up, in milliseconds, with the bytecode
+# already compiled (run it once first, and not with PYTHONDONTWRITEBYTECODE set).
+IMPORT_BUDGET_MS = 10.0
+
+PARSE = (
+    "from apache_conf_parser import ApacheConfParser\n"
+    "ApacheConfParser('RewriteEngine On\\nRewriteRule ^index\\\\.php$ - [L]\\nRedirect 301 /a /b', infile=False)"
+)
+
+
+def best_run(code, runs):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, '-c', code], env=os.environ)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def main(runs):
+    baseline = best_run('pass', runs)
+    imported = best_run('import apache_conf_parser', runs) - baseline
+    parsed = best_run(PARSE, runs) - baseline
+    print("interpreter start-up  %6.1f ms" % baseline)
+    print("import                %6.1f ms (budget %.1f ms)" % (imported, IMPORT_BUDGET_MS))
+    print("import and parse      %6.1f ms" % parsed)
+    return 0 if imported <= IMPORT_BUDGET_MS else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
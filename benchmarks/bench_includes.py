@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Resolving the includes of a configuration made of many site files sharing snippets: parsing every included file
+once with IncludeResolver, versus parsing it again for every Include that pulls it in.
+
+    python benchmarks/bench_includes.py [sites] [snippets] [workers]
+
+workers defaults to 1, parsing in-process as IncludeResolver does by default; 0 uses a process per CPU.
+
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.includes import IncludeResolver, iter_includes
+
+SNIPPETS_PER_SITE = 5
+
+
+def write(path, lines):
+    with open(path, 'w') as conf:
+        conf.write("\n".join(lines))
+
+
+def make_config(root, sites, snippets):
+    os.makedirs(os.path.join(root, 'sites'))
+    os.makedirs(os.path.join(root, 'snippets'))
+    for i in range(snippets):
+        write(os.path.join(root, 'snippets', '%d.conf' % i), [
+            '<IfModule mod_headers.c>',
+            '    Header set X-Snippet %d' % i,
+            '</IfModule>',
+            'RewriteRule ^snippet%d/(.*)$ /s/$1 [L]' % i,
+        ] * 5)
+    for i in range(sites):
+        write(os.path.join(root, 'sites', '%05d.conf' % i), [
+            '<VirtualHost *:80>',
+            '    ServerName site%d.example.com' % i,
+            '    DocumentRoot /var/www/site%d' % i,
+        ] + ['    Include snippets/%d.conf' % ((i + j) % snippets) for j in range(SNIPPETS_PER_SITE)] + [
+            '</VirtualHost>',
+        ])
+    main = os.path.join(root, 'httpd.conf')
+    write(main, ['ServerRoot "%s"' % root, 'Listen 80', 'Include sites/*.conf'])
+    return main
+
+
+def parse_every_include(path, root):
+    tree = ApacheConfParser(path)
+    for directive in iter_includes(tree.nodes):
+        for included_path in IncludeResolver.find_files(os.path.join(root, directive.file_path), directive.optional):
+            parse_every_include(included_path, root)
+    return tree
+
+
+def main(sites, snippets, workers):
+    root = tempfile.mkdtemp()
+    try:
+        main_path = make_config(root, sites, snippets)
+        start = time.perf_counter()
+        parse_every_include(main_path, root)
+        naive = time.perf_counter() - start
+        start = time.perf_counter()
+        resolver = IncludeResolver(workers=workers or None)
+        ApacheConfParser(main_path, includes=resolver)
+        resolved = time.perf_counter() - start
+        print("%d sites, %d shared snippets, %d includes" % (sites, snippets, sites * (SNIPPETS_PER_SITE + 1)))
+        print("parse per include   %6.2f s" % naive)
+        print("IncludeResolver     %6.2f s (%d files parsed, %s workers)" % (
+            resolved, len(resolver.trees), workers or os.cpu_count()))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [1000, 200, 1][len(args):]))
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Time taken to apply a one-line edit to a parsed configuration with apply_edit, compared to parsing it again.
+
+    python benchmarks/bench_incremental.py [virtual hosts]
+
+"""
+import sys
+import time
+
+from apache_conf_parser import ApacheConfParser
+
+
+def make_lines(size):
+    lines = []
+    for i in range(size):
+        lines += [
+            '# site %d' % i,
+            '<VirtualHost *:80>',
+            '    ServerName site%d.example.com' % i,
+            '    DocumentRoot /var/www/site%d' % i,
+            '    <Directory /var/www/site%d>' % i,
+            '        Options -Indexes +FollowSymLinks',
+            '        RewriteRule ^blog/(.*)$ /posts/$1 [L,R=301]',
+            '    </Directory>',
+            '    Redirect 301 /old/%d /new/%d' % (i, i),
+            '</VirtualHost>',
+        ]
+    return lines
+
+
+def parse(lines):
+    tree = ApacheConfParser("", infile=False, delay=True)
+    tree.source = list(lines)
+    tree.parse()
+    return tree
+
+
+def timed(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(size):
+    lines = make_lines(size)
+    tree = parse(lines)
+    # the Options line of the middle virtual host, inside its Directory section
+    line = (size // 2) * 10 + 5
+    edits = iter(range(1000000))
+
+    def edit():
+        tree.apply_edit(line, line + 1, ['        Options -Indexes +FollowSymLinks +Includes%d' % next(edits)])
+
+    # the first edit fills the cache of section line counts
+    edit()
+    print("%d lines" % len(lines))
+    print("full reparse:        %8.2f ms" % (timed(lambda: parse(lines)) * 1000))
+    print("apply_edit:          %8.2f ms" % (timed(edit) * 1000))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
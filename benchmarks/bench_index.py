@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Time taken to find every directive with a given name by walking the tree, compared to a NameIndex lookup, the cost
+of maintaining the index while parsing, and that of a lookup following an edit of the (flat) top-level body.
+
+    python benchmarks/bench_index.py [virtual hosts]
+
+"""
+import sys
+import time
+
+from apache_conf_parser import ApacheConfParser
+
+
+def make_config(size):
+    lines = []
+    for i in range(size):
+        lines += [
+            '<VirtualHost *:80>',
+            '    ServerName site%d.example.com' % i,
+            '    <Directory /var/www/site%d>' % i,
+            '        Options -Indexes +FollowSymLinks',
+            '        RewriteRule ^blog/(.*)$ /posts/$1 [L,R=301]' if i % 100 == 0 else '        AllowOverride None',
+            '    </Directory>',
+            '    Redirect 301 /old/%d /new/%d' % (i, i),
+            '</VirtualHost>',
+        ]
+    return "\n".join(lines)
+
+
+def walk_find(tree, name):
+    found = []
+    stack = [iter(tree.nodes)]
+    while stack:
+        for node in stack[-1]:
+            if node.name is not None and node.name.lower() == name:
+                found.append(node)
+            if getattr(type(node), 'complex', False):
+                stack.append(iter(node.body.nodes))
+                break
+        else:
+            stack.pop()
+    return found
+
+
+def timed(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(size):
+    text = make_config(size)
+    print("%d lines" % (size * 8))
+    print("parse:               %10.2f ms" % (timed(lambda: ApacheConfParser(text, infile=False)) * 1000))
+    print("parse with index:    %10.2f ms" % (timed(lambda: ApacheConfParser(text, infile=False, index=True)) * 1000))
+    tree = ApacheConfParser(text, infile=False, index=True)
+    assert len(walk_find(tree, 'rewriterule')) == len(tree.index.find('RewriteRule'))
+    print("find by walking:     %10.3f ms" % (timed(lambda: walk_find(tree, 'rewriterule')) * 1000))
+    print("find with the index: %10.3f ms" % (timed(lambda: tree.index.find('RewriteRule')) * 1000))
+    rule = ApacheConfParser('RewriteRule ^new$ /new [L]', infile=False).nodes[0]
+
+    def edit_and_find():
+        tree.nodes.insert(size // 2, rule)
+        tree.index.find('RewriteRule')
+        del tree.nodes[size // 2]
+    print("insert, find, delete:%10.3f ms" % (timed(edit_and_find, repeat=100) * 1000))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Time and peak Python heap of reading a configuration file with readlines() versus the memory-mapped MappedFile,
+excluding the parse itself.
+
+    python benchmarks/bench_input.py [lines]
+
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from apache_conf_parser.mapped_file import MappedFile
+
+
+def read_lines(path):
+    lines = [line.strip("\n") for line in open(path).readlines()]
+    for line in lines:
+        pass
+
+
+def read_mapped(path):
+    with MappedFile(path) as mapped_file:
+        for line in mapped_file:
+            pass
+
+
+def measure(func, path):
+    start = time.perf_counter()
+    func(path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(size):
+    with tempfile.NamedTemporaryFile('w', suffix='.conf', delete=False) as conf_file:
+        for i in range(size):
+            conf_file.write('    RewriteRule ^old/%d/(.*)$ /new/%d/$1 [L,R=301]\n' % (i, i))
+    try:
+        print("%d lines, %d KiB" % (size, os.path.getsize(conf_file.name) // 1024))
+        print("%-10s %10s %12s" % ("", "time (s)", "peak (KiB)"))
+        for label, func in (("readlines", read_lines), ("mapped", read_mapped)):
+            elapsed, peak = measure(func, conf_file.name)
+            print("%-10s %10.3f %12.0f" % (label, elapsed, peak / 1024.0))
+    finally:
+        os.unlink(conf_file.name)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
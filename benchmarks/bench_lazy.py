@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+"""
+Parse time with eager nodes versus lazy nodes, and the cost of then touching a fraction of the directives.
+
+    python benchmarks/bench_lazy.py [virtual hosts]
+
+"""
+import sys
+import time
+
+from apache_conf_parser import ApacheConfParser
+
+
+def make_config(size):
+    lines = []
+    for i in range(size):
+        lines += [
+            '<VirtualHost *:80>',
+            '    ServerName site%d.example.com' % i,
+            '    Redirect 301 /old/%d /new/%d' % (i, i),
+            '    RewriteRule ^blog/(.*)$ /posts/$1 [L,R=301]',
+            '    RewriteCond %{HTTPS} off',
+            '    Options -Indexes +FollowSymLinks',
+            '</VirtualHost>',
+        ]
+    return "\n".join(lines)
+
+
+def touch(parser, every):
+    for index, section in enumerate(parser.nodes):
+        if index % every == 0:
+            for node in section.body.nodes:
+                node.arguments
+
+
+def main(size):
+    source = make_config(size)
+    print("%-6s %10s %14s" % ("", "parse (s)", "+touch 5% (s)"))
+    for lazy in (False, True):
+        start = time.perf_counter()
+        parser = ApacheConfParser(source, infile=False, lazy=lazy)
+        parsed = time.perf_counter() - start
+        touch(parser, 20)
+        touched = time.perf_counter() - start
+        print("%-6s %10.3f %14.3f" % ("lazy" if lazy else "eager", parsed, touched))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+"""
+Parse time per line of directives sitting at increasing section depths (<IfModule>/<Directory>/<If> ...).
+
+    python benchmarks/bench_nesting.py [lines per section]
+
+"""
+import sys
+import time
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.nodes.complex_node import ComplexNode
+
+SECTIONS = ['IfModule mod_rewrite.c', 'VirtualHost *:80', 'Directory /var/www', 'If "%{HTTPS} == \'on\'"', 'Location /']
+
+
+def make_config(depth, size):
+    lines = []
+    for level in range(depth):
+        lines.append('    ' * level + '<%s>' % SECTIONS[level])
+    lines += ['    ' * depth + 'RewriteRule ^old/%d$ /new/%d [L]' % (i, i) for i in range(size)]
+    for level in reversed(range(depth)):
+        lines.append('    ' * level + '</%s>' % SECTIONS[level].split()[0])
+    return "\n".join(lines)
+
+
+def main(size):
+    print("%6s %10s %10s" % ("depth", "time (s)", "us/line"))
+    for depth in range(min(len(SECTIONS), ComplexNode.NESTING_LIMIT // 2) + 1):
+        source = make_config(depth, size)
+        start = time.perf_counter()
+        ApacheConfParser(source, infile=False)
+        elapsed = time.perf_counter() - start
+        print("%6d %10.3f %10.1f" % (depth, elapsed, elapsed / size * 1e6))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""
+Throughput of parse_many over many small .htaccess files, by number of worker processes and transfer form.
+
+    python benchmarks/bench_parallel.py [files]
+
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from apache_conf_parser.parallel import FORMS, parse_many
+
+
+def make_files(directory, count):
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, 'site%d.htaccess' % i)
+        with open(path, 'w') as conf:
+            conf.write("\n".join([
+                '# site %d' % i,
+                '<IfModule mod_rewrite.c>',
+                '    RewriteEngine On',
+                '    RewriteCond %{HTTPS} off',
+                '    RewriteRule ^(.*)$ https://site%d.example.com/$1 [R=301,L]' % i,
+                '</IfModule>',
+                'Redirect 301 /old /new',
+                'Options -Indexes +FollowSymLinks',
+            ] * 5))
+        paths.append(path)
+    return paths
+
+
+def main(count):
+    directory = tempfile.mkdtemp()
+    try:
+        paths = make_files(directory, count)
+        cpus = os.cpu_count() or 1
+        workers = sorted(set([1, 2, 4, cpus]))
+        print("%d files, %d CPUs" % (count, cpus))
+        print("%-9s %s" % ("form", " ".join("%9s" % ("%d proc" % n) for n in workers)))
+        for form in sorted(FORMS):
+            timings = []
+            for n in workers:
+                start = time.perf_counter()
+                for result in parse_many(paths, workers=n, chunksize=64, form=form):
+                    assert result.ok, result
+                timings.append(count / (time.perf_counter() - start))
+            print("%-9s %s" % (form, " ".join("%7.0f/s" % rate for rate in timings)))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4000)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Regexes run and time taken to replay access-log URLs through a long list of RewriteRule directives with
+RewriteSimulator, with and without the index of the literal prefixes and strings the rules require.
+
+    python benchmarks/bench_prefilter.py [rules]
+
+"""
+import random
+import sys
+import time
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.rewrite import RewriteSimulator
+
+REQUESTS = 20000
+
+
+def make_config(size):
+    lines = ['RewriteEngine On']
+    for i in range(size):
+        if i % 50 == 0:
+            lines += [
+                'RewriteCond %{QUERY_STRING} ^lang=(\\w+)$',
+                'RewriteRule ^/legacy%d/(.*)$ /new%d/$1?l=%%1 [C]' % (i, i),
+                'RewriteRule ^/new%d/(.*)$ /index.php?section=%d&page=$1 [L]' % (i, i),
+            ]
+        elif i % 7 == 0:
+            lines.append('RewriteRule \\.old%d$ /converted.html [R=301,L]' % i)
+        else:
+            lines.append('RewriteRule ^/section%d/(\\w+)/?$ /index.php?section=%d&page=$1 [L,QSA]' % (i, i))
+    lines.append('RewriteRule ^/(.*)$ /index.php?path=$1 [L,QSA]')
+    return "\n".join(lines)
+
+
+def make_urls(size):
+    rng = random.Random(size)
+    urls = []
+    for _ in range(REQUESTS):
+        i = rng.randrange(size * 2)
+        urls.append(rng.choice(['/section%d/page', '/legacy%d/a?lang=en', '/file.old%d', '/other/%d']) % i)
+    return urls
+
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(size):
+    tree = ApacheConfParser(make_config(size), infile=False)
+    urls = make_urls(size)
+
+    def replay(prefilter):
+        simulator = RewriteSimulator(tree, cache_size=0, prefilter=prefilter, full_trace=False)
+        for _ in simulator.evaluate_many(urls):
+            pass
+        return simulator
+
+    simulators = {}
+    times = {}
+    for prefilter in (False, True):
+        times[prefilter] = timed(lambda: simulators.__setitem__(prefilter, replay(prefilter)), repeat=1)
+    print("%d rules, %d requests" % (len(simulators[True].rules), REQUESTS))
+    for prefilter, label in ((False, "every rule:"), (True, "prefiltered:")):
+        simulator = simulators[prefilter]
+        print("%-13s %10.2f ms  %8.1f regexes per request, %8.1f skipped" % (
+            label, times[prefilter] * 1000, simulator.evaluations / float(REQUESTS),
+            simulator.avoided / float(REQUESTS)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
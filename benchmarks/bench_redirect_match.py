@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Time taken to find the RedirectMatch applying to URLs by running every regex in order, compared to RedirectMatcher,
+which only runs the regexes whose required literal string occurs in the URL.
+
+    python benchmarks/bench_redirect_match.py [regexes]
+
+"""
+import random
+import sys
+import time
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.redirects import RedirectMatcher
+
+LOOKUPS = 2000
+
+
+def make_config(size):
+    lines = []
+    for i in range(size):
+        if i % 4 == 0:
+            lines.append('RedirectMatch 301 ^/legacy/section%d/(.*)$ https://www.example.com/s%d/$1' % (i, i))
+        elif i % 4 == 1:
+            lines.append('RedirectMatch ^/(en|fr)/product-%d\\.html$ https://shop.example.com/$1/%d' % (i, i))
+        elif i % 4 == 2:
+            lines.append('RedirectMatch (?i)^/Campaign%d(/.*)?$ https://www.example.com/promo$1' % i)
+        else:
+            lines.append('RedirectMatch gone /archive/%d/.*\\.(pdf|doc)$' % i)
+    # a catch-all, which every lookup that matched nothing else has to run
+    lines.append('RedirectMatch ^/old/(.*)$ https://www.example.com/$1')
+    return "\n".join(lines)
+
+
+def make_urls(size):
+    rng = random.Random(size)
+    urls = []
+    for _ in range(LOOKUPS):
+        i = rng.randrange(size * 2)
+        urls.append(rng.choice([
+            '/legacy/section%d/page?x=1' % i,
+            '/fr/product-%d.html' % i,
+            '/CAMPAIGN%d/landing' % i,
+            '/archive/%d/report.pdf' % i,
+            '/current/page%d' % i,
+        ]))
+    return urls
+
+
+def sequential_find(entries, path):
+    for entry in entries:
+        if entry.regex.search(path):
+            return entry
+    return None
+
+
+def timed(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(size):
+    tree = ApacheConfParser(make_config(size), infile=False)
+    urls = make_urls(size)
+    print("%d regexes, %d lookups" % (size + 1, LOOKUPS))
+    print("build matcher:     %10.2f ms" % (timed(lambda: RedirectMatcher(tree), repeat=3) * 1000))
+    matcher = RedirectMatcher(tree)
+    paths = [url.partition('?')[0] for url in urls]
+    for path in paths:
+        assert matcher.find(path) is sequential_find(matcher.entries, path), path
+    matcher.evaluations = 0
+    for path in paths:
+        matcher.find(path)
+    sequential_evaluations = 0
+    for path in paths:
+        found = sequential_find(matcher.entries, path)
+        sequential_evaluations += found.order + 1 if found is not None else len(matcher.entries)
+    print("regexes run per lookup: %.1f sequentially, %.1f with the matcher" % (
+        sequential_evaluations / float(LOOKUPS), matcher.evaluations / float(LOOKUPS)))
+    sequential = timed(lambda: [sequential_find(matcher.entries, path) for path in paths], repeat=1)
+    matched = timed(lambda: list(matcher.resolve_many(urls)))
+    print("sequential:        %10.2f ms  (%d lookups/s)" % (sequential * 1000, LOOKUPS / sequential))
+    print("matcher:           %10.2f ms  (%d lookups/s)" % (matched * 1000, LOOKUPS / matched))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Time taken to find the Redirect applying to URLs by checking every directive's URL path in order, compared to a
+RedirectIndex lookup, and the cost of building the index.
+
+    python benchmarks/bench_redirects.py [redirects]
+
+"""
+import random
+import sys
+import time
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.redirects import RedirectIndex
+
+LOOKUPS = 1000
+
+
+def make_config(size):
+    lines = []
+    for i in range(size):
+        keyword = 'RedirectPermanent' if i % 2 else 'Redirect 302'
+        lines.append('%s /legacy/section%d/page%d http://www.example.com/new/%d' % (keyword, i % 500, i, i))
+    return "\n".join(lines)
+
+
+def make_urls(size):
+    rng = random.Random(size)
+    urls = []
+    for _ in range(LOOKUPS):
+        i = rng.randrange(size * 2)
+        urls.append('/legacy/section%d/page%d/detail?ref=%d' % (i % 500, i, i))
+    return urls
+
+
+def linear_find(entries, path):
+    for entry in entries:
+        url_path = entry.url_path
+        if path.startswith(url_path) and (len(path) == len(url_path) or path[len(url_path)] == '/' or entry.slash):
+            return entry
+    return None
+
+
+def timed(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(size):
+    tree = ApacheConfParser(make_config(size), infile=False)
+    urls = make_urls(size)
+    print("%d redirects, %d lookups" % (size, LOOKUPS))
+    print("build index:       %10.2f ms" % (timed(lambda: RedirectIndex(tree), repeat=3) * 1000))
+    index = RedirectIndex(tree)
+    paths = [url.partition('?')[0] for url in urls]
+    for path in paths:
+        assert index.find(path) is linear_find(index.entries, path), path
+    linear = timed(lambda: [linear_find(index.entries, path) for path in paths], repeat=1)
+    indexed = timed(lambda: list(index.resolve_many(urls)))
+    print("linear scan:       %10.2f ms  (%d lookups/s)" % (linear * 1000, LOOKUPS / linear))
+    print("index:             %10.2f ms  (%d lookups/s)" % (indexed * 1000, LOOKUPS / indexed))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 60000)
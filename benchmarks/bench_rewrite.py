@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Time taken to replay access-log URLs through the RewriteRule directives of a configuration with RewriteSimulator,
+with and without its cache of results for repeated requests.
+
+    python benchmarks/bench_rewrite.py [rules]
+
+"""
+import random
+import sys
+import time
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.rewrite import RewriteSimulator
+
+REQUESTS = 100000
+DISTINCT = 5000
+
+
+def make_config(size):
+    lines = [
+        'RewriteEngine On',
+        'RewriteCond %{HTTP_HOST} ^www\\.(.+)$ [NC]',
+        'RewriteRule ^/(.*)$ https://%1/$1 [R=301,L]',
+    ]
+    for i in range(size):
+        lines += [
+            'RewriteCond %{QUERY_STRING} ^id=(\\d+)$' if i % 10 == 0 else '# rule %d' % i,
+            'RewriteRule ^/section%d/(\\w+)/?$ /index.php?section=%d&page=$1 [L,QSA]' % (i, i),
+        ]
+    lines += [
+        'RewriteCond %{REQUEST_URI} !^/index\\.php',
+        'RewriteRule ^/(.*)$ /index.php?path=$1 [L,QSA]',
+    ]
+    return "\n".join(lines)
+
+
+def make_urls(size):
+    rng = random.Random(size)
+    urls = ['/section%d/page%d' % (rng.randrange(size * 2), rng.randrange(20)) + ('?id=%d' % i if i % 3 else '')
+            for i in range(DISTINCT)]
+    # a few URLs get most of the requests, as in access logs
+    weights = [1.0 / (rank + 1) for rank in range(DISTINCT)]
+    return rng.choices(urls, weights, k=REQUESTS)
+
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(size):
+    tree = ApacheConfParser(make_config(size), infile=False)
+    urls = make_urls(size)
+    print("%d rules, %d requests, %d distinct URLs" % (size + 2, REQUESTS, len(set(urls))))
+    print("compile:           %10.2f ms" % (timed(lambda: RewriteSimulator(tree)) * 1000))
+
+    def replay(cache_size):
+        simulator = RewriteSimulator(tree, cache_size=cache_size)
+        for _ in simulator.evaluate_many(urls, HTTP_HOST='example.com'):
+            pass
+
+    uncached = timed(lambda: replay(0), repeat=1)
+    cached = timed(lambda: replay(65536))
+    print("without cache:     %10.2f ms  (%d requests/s)" % (uncached * 1000, REQUESTS / uncached))
+    print("with result cache: %10.2f ms  (%d requests/s)" % (cached * 1000, REQUESTS / cached))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Time taken to run a query over many parsed trees with a compiled selector, with and without a name index, compared
+to a hand-written traversal.
+
+    python benchmarks/bench_selector.py [trees]
+
+"""
+import sys
+import time
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.selector import compile_selector
+
+SELECTOR = 'VirtualHost[*:443] > Directory RewriteRule'
+
+
+def make_config(i):
+    lines = []
+    for j in range(10):
+        lines += [
+            '<VirtualHost *:%d>' % (443 if j % 2 else 80),
+            '    ServerName site%d-%d.example.com' % (i, j),
+            '    DocumentRoot /var/www/site%d' % i,
+            '    Options -Indexes +FollowSymLinks',
+            '    <Directory /var/www/site%d>' % i,
+            '        AllowOverride None',
+            '        Require all granted',
+            '        RewriteRule ^blog/(.*)$ /posts/$1 [L,R=301]' if j % 5 == 0 else '        DirectoryIndex index.html',
+            '    </Directory>',
+            '    Redirect 301 /old/%d /new/%d' % (i, j),
+            '</VirtualHost>',
+        ]
+    return "\n".join(lines)
+
+
+def hand_written(tree):
+    found = []
+
+    def walk(nodes):
+        for node in nodes:
+            if node.name is not None and node.name.lower() == 'rewriterule':
+                found.append(node)
+            if getattr(node, 'complex', False):
+                walk(node.body.nodes)
+
+    for virtual_host in tree.nodes:
+        if getattr(virtual_host, 'complex', False) and virtual_host.name.lower() == 'virtualhost' and \
+                '*:443' in virtual_host.arguments:
+            for directory in virtual_host.body.nodes:
+                if getattr(directory, 'complex', False) and directory.name.lower() == 'directory':
+                    walk(directory.body.nodes)
+    return found
+
+
+def timed(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(count):
+    trees = [ApacheConfParser(make_config(i), infile=False) for i in range(count)]
+    indexed_trees = [ApacheConfParser(make_config(i), infile=False, index=True) for i in range(count)]
+    selector = compile_selector(SELECTOR)
+    assert [len(hand_written(t)) for t in trees] == [len(selector.select(t)) for t in trees] == \
+        [len(selector.select(t)) for t in indexed_trees]
+    print("%d trees of %d lines, %r" % (count, 110, SELECTOR))
+    print("hand-written traversal: %8.2f ms" % (timed(lambda: [hand_written(t) for t in trees]) * 1000))
+    print("selector:               %8.2f ms" % (timed(lambda: [selector.select(t) for t in trees]) * 1000))
+    print("selector with index:    %8.2f ms" % (timed(lambda: [selector.select(t) for t in indexed_trees]) * 1000))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Parse time of a <VirtualHost> holding N Redirect lines, with the incremental NodeList stability tracking ("after")
+and with the previous code path ("before"): NodeList without tracking, scanning every item on each stability check,
+and ComplexNode.add_line reading it twice per line.
+
+    python benchmarks/bench_stability.py [N ...]
+
+"""
+import sys
+import time
+from contextlib import contextmanager
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.exceptions import NodeCompleteError
+from apache_conf_parser.lists.list_adapter import ListAdapter
+from apache_conf_parser.lists.node_list import NodeList
+from apache_conf_parser.nodes.complex_node import ComplexNode
+
+DEFAULT_SIZES = [1000, 2000, 4000, 8000]
+
+
+def legacy_stable(self):
+    return all(item.stable for item in self.items)
+
+
+def legacy_add_line(self, line, depth=0):
+    # ComplexNode.add_line before the tracking
+    if self.complete:
+        raise NodeCompleteError("Can't add lines to a complete Node.")
+    if not self.nodes.stable:
+        node = self.nodes[-1]
+        if hasattr(node, 'complex'):
+            node.add_line(line, depth=depth + 1)
+        else:
+            node.add_line(line)
+    else:
+        new_node = self.get_node(line)
+        new_node.add_line(line)
+        self.nodes.append(new_node)
+    if not self.nodes.stable:
+        self.complete = False
+
+
+LEGACY = [
+    (NodeList, {
+        'stable': property(legacy_stable),
+        '__setitem__': ListAdapter.__setitem__,
+        '__delitem__': ListAdapter.__delitem__,
+        'insert': ListAdapter.insert,
+    }),
+    (ComplexNode, {'add_line': legacy_add_line}),
+]
+
+
+@contextmanager
+def legacy_code():
+    saved = [(cls, dict((name, cls.__dict__[name]) for name in attributes)) for cls, attributes in LEGACY]
+    for cls, attributes in LEGACY:
+        for name, value in attributes.items():
+            setattr(cls, name, value)
+    try:
+        yield
+    finally:
+        for cls, attributes in saved:
+            for name, value in attributes.items():
+                setattr(cls, name, value)
+
+
+def make_config(size):
+    lines = ['<VirtualHost *:80>']
+    lines += ['    Redirect 301 /old/%d /new/%d' % (i, i) for i in range(size)]
+    lines.append('</VirtualHost>')
+    return "\n".join(lines)
+
+
+def time_parse(source):
+    start = time.perf_counter()
+    tree = ApacheConfParser(source, infile=False)
+    elapsed = time.perf_counter() - start
+    assert str(tree) == source
+    return elapsed
+
+
+def main(sizes):
+    print("%8s %12s %12s %14s %14s" % ("lines", "before (s)", "after (s)", "before us/line", "after us/line"))
+    for size in sizes:
+        source = make_config(size)
+        with legacy_code():
+            before = time_parse(source)
+        after = time_parse(source)
+        print("%8d %12.3f %12.3f %14.1f %14.1f" % (
+            size, before, after, before / size * 1e6, after / size * 1e6))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Time taken to resolve request hosts to virtual hosts with VirtualHostResolver, compared to checking every virtual
+host's names in order, and the cost of building the resolver.
+
+    python benchmarks/bench_vhosts.py [virtual hosts]
+
+"""
+import random
+import sys
+import time
+from fnmatch import fnmatchcase
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.vhosts import VirtualHostResolver
+
+LOOKUPS = 10000
+
+
+def make_config(size):
+    lines = []
+    for i in range(size):
+        lines += [
+            '<VirtualHost *:%d>' % (443 if i % 4 == 0 else 80),
+            '    ServerName site%d.example.com' % i,
+            '    ServerAlias www.site%d.example.com *.site%d.example.org' % (i, i),
+            '    DocumentRoot /var/www/site%d' % i,
+            '</VirtualHost>',
+        ]
+    return "\n".join(lines)
+
+
+def make_hosts(size):
+    rng = random.Random(size)
+    hosts = []
+    for _ in range(LOOKUPS):
+        i = rng.randrange(size)
+        port = 443 if i % 4 == 0 else 80
+        hosts.append((rng.choice(['site%d.example.com', 'www.site%d.example.com', 'a.b.site%d.example.org',
+                                  'unknown%d.example.net']) % i, port))
+    return hosts
+
+
+def linear_resolve(resolver, host, port):
+    """Try every virtual host's names in order, as a straightforward lookup would."""
+    port = str(port)
+    default = None
+    for entry in resolver.entries:
+        if not any(p in (port, '*') for _, p in entry.addresses):
+            continue
+        if default is None:
+            default = entry
+        for name in [entry.server_name] + entry.aliases:
+            if name is not None and fnmatchcase(host, name):
+                return entry
+    return default
+
+
+def timed(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(size):
+    tree = ApacheConfParser(make_config(size), infile=False)
+    hosts = make_hosts(size)
+    print("%d virtual hosts, %d lookups" % (size, LOOKUPS))
+    print("build resolver:    %10.2f ms" % (timed(lambda: VirtualHostResolver(tree)) * 1000))
+    resolver = VirtualHostResolver(tree)
+    for host, port in hosts[:200]:
+        assert resolver.resolve_entry(host, port) is linear_resolve(resolver, host, port), host
+
+    def resolve_all():
+        for host, port in hosts:
+            resolver.resolve_entry(host, port)
+
+    def linear_all():
+        for host, port in hosts[:LOOKUPS // 100]:
+            linear_resolve(resolver, host, port)
+
+    resolved = timed(resolve_all)
+    linear = timed(linear_all, repeat=3) * 100
+    print("linear scan:       %10.2f ms  (%d lookups/s)" % (linear * 1000, LOOKUPS / linear))
+    print("resolver:          %10.2f ms  (%d lookups/s)" % (resolved * 1000, LOOKUPS / resolved))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
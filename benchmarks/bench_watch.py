@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+"""
+Time taken to answer a query over a directory of configuration files by parsing them all again, compared to a
+ConfigWatcher keeping their trees warm, and to apply a change to one file, with inotify and by polling.
+
+    python benchmarks/bench_watch.py [files]
+
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from apache_conf_parser import ApacheConfParser
+from apache_conf_parser.watch import ConfigWatcher
+
+
+def write_files(directory, count):
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, 'site%d' % (i % 10), 'site%d.conf' % i)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as conf:
+            for j in range(20):
+                conf.write('<VirtualHost *:80>\n    ServerName site%d-%d.example.com\n' % (i, j))
+                conf.write('    RewriteRule ^old/(.*)$ /new/$1 [L,R=301]\n</VirtualHost>\n')
+        paths.append(path)
+    return paths
+
+
+def timed(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def time_change(watcher, path, repeat=5):
+    best = None
+    for i in range(repeat):
+        with open(path, 'a') as conf:
+            conf.write('# change %d\n' % i)
+        start = time.perf_counter()
+        while not watcher.poll(0):
+            pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(count):
+    directory = tempfile.mkdtemp()
+    try:
+        paths = write_files(directory, count)
+        print("%d files, %d lines" % (count, count * 80))
+        print("query, parsing every file:  %8.2f ms" % (timed(lambda: [ApacheConfParser(p) for p in paths]) * 1000))
+        for use_inotify in (True, False):
+            watcher = ConfigWatcher(directory, use_inotify=use_inotify)
+            name = "inotify" if watcher.inotify is not None else "polling"
+            print("query, %-7s watcher:     %8.3f ms" % (name, timed(lambda: [watcher.get(p) for p in paths]) * 1000))
+            print("one changed file, %-7s: %8.2f ms" % (name, time_change(watcher, paths[count // 2]) * 1000))
+            watcher.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)